@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from .interface import APIMetadata, APIResource, APIResourceList, SpriteResource
+from .interface import APIMetadata, APIResource, APIResourceList, SpriteResource, get_resources
 from .loaders import *
 
 __all__ = [
@@ -8,52 +8,101 @@ __all__ = [
     "APIMetadata",
     "APIResourceList",
     "SpriteResource",
+    "get_resources",
     "ability",
+    "ability_many",
     "berry",
+    "berry_many",
     "berry_firmness",
+    "berry_firmness_many",
     "berry_flavor",
+    "berry_flavor_many",
     "characteristic",
+    "characteristic_many",
     "contest_effect",
+    "contest_effect_many",
     "contest_type",
+    "contest_type_many",
     "egg_group",
+    "egg_group_many",
     "encounter_condition",
+    "encounter_condition_many",
     "encounter_condition_value",
+    "encounter_condition_value_many",
     "encounter_method",
+    "encounter_method_many",
     "evolution_chain",
+    "evolution_chain_many",
     "evolution_trigger",
+    "evolution_trigger_many",
     "gender",
+    "gender_many",
     "generation",
+    "generation_many",
     "growth_rate",
+    "growth_rate_many",
     "item",
+    "item_many",
     "item_attribute",
+    "item_attribute_many",
     "item_category",
+    "item_category_many",
     "item_fling_effect",
+    "item_fling_effect_many",
     "item_pocket",
+    "item_pocket_many",
     "language",
+    "language_many",
     "location",
+    "location_many",
     "location_area",
+    "location_area_many",
     "machine",
+    "machine_many",
     "move",
+    "move_many",
     "move_ailment",
+    "move_ailment_many",
     "move_battle_style",
+    "move_battle_style_many",
     "move_category",
+    "move_category_many",
     "move_damage_class",
+    "move_damage_class_many",
     "move_learn_method",
+    "move_learn_method_many",
     "move_target",
+    "move_target_many",
     "nature",
+    "nature_many",
     "pal_park_area",
+    "pal_park_area_many",
     "pokeathlon_stat",
+    "pokeathlon_stat_many",
     "pokedex",
+    "pokedex_many",
     "pokemon",
+    "pokemon_many",
     "pokemon_color",
+    "pokemon_color_many",
     "pokemon_form",
+    "pokemon_form_many",
     "pokemon_habitat",
+    "pokemon_habitat_many",
     "pokemon_shape",
+    "pokemon_shape_many",
     "pokemon_species",
+    "pokemon_species_many",
     "region",
+    "region_many",
     "stat",
+    "stat_many",
     "super_contest_effect",
+    "super_contest_effect_many",
     "type_",
+    "type_many",
     "version",
+    "version_many",
     "version_group",
+    "version_group_many",
 ]
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import sys
+
+from . import cache, importer, mirror
+from .backends import BACKENDS
+from .common import ENDPOINTS
+
+
+def _endpoints(value):
+    if value == "all":
+        return list(ENDPOINTS)
+
+    endpoints = value.split(",")
+    for endpoint in endpoints:
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError("unknown endpoint '{}'".format(endpoint))
+
+    return endpoints
+
+
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def _size(value):
+    number, unit = value[:-1], value[-1:].upper()
+    if unit not in _UNITS or unit == "":
+        number, unit = value, ""
+
+    try:
+        return int(float(number) * _UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size '{}', use ex. 500M or 2G".format(value))
+
+
+def _print_stats(result):
+    for name, store_stats in result.items():
+        print("{}: {} entries, {} bytes".format(name, store_stats["entries"], store_stats["bytes"]))
+
+
+def warm(args):
+    counts = mirror.warm(
+        endpoints=args.endpoints,
+        workers=args.workers,
+        sprites=args.sprites,
+        force_lookup=args.force,
+        checkpoint=args.checkpoint,
+        progress=None if args.quiet else mirror._report,
+    )
+    print("Warmed {} resources".format(sum(counts.values())), file=sys.stderr)
+
+
+def import_(args):
+    counts = importer.import_dump(args.path, endpoints=args.endpoints)
+    print("Imported {} entries".format(sum(counts.values())), file=sys.stderr)
+
+
+def stats(args):
+    _print_stats(cache.stats())
+
+
+def evict(args):
+    cache.set_size_limit(policy=args.policy)
+    evicted = cache.evict("api", args.api_bytes) if args.api_bytes is not None else 0
+    if args.sprite_bytes is not None:
+        evicted += cache.evict("sprite", args.sprite_bytes)
+    print("Evicted {} entries".format(evicted), file=sys.stderr)
+
+
+def compact(args):
+    _print_stats(cache.compact())
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="python -m pokebase", description="Manage the pokebase cache.")
+    parser.add_argument("--cache", help="cache directory, defaults to the XDG cache directory")
+    parser.add_argument(
+        "--backend",
+        choices=sorted(name for name in BACKENDS if name != "files"),
+        help="backend of the API cache, defaults to shelve",
+    )
+    parser.add_argument("--sprite-backend", choices=sorted(BACKENDS), help="backend of the sprites, defaults to files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_warm = commands.add_parser("warm", help="fetch whole endpoints into the cache")
+    parser_warm.add_argument(
+        "--endpoints",
+        type=_endpoints,
+        default="all",
+        help="comma-separated endpoints, or 'all' (default)",
+    )
+    parser_warm.add_argument("--workers", type=int, help="number of concurrent requests")
+    parser_warm.add_argument(
+        "--sprites",
+        action="store_true",
+        help="also fetch pokemon and item sprites, in all their variants",
+    )
+    parser_warm.add_argument("--force", action="store_true", help="revalidate what is already cached")
+    parser_warm.add_argument("--checkpoint", help="checkpoint file, to resume an interrupted run")
+    parser_warm.add_argument("--quiet", action="store_true", help="do not report progress")
+    parser_warm.set_defaults(func=warm)
+
+    parser_import = commands.add_parser("import", help="import a static dump of the API into the cache")
+    parser_import.add_argument("path", help="directory, zip or tar archive of the dump")
+    parser_import.add_argument(
+        "--endpoints",
+        type=_endpoints,
+        help="comma-separated endpoints to import, defaults to all of them",
+    )
+    parser_import.set_defaults(func=import_)
+
+    parser_stats = commands.add_parser("stats", help="show the number of entries and size of the stores")
+    parser_stats.set_defaults(func=stats)
+
+    parser_evict = commands.add_parser("evict", help="evict entries until the stores fit a size")
+    parser_evict.add_argument("--api-bytes", type=_size, help="size of the API cache, ex. 500M")
+    parser_evict.add_argument("--sprite-bytes", type=_size, help="size of the sprite store, ex. 2G")
+    parser_evict.add_argument("--policy", choices=["lru", "lfu"], default="lru", help="entries to evict first")
+    parser_evict.set_defaults(func=evict)
+
+    parser_compact = commands.add_parser("compact", help="reclaim the space left by removed entries")
+    parser_compact.set_defaults(func=compact)
+
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+
+    if args.cache or args.backend or args.sprite_backend:
+        cache.set_cache(args.cache or cache.CACHE_DIR, backend=args.backend, sprite_backend=args.sprite_backend)
+
+    args.func(args)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
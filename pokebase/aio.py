@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import functools
+import weakref
+from urllib.parse import urlsplit
+
+from . import codec, ratelimit, session
+from .api import PAGE_SIZE, _conditional_headers, _load_cached, _save_fetched, _servable, _update_meta
+from .cache import get_sprite_path, invalidate, load, load_sprite, save_sprite
+from .common import api_url_build, cache_uri_build, sprite_url_build
+from .interface import APIResource, SpriteResource, name_id_convert
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+# One client session per event loop, since aiohttp sessions are loop-bound.
+_sessions = weakref.WeakKeyDictionary()
+
+# Requests in progress, per event loop, shared by the tasks asking for the
+# same data.
+_flights = weakref.WeakKeyDictionary()
+
+
+def _get_session():
+    if aiohttp is None:
+        raise ImportError("pokebase.aio requires aiohttp, install it with `pip install aiohttp`")
+
+    loop = asyncio.get_running_loop()
+    client = _sessions.get(loop)
+
+    if client is None or client.closed:
+        timeout = session.TIMEOUT
+        if isinstance(timeout, tuple):
+            timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            timeout = aiohttp.ClientTimeout(total=timeout)
+
+        connector = aiohttp.TCPConnector(limit_per_host=session.POOL_MAXSIZE)
+        client = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _sessions[loop] = client
+
+    return client
+
+
+def _in_thread(func, *args, **kwargs):
+    """Run a blocking function on the default executor of the running event
+    loop, as `asyncio.to_thread` does from Python 3.9.
+
+    :return: awaitable of the result of the function
+    """
+
+    loop = asyncio.get_running_loop()
+
+    return loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+async def _single_flight(key, func, *args):
+    """Await `func(*args)` once for all the tasks concurrently asking for
+    `key`, as `api._single_flight` does for threads.
+
+    :param key: identifies the call, usually the cache key of the data
+    :param func: the coroutine function to call
+    :return: the result of `func(*args)`
+    """
+
+    flights = _flights.setdefault(asyncio.get_running_loop(), {})
+    task = flights.get(key)
+
+    if task is None:
+        task = flights[key] = asyncio.ensure_future(func(*args))
+        task.add_done_callback(lambda _: flights.pop(key, None))
+
+    # A cancelled task does not cancel the call the others are waiting on.
+    return await asyncio.shield(task)
+
+
+async def close():
+    """Close the client session of the running event loop.
+
+    :return: None
+    """
+
+    client = _sessions.pop(asyncio.get_running_loop(), None)
+
+    if client is not None:
+        await client.close()
+
+    return None
+
+
+async def _get(url, params=None, meta=None):
+    """Send a GET request with the session of the running event loop.
+
+    As `transport.get`, the request is throttled by the limiter of its host,
+    shared with the threads of the process, and retried when throttled or
+    dropped.
+
+    :param meta: metadata of the cached copy, if any; see `api._call_api`
+    :return: the body of the response, or None if the cached copy is still
+    valid
+    """
+
+    headers = _conditional_headers(meta) if meta else None
+
+    limiter = ratelimit.get_limiter(urlsplit(url).hostname)
+
+    for attempt in range(ratelimit.MAX_RETRIES + 1):
+        last_attempt = attempt == ratelimit.MAX_RETRIES
+
+        # The limiter blocks its caller: wait for it off the event loop.
+        await _in_thread(limiter.acquire)
+        success = False
+
+        try:
+            async with _get_session().get(url, params=params, headers=headers) as response:
+                success = response.status not in ratelimit.RETRY_STATUSES
+
+                if success or last_attempt:
+                    if meta is not None:
+                        _update_meta(meta, response.status, response.headers)
+                    if response.status == 304:
+                        return None
+                    response.raise_for_status()
+                    return await response.read()
+
+                delay = ratelimit.retry_after(response)
+        except aiohttp.ClientConnectionError:
+            if last_attempt:
+                raise
+            delay = None
+        finally:
+            limiter.release(success=success)
+
+        if delay is None:
+            delay = ratelimit.backoff(attempt)
+        limiter.pause(delay)
+
+
+async def _call_api(endpoint, resource_id=None, subresource=None, meta=None, raw=False):
+    url = api_url_build(endpoint, resource_id, subresource)
+
+    # Get a list of resources at the endpoint, if no resource_id is given.
+    if resource_id is None:
+        return await _call_pages(url, meta)
+
+    body = await _get(url, meta=meta)
+
+    # With raw, the body is returned as received, to be saved as it is.
+    return body if raw or body is None else codec.loads(body)
+
+
+async def _call_pages(url, meta=None):
+    data = None
+    params = dict(limit=PAGE_SIZE)
+
+    # Follow the next links until the whole list is in; only the first page
+    # is conditional.
+    while url:
+        body = await _get(url, params, meta if data is None else None)
+
+        if body is None:  # Not modified since it was cached.
+            return None
+
+        page = codec.loads(body)
+
+        if data is None:
+            data = dict(page, results=list(page["results"]))
+        else:
+            data["results"].extend(page["results"])
+
+        url, params = page.get("next"), None
+
+    data["next"] = None
+
+    return data
+
+
+async def get_data(endpoint, resource_id=None, subresource=None, **kwargs):
+    """Awaitable counterpart of `api.get_data`, with the same cache
+    semantics: TTLs, revalidation of cached copies, expired copies served
+    while the API can not be reached, and concurrent lookups of the same
+    data sharing a single request.
+    """
+
+    # The cache is used from worker threads: it may wait on its lock, held
+    # by other threads, and its reads and writes block.
+    expired = None
+
+    if not kwargs.get("force_lookup", False):
+        try:
+            expired = await _in_thread(load, endpoint, resource_id, subresource)
+        except KeyError:
+            pass
+        else:
+            if await _in_thread(_servable, endpoint, resource_id, subresource):
+                return expired
+    else:
+        # Revalidate what is on disk, not an older copy kept in memory.
+        await _in_thread(invalidate, endpoint, resource_id, subresource)
+
+    uri = cache_uri_build(endpoint, resource_id, subresource)
+
+    try:
+        return await _single_flight(uri, _fetch_data, endpoint, resource_id, subresource)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # Better expired data than none while the API can not be reached.
+        if expired is None:
+            raise
+        return expired
+
+
+async def _fetch_data(endpoint, resource_id=None, subresource=None):
+    cached, meta = await _in_thread(_load_cached, endpoint, resource_id, subresource)
+
+    body = await _call_api(endpoint, resource_id, subresource, meta, raw=True)
+
+    return await _in_thread(_save_fetched, body, meta, endpoint, resource_id, subresource, cached)
+
+
+async def _call_sprite_api(sprite_type, sprite_id, **kwargs):
+    url = sprite_url_build(sprite_type, sprite_id, **kwargs)
+
+    img_data = await _get(url)
+
+    abs_path = get_sprite_path(sprite_type, sprite_id, **kwargs)
+    data = dict(img_data=img_data, path=abs_path)
+
+    return data
+
+
+async def get_sprite(sprite_type, sprite_id, **kwargs):
+    if not kwargs.get("force_lookup", False):
+        try:
+            data = await _in_thread(load_sprite, sprite_type, sprite_id, **kwargs)
+            return data
+        except FileNotFoundError:
+            pass
+
+    data = await _call_sprite_api(sprite_type, sprite_id, **kwargs)
+    await _in_thread(save_sprite, data, sprite_type, sprite_id, **kwargs)
+
+    return data
+
+
+async def resource(endpoint, name_or_id, force_lookup=False, custom=None):
+    """Awaitable counterpart of `APIResource`.
+
+    Fetches the endpoint list, the resource and any `custom` sub-resources
+    without blocking the event loop, then builds the `APIResource` from the
+    cache on a worker thread.
+
+    :param endpoint: the endpoint of the resource (ex. 'berry' or 'move')
+    :param name_or_id: name or id of the resource to lookup
+    :param force_lookup: skip the cache and fetch everything from the API
+    :param custom: same as the `custom` argument of `APIResource`
+    :return: a fully loaded APIResource
+    """
+
+    await get_data(endpoint, force_lookup=force_lookup)
+    _, id_ = await _in_thread(name_id_convert, endpoint, name_or_id)
+
+    data = await get_data(endpoint, id_, force_lookup=force_lookup)
+
+    if custom:
+        await asyncio.gather(
+            *(
+                get_data(*func(data[key]), force_lookup=force_lookup)
+                for key, func in custom.items()
+                if key in data
+            )
+        )
+
+    return await _in_thread(APIResource, endpoint, id_, custom=custom)
+
+
+async def sprite(sprite_type, sprite_id, **kwargs):
+    """Awaitable counterpart of `SpriteResource`.
+
+    :param sprite_type: the type of sprite (ex. 'pokemon' or 'items')
+    :param sprite_id: the id of the sprite
+    :return: a loaded SpriteResource
+    """
+
+    await get_sprite(sprite_type, sprite_id, **kwargs)
+    kwargs.pop("force_lookup", None)
+
+    return await _in_thread(SpriteResource, sprite_type, sprite_id, **kwargs)
@@ -1,53 +1,594 @@
 # -*- coding: utf-8 -*-
 
+import os
+import threading
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 
-from .cache import get_sprite_path, load, load_sprite, save, save_sprite
-from .common import api_url_build, sprite_url_build
+from . import codec, transport
+from .cache import (
+    get_sprite_path,
+    invalidate,
+    load,
+    load_many,
+    load_meta,
+    load_sprite,
+    load_sprite_meta,
+    save,
+    save_meta,
+    save_sprite,
+    save_sprite_hashes,
+    save_sprite_meta,
+)
+from .common import SPRITE_TREE_URL, api_url_build, cache_uri_build, sprite_url_build
 
+# Default number of concurrent requests made by `get_many`.
+MAX_WORKERS = 8
 
-def _call_api(endpoint, resource_id=None, subresource=None):
-    url = api_url_build(endpoint, resource_id, subresource)
+# Default number of entries per page when listing an endpoint.
+PAGE_SIZE = 500
+
+# Seconds cached data is served as is (None: forever), then served while
+# refreshed in the background; change them with `set_ttl`.
+TTL = None
+STALE = 0.0
+_ttls = {}  # Endpoints with their own (ttl, stale).
+
+# Number of threads refreshing stale data in the background.
+REFRESH_WORKERS = 2
+
+# Requests currently in flight, by cache key; see `_single_flight`.
+_flights = {}
+_flights_lock = threading.Lock()
+
+# Background refreshes, and the cache keys they are refreshing.
+_refresher = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+class _Flight(object):
+    """A call in progress, shared by every thread asking for the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _single_flight(key, func, *args, **kwargs):
+    """Call `func` once for all the threads concurrently asking for `key`.
+
+    The first thread to ask for a key makes the call; threads asking for the
+    same key while it is running wait for it and share its result, or its
+    exception.
+
+    :param key: identifies the call, usually the cache key of the data
+    :param func: the function to call
+    :return: the result of `func(*args, **kwargs)`
+    """
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = func(*args, **kwargs)
+    except BaseException as error:
+        flight.error = error
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+    return flight.result
+
+
+def set_ttl(ttl=None, stale=0.0, endpoint=None):
+    """Change how long cached data is served before it is refreshed.
+
+    Data fetched less than `ttl` seconds ago is served from the cache. For
+    `stale` more seconds, it is still served at once, while a background
+    thread refreshes it. Older data is refreshed before being returned.
+    Refreshes are conditional requests, so data that did not change is not
+    downloaded again.
+
+    :param ttl: seconds, None to never refresh (the default)
+    :param stale: seconds stale data is still served after `ttl`
+    :param endpoint: set the TTL of this endpoint only. If None, set the
+    default TTL of the endpoints without their own.
+    :return: float or None, float
+    """
+
+    global TTL, STALE
+
+    if endpoint is None:
+        TTL, STALE = ttl, stale
+    else:
+        cache_uri_build(endpoint)  # Validates the endpoint.
+        _ttls[endpoint] = (ttl, stale)
+
+    return ttl, stale
+
+
+def _freshness(endpoint, meta):
+    """Tell whether cached data is 'fresh', 'stale' or 'expired'.
+
+    :param meta: metadata of the cached data, see `_load_fetched_meta`
+    """
+
+    ttl, stale = _ttls.get(endpoint, (TTL, STALE))
+
+    if ttl is None:
+        return "fresh"
+
+    age = time.time() - meta["fetched"]
+
+    if age < ttl:
+        return "fresh"
+    if age < ttl + stale:
+        return "stale"
+
+    return "expired"
+
+
+def _load_fetched_meta(endpoint, resource_id=None, subresource=None):
+    """Load the metadata of cached data, with its fetch time.
+
+    Data saved without one, such as by older versions, is taken as fetched
+    now, and its metadata saved so.
+    """
+
+    meta = load_meta(endpoint, resource_id, subresource)
+
+    if "fetched" not in meta:
+        meta["fetched"] = time.time()
+        save_meta(meta, endpoint, resource_id, subresource)
+
+    return meta
+
+
+def _servable(endpoint, resource_id=None, subresource=None):
+    """Tell whether cached data may be served, refreshing it if stale."""
+
+    if _ttls.get(endpoint, (TTL, STALE))[0] is None:
+        return True
+
+    freshness = _freshness(endpoint, _load_fetched_meta(endpoint, resource_id, subresource))
+
+    if freshness == "stale":
+        _refresh(endpoint, resource_id, subresource)
+
+    return freshness != "expired"
+
+
+def _refresh(endpoint, resource_id=None, subresource=None):
+    """Refresh cached data on a background thread, once at a time."""
+
+    global _refresher
+
+    uri = cache_uri_build(endpoint, resource_id, subresource)
+
+    with _refresh_lock:
+        if uri in _refreshing:
+            return None
+        _refreshing.add(uri)
+
+        if _refresher is None:
+            _refresher = ThreadPoolExecutor(REFRESH_WORKERS, thread_name_prefix="pokebase-refresh")
+
+        _refresher.submit(_run_refresh, uri, endpoint, resource_id, subresource)
+
+    return None
+
+
+def _run_refresh(uri, endpoint, resource_id, subresource):
+    try:
+        _single_flight(uri, _fetch_data, endpoint, resource_id, subresource)
+    except Exception:
+        pass  # The stale copy is kept, and the next lookup tries again.
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(uri)
+
+
+def _reset_after_fork():
+    # The refresher's threads are gone in a forked child.
+    global _refresher, _refreshing, _refresh_lock, _flights_lock
+
+    _refresher = None
+    _refreshing = set()
+    _refresh_lock = threading.Lock()
+    _flights_lock = threading.Lock()
+    _flights.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _conditional_headers(meta):
+    """Build the request headers revalidating a cached copy."""
+
+    headers = {}
+
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    return headers
+
+
+def _update_meta(meta, status, headers):
+    """Record the validators of a response, and when it was fetched.
+
+    :param status: the status code of the response
+    :param headers: the headers of the response
+    """
+
+    meta["fetched"] = time.time()
+
+    if status != 304:
+        meta["etag"] = headers.get("ETag")
+        meta["last_modified"] = headers.get("Last-Modified")
+
+
+def _call_api(endpoint, resource_id=None, subresource=None, meta=None, raw=False):
+    """Fetch data from the API.
+
+    :param meta: metadata of the cached copy of the data, if any. When it
+    holds validators, the request is conditional. It is updated in place
+    with the validators of the response.
+    :param raw: return the body of the response as received, rather than
+    decoding it. Endpoint lists, merged from several pages, are decoded.
+    :return: the data, or None if the cached copy is still valid
+    """
 
     # Get a list of resources at the endpoint, if no resource_id is given.
-    get_endpoint_list = resource_id is None
+    if resource_id is None:
+        data = None
+
+        for page in _call_pages(endpoint, meta=meta):
+            if data is None:
+                data = dict(page, results=list(page["results"]))
+            else:
+                data["results"].extend(page["results"])
+
+        if data is not None:
+            data["next"] = None
+
+        return data
+
+    url = api_url_build(endpoint, resource_id, subresource)
+
+    if meta:
+        response = transport.get(url, headers=_conditional_headers(meta))
+    else:
+        response = transport.get(url)
+
+    if meta is not None:
+        _update_meta(meta, response.status_code, response.headers)
+
+    if response.status_code == 304:
+        return None
 
-    response = requests.get(url)
     response.raise_for_status()
 
-    data = response.json()
+    if raw:
+        return response.content
+
+    return codec.loads(response.content)
+
+
+def _call_pages(endpoint, page_size=None, meta=None):
+    """Fetch the list of an endpoint page by page, following the `next` links.
 
-    if get_endpoint_list and data["count"] != len(data["results"]):
-        # We got a section of all results; we want ALL of them.
-        items = data["count"]
-        num_items = dict(limit=items)
+    :param page_size: number of entries per page, defaults to PAGE_SIZE
+    :param meta: see `_call_api`; only the first page is conditional
+    :return: generator of the pages, empty if the cached list is still valid
+    """
+
+    url = api_url_build(endpoint)
+    params = dict(limit=page_size or PAGE_SIZE)
+
+    if meta:
+        response = transport.get(url, params=params, headers=_conditional_headers(meta))
+    else:
+        response = transport.get(url, params=params)
+
+    if meta is not None:
+        _update_meta(meta, response.status_code, response.headers)
+
+    while True:
+        if response.status_code == 304:
+            return
 
-        response = requests.get(url, params=num_items)
         response.raise_for_status()
 
-        data = response.json()
+        page = codec.loads(response.content)
+        yield page
 
-    return data
+        if not page.get("next"):
+            return
+
+        # The next link holds the paging parameters.
+        response = transport.get(page["next"])
+
+
+def iter_pages(endpoint, page_size=None, force_lookup=False):
+    """Get the list of an endpoint page by page.
+
+    A cached list is served as a single page. Otherwise the pages are
+    yielded as they are fetched, so the first entries can be used before
+    the last page arrives; once the last page is in, the full list is saved
+    to the cache.
+
+    :param endpoint: the endpoint to list (ex. 'berry' or 'move')
+    :param page_size: number of entries per page, defaults to PAGE_SIZE
+    :param force_lookup: revalidate a cached list, see `get_data`
+    :return: generator of the pages, each a dict with `count` and `results`
+    """
+
+    if force_lookup:
+        invalidate(endpoint)
+
+    try:
+        cached = load(endpoint)
+    except KeyError:
+        cached = None
+
+    if cached is not None and not force_lookup and _servable(endpoint):
+        yield cached
+        return
+
+    meta = load_meta(endpoint) if cached is not None else {}
+    data = None
+
+    for page in _call_pages(endpoint, page_size, meta):
+        if data is None:
+            data = dict(page, results=list(page["results"]))
+        else:
+            data["results"].extend(page["results"])
+        yield page
+
+    if data is None:  # Not modified since it was cached.
+        yield cached
+    else:
+        data["next"] = None
+        save(data, endpoint)
+
+    save_meta(meta, endpoint)
+
+
+def iter_endpoint(endpoint, page_size=None, force_lookup=False):
+    """Get the entries of an endpoint list as they arrive.
+
+    See `iter_pages` for the arguments.
+
+    :return: generator of the entries, dicts with `name` and `url`
+    """
+
+    for page in iter_pages(endpoint, page_size, force_lookup):
+        yield from page["results"]
 
 
 def get_data(endpoint, resource_id=None, subresource=None, **kwargs):
+    """Get the data of a resource, or the list of resources of an endpoint.
+
+    The data is served from the cache if possible, within its TTL (see
+    `set_ttl`). With `force_lookup`, or past the TTL, a cached copy is
+    revalidated with the API: if it is unchanged, only its metadata is
+    updated and the copy is returned, otherwise the new data is downloaded
+    and saved.
+
+    :param endpoint: the endpoint of the data (ex. 'berry' or 'move')
+    :param resource_id: id of the resource, None for the endpoint list
+    :param subresource: name of a subresource (ex. 'encounters')
+    :return: the data, as a dict (or list)
+    """
+
+    expired = None
+
     if not kwargs.get("force_lookup", False):
         try:
-            data = load(endpoint, resource_id, subresource)
-            return data
+            expired = load(endpoint, resource_id, subresource)
         except KeyError:
             pass
+        else:
+            if _servable(endpoint, resource_id, subresource):
+                return expired
+    else:
+        # Revalidate what is on disk, not an older copy kept in memory.
+        invalidate(endpoint, resource_id, subresource)
+
+    uri = cache_uri_build(endpoint, resource_id, subresource)
+
+    try:
+        return _single_flight(uri, _fetch_data, endpoint, resource_id, subresource)
+    except requests.RequestException:
+        # Better expired data than none while the API can not be reached.
+        if expired is None:
+            raise
+        return expired
+
+
+def _load_cached(endpoint, resource_id=None, subresource=None):
+    """Load cached data to revalidate, and its metadata.
+
+    :return: the data and its metadata, or None and {} if it is not cached
+    """
+
+    try:
+        return load(endpoint, resource_id, subresource), load_meta(endpoint, resource_id, subresource)
+    except KeyError:
+        return None, {}
+
+
+def _fetch_data(endpoint, resource_id=None, subresource=None):
+    cached, meta = _load_cached(endpoint, resource_id, subresource)
+    body = _call_api(endpoint, resource_id, subresource, meta, True)
+
+    return _save_fetched(body, meta, endpoint, resource_id, subresource, cached)
+
+
+def get_many(endpoint, resource_ids, max_workers=None, ordered=True, force_lookup=False, subresource=None):
+    """Get the data of several resources of an endpoint at once.
+
+    Cache hits are loaded in bulk, and only the misses (and the hits past
+    their TTL, see `set_ttl`) are fetched from the API, in parallel on a
+    bounded thread pool, as `get_data` does.
+
+    :param endpoint: the endpoint of the resources (ex. 'berry' or 'move')
+    :param resource_ids: iterable of resource ids
+    :param max_workers: maximum number of concurrent requests, defaults to
+    MAX_WORKERS
+    :param ordered: yield in the order of `resource_ids`, rather than as the
+    requests complete. Either way, an id listed several times is yielded as
+    many times.
+    :param force_lookup: revalidate every resource, even if it is cached
+    :param subresource: get this subresource of each resource instead
+    (ex. 'encounters')
+    :return: generator of the resources' data
+    """
+
+    resource_ids = list(resource_ids)
+    expired = {}
 
-    data = _call_api(endpoint, resource_id, subresource)
-    save(data, endpoint, resource_id, subresource)
+    if force_lookup:
+        found = {}
+        for id_ in resource_ids:
+            invalidate(endpoint, id_, subresource)
+    else:
+        found = load_many(endpoint, resource_ids, subresource)
+
+        # Cached copies past their TTL are revalidated with the misses.
+        if _ttls.get(endpoint, (TTL, STALE))[0] is not None:
+            for id_ in list(found):
+                freshness = _freshness(endpoint, _load_fetched_meta(endpoint, id_, subresource))
+
+                if freshness == "stale":
+                    _refresh(endpoint, id_, subresource)
+                elif freshness == "expired":
+                    expired[id_] = found.pop(id_)
+
+    missing = [id_ for id_ in dict.fromkeys(resource_ids) if id_ not in found]
+
+    if not ordered:
+        for resource_id in resource_ids:
+            if resource_id in found:
+                yield found[resource_id]
+
+    if not missing:
+        if ordered:
+            for resource_id in resource_ids:
+                yield found[resource_id]
+        return
+
+    # The same flights as `get_data`, so either can wait on the other's.
+    executor = ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS)
+    futures = {
+        executor.submit(
+            _single_flight,
+            cache_uri_build(endpoint, id_, subresource),
+            _fetch_data,
+            endpoint,
+            id_,
+            subresource,
+        ): id_
+        for id_ in missing
+    }
+
+    try:
+        if ordered:
+            pending = {id_: future for future, id_ in futures.items()}
+            for resource_id in resource_ids:
+                if resource_id not in found:
+                    found[resource_id] = _fetched(pending[resource_id], expired.get(resource_id))
+                yield found[resource_id]
+        else:
+            occurrences = Counter(resource_ids)
+            for future in as_completed(futures):
+                data = _fetched(future, expired.get(futures[future]))
+                for _ in range(occurrences[futures[future]]):
+                    yield data
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _fetched(future, expired=None):
+    """Get the data fetched by a `get_many` worker, or the expired cached
+    copy, if any, when the API could not be reached, as `get_data` does.
+    """
+
+    try:
+        return future.result()
+    except requests.RequestException:
+        if expired is None:
+            raise
+        return expired
+
+
+def _save_fetched(body, meta, endpoint, resource_id, subresource=None, cached=None):
+    """Save what `_call_api` fetched, and return its data.
+
+    Bodies are decoded, so invalid ones are never saved, then saved as
+    received: only the cache reads encode them again.
+    """
+
+    if body is None:  # Not modified since it was cached.
+        data = cached
+    elif isinstance(body, bytes):
+        data = codec.loads(body)
+        save(body, endpoint, resource_id, subresource)
+    else:
+        data = body
+        save(data, endpoint, resource_id, subresource)
+
+    # The metadata is only filled in if this thread made the request.
+    if meta:
+        save_meta(meta, endpoint, resource_id, subresource)
 
     return data
 
 
-def _call_sprite_api(sprite_type, sprite_id, **kwargs):
+def _call_sprite_api(sprite_type, sprite_id, meta=None, **kwargs):
+    """Fetch a sprite.
+
+    :param meta: metadata of the cached copy of the sprite, if any; see
+    `_call_api`
+    :return: dict with the image data and its cache path, or None if the
+    cached copy is still valid
+    """
+
     url = sprite_url_build(sprite_type, sprite_id, **kwargs)
 
-    response = requests.get(url)
+    if meta:
+        response = transport.get(url, headers=_conditional_headers(meta))
+    else:
+        response = transport.get(url)
+
+    if meta is not None:
+        _update_meta(meta, response.status_code, response.headers)
+
+    if response.status_code == 304:
+        return None
+
     response.raise_for_status()
 
     abs_path = get_sprite_path(sprite_type, sprite_id, **kwargs)
@@ -57,6 +598,15 @@ def _call_sprite_api(sprite_type, sprite_id, **kwargs):
 
 
 def get_sprite(sprite_type, sprite_id, **kwargs):
+    """Get a sprite, from the cache if possible.
+
+    With `force_lookup`, a cached sprite is revalidated like in `get_data`.
+
+    :param sprite_type: the type of sprite (ex. 'pokemon' or 'items')
+    :param sprite_id: the id of the sprite
+    :return: dict with the image data and its cache path
+    """
+
     if not kwargs.get("force_lookup", False):
         try:
             data = load_sprite(sprite_type, sprite_id, **kwargs)
@@ -64,7 +614,60 @@ def get_sprite(sprite_type, sprite_id, **kwargs):
         except FileNotFoundError:
             pass
 
-    data = _call_sprite_api(sprite_type, sprite_id, **kwargs)
-    save_sprite(data, sprite_type, sprite_id, **kwargs)
+    abs_path = get_sprite_path(sprite_type, sprite_id, **kwargs)
+
+    return _single_flight(abs_path, _fetch_sprite, sprite_type, sprite_id, **kwargs)
+
+
+def fetch_sprite_hashes():
+    """Get the hashes of every sprite from the tree of the sprites repository
+    on GitHub, in a single request.
+
+    Sprites identical to a cached one are then loaded from the cache
+    instead of fetched; see `pokebase.cache.save_sprite_hashes`.
+
+    GitHub truncates the trees too large to list in full; the hashes it
+    does list are saved, with a warning.
+
+    :return: int, the number of hashes saved
+    """
+
+    response = transport.get(SPRITE_TREE_URL)
+    response.raise_for_status()
+
+    prefix = "sprites/"
+    tree = codec.loads(response.content)
+
+    saved = save_sprite_hashes(
+        (entry["path"][len(prefix):], entry["sha"])
+        for entry in tree["tree"]
+        if entry["type"] == "blob" and entry["path"].startswith(prefix)
+    )
+
+    if tree.get("truncated"):
+        warnings.warn(
+            "The sprites tree was truncated by GitHub, only {} sprite hashes were saved".format(saved),
+            RuntimeWarning,
+        )
+
+    return saved
+
+
+def _fetch_sprite(sprite_type, sprite_id, **kwargs):
+    try:
+        cached = load_sprite(sprite_type, sprite_id, **kwargs)
+        meta = load_sprite_meta(sprite_type, sprite_id, **kwargs)
+    except FileNotFoundError:
+        cached = None
+        meta = {}
+
+    data = _call_sprite_api(sprite_type, sprite_id, meta, **kwargs)
+
+    if data is None:  # Not modified since it was cached.
+        data = cached
+    else:
+        save_sprite(data, sprite_type, sprite_id, **kwargs)
+
+    save_sprite_meta(meta, sprite_type, sprite_id, **kwargs)
 
     return data
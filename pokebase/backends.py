@@ -0,0 +1,829 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import glob
+import mmap
+import os
+import pickle
+import shelve
+import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Seconds a SQLite write waits for another process to finish its own,
+# before giving up.
+BUSY_TIMEOUT = 10.0
+
+_MISSING = object()
+
+
+def _encode(value):
+    """Get the bytes to store for a value, and whether they are pickled."""
+
+    if isinstance(value, bytes):
+        return value, False
+
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL), True
+
+
+def _decode(data, pickled):
+    return pickle.loads(data) if pickled else data
+
+
+class Store(object):
+    """Base class of the stores holding the API cache and the sprites.
+
+    Keys are str. Values are bytes (cache entries, images) or other
+    picklable objects (cache metadata). Stores are used by one thread at a
+    time; `pokebase.cache` takes care of it.
+
+    Subclasses implement `get`, `set`, `delete`, `iterate` and `stats`, and
+    may override `get_many`, `set_many` and `transaction` to do the work in
+    bulk, `size`, `compact`, and `link`. The file, or directory, of a store is named
+    after its use ('api' or 'sprite') and its EXTENSION.
+    """
+
+    EXTENSION = ""
+
+    # Whether the store may lock its file while it is open, keeping other
+    # processes out of it: `pokebase.cache` then closes it once idle.
+    LOCKS_FILE = False
+
+    def get(self, key, default=None):
+        """Get the value of a key, or `default` if it is not stored."""
+
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store the value of a key, replacing any previous one."""
+
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove a key, if it is stored.
+
+        :return: bool, whether it was stored
+        """
+
+        raise NotImplementedError
+
+    def iterate(self, prefix=""):
+        """Get the keys starting with `prefix`, in no particular order."""
+
+        raise NotImplementedError
+
+    def stats(self):
+        """Get the number of entries and the total size of their values.
+
+        :return: dict with `entries` and `bytes`
+        """
+
+        raise NotImplementedError
+
+    def size(self, key):
+        """Get the number of bytes the value of a key takes, 0 if not stored."""
+
+        value = self.get(key, _MISSING)
+
+        return 0 if value is _MISSING else len(_encode(value)[0])
+
+    def compact(self):
+        """Rewrite the store without the space left by removed values."""
+
+        return None
+
+    def link(self, key, target):
+        """Give a key the value of another, sharing its storage where the
+        store can, as identical sprites do."""
+
+        self.set(key, self.get(target))
+
+    def view(self, key):
+        """Get a memoryview of the bytes value of a key, None if not stored.
+
+        Stores mapping their file in memory return a view of the mapping,
+        without copying the value.
+        """
+
+        value = self.get(key)
+
+        return None if value is None else memoryview(value)
+
+    def get_many(self, keys):
+        """Get the values of several keys.
+
+        :return: dict of key -> value, for the keys stored
+        """
+
+        found = {}
+
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+
+        return found
+
+    def set_many(self, items):
+        """Store several values at once, in a single transaction.
+
+        :param items: iterable of (key, value) pairs
+        :return: int, the number of values stored
+        """
+
+        count = 0
+
+        with self.transaction():
+            for key, value in items:
+                self.set(key, value)
+                count += 1
+
+        return count
+
+    @contextmanager
+    def transaction(self):
+        """Group the writes of a block, where the store supports it."""
+
+        yield self
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def sync(self):
+        """Write the pending changes to disk."""
+
+        return None
+
+    def close(self):
+        return None
+
+
+class MemoryStore(Store):
+    """Store keeping everything in memory, lost when the process exits.
+
+    For tests, and short-lived processes such as serverless functions.
+    """
+
+    def __init__(self, path=None):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def iterate(self, prefix=""):
+        return [key for key in list(self._data) if key.startswith(prefix)]
+
+    def stats(self):
+        values = list(self._data.values())
+
+        return dict(entries=len(values), bytes=sum(len(_encode(value)[0]) for value in values))
+
+
+class ShelveStore(Store):
+    """Store in a `shelve` file (the default).
+
+    The file can only be used by one process at a time with some `dbm`
+    implementations, such as gdbm; opening it while another process has it
+    raises OSError, errno 11.
+    """
+
+    EXTENSION = ".cache"
+    LOCKS_FILE = True
+
+    def __init__(self, path):
+        self.path = path
+        self._shelf = shelve.open(path)
+
+    def get(self, key, default=None):
+        return self._shelf.get(key, default)
+
+    def set(self, key, value):
+        self._shelf[key] = value
+
+    def delete(self, key):
+        try:
+            del self._shelf[key]
+        except KeyError:
+            return False
+
+        return True
+
+    def iterate(self, prefix=""):
+        return [key for key in self._shelf.keys() if key.startswith(prefix)]
+
+    def size(self, key):
+        # Size of the pickled value, as stored by the underlying dbm.
+        try:
+            return len(self._shelf.dict[key.encode("utf-8")])
+        except KeyError:
+            return 0
+
+    def stats(self):
+        sizes = [self.size(key) for key in self._shelf.keys()]
+
+        return dict(entries=len(sizes), bytes=sum(sizes))
+
+    def compact(self):
+        """Rewrite the file; dbm files never shrink by themselves."""
+
+        self._shelf.sync()
+        raw = self._shelf.dict
+
+        if hasattr(raw, "reorganize"):  # gdbm does it in place.
+            raw.reorganize()
+            return None
+
+        # Copy the pickled values to a new file, then swap the files: every
+        # dbm implementation names its files from the path.
+        temp_path = self.path + ".compact"
+        compacted = shelve.open(temp_path, flag="n")
+        for key in raw.keys():
+            compacted.dict[key] = raw[key]
+        compacted.close()
+        self._shelf.close()
+
+        for old_file in glob.glob(glob.escape(self.path) + "*"):
+            if not old_file.startswith(temp_path):
+                os.remove(old_file)
+        for new_file in glob.glob(glob.escape(temp_path) + "*"):
+            os.replace(new_file, self.path + new_file[len(temp_path):])
+
+        self._shelf = shelve.open(self.path)
+
+        return None
+
+    def sync(self):
+        self._shelf.sync()
+
+    def close(self):
+        self._shelf.close()
+
+
+class SQLiteStore(Store):
+    """Store in a SQLite database, in WAL mode.
+
+    Any number of processes can read it while one writes. Writes are short
+    transactions, one per value or per `transaction` block; a process waits
+    up to BUSY_TIMEOUT seconds for the writes of the others.
+    """
+
+    EXTENSION = ".sqlite"
+
+    # Keys per query of `get_many`, under the SQLite variables limit.
+    _CHUNK = 500
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._depth = 0
+
+        with self._locked():
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, pickled INTEGER NOT NULL)"
+            )
+
+    @contextmanager
+    def _locked(self):
+        # Past BUSY_TIMEOUT, report a locked database as shelve would.
+        try:
+            yield
+        except sqlite3.OperationalError as error:
+            if "locked" in str(error) or "busy" in str(error):
+                raise OSError(11, "Cache is locked by another process") from error
+            raise
+
+    def get(self, key, default=None):
+        with self._locked():
+            row = self._connection.execute(
+                "SELECT value, pickled FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return default
+
+        return _decode(*row)
+
+    def set(self, key, value):
+        with self._locked():
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, pickled) VALUES (?, ?, ?)",
+                (key,) + _encode(value),
+            )
+
+    def delete(self, key):
+        with self._locked():
+            cursor = self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+        return cursor.rowcount > 0
+
+    def iterate(self, prefix=""):
+        with self._locked():
+            rows = self._connection.execute(
+                "SELECT key FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+
+        return [key for key, in rows]
+
+    def size(self, key):
+        with self._locked():
+            row = self._connection.execute(
+                "SELECT LENGTH(value) FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        return 0 if row is None else row[0]
+
+    def compact(self):
+        with self._locked():
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._connection.execute("VACUUM")
+
+    def stats(self):
+        with self._locked():
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), TOTAL(LENGTH(value)) FROM cache"
+            ).fetchone()
+
+        return dict(entries=entries, bytes=int(size))
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = {}
+
+        for start in range(0, len(keys), self._CHUNK):
+            chunk = keys[start:start + self._CHUNK]
+            query = "SELECT key, value, pickled FROM cache WHERE key IN ({})".format(
+                ", ".join("?" * len(chunk))
+            )
+
+            with self._locked():
+                rows = self._connection.execute(query, chunk).fetchall()
+
+            for key, value, pickled in rows:
+                found[key] = _decode(value, pickled)
+
+        return found
+
+    @contextmanager
+    def transaction(self):
+        """Make the writes of a block a single transaction.
+
+        Nested blocks join the outermost one.
+        """
+
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        with self._locked():
+            self._connection.execute("BEGIN IMMEDIATE")
+
+        self._depth = 1
+        try:
+            yield self
+            with self._locked():
+                self._connection.execute("COMMIT")
+        except BaseException:
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+            raise
+        finally:
+            self._depth = 0
+
+    def close(self):
+        self._connection.close()
+
+
+class MmapStore(Store):
+    """Read-only store in a snapshot file, mapped in memory.
+
+    Lookups only read the pages of the value asked for, and the mapping is
+    shared by every process using the file. Snapshots are written by
+    `MmapStore.write`; a missing file is an empty store. Writes raise
+    OSError, errno EROFS.
+    """
+
+    EXTENSION = ".snapshot"
+
+    MAGIC = b"PKBSNAP1"
+    _HEADER = struct.Struct("<8sQQ")  # magic, index offset, number of entries
+    _ENTRY = struct.Struct("<HBQQ")  # key length, pickled, value offset, length
+
+    def __init__(self, path):
+        self._index = {}
+        self._mmap = None
+
+        try:
+            snapshot_file = open(path, "rb")
+        except FileNotFoundError:
+            return
+
+        with snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, offset, count = self._HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC:
+            raise ValueError("'{}' is not a cache snapshot".format(path))
+
+        for _ in range(count):
+            key_length, pickled, value_offset, length = self._ENTRY.unpack_from(self._mmap, offset)
+            offset += self._ENTRY.size
+            key = self._mmap[offset:offset + key_length].decode("utf-8")
+            offset += key_length
+            self._index[key] = (value_offset, length, pickled)
+
+    @classmethod
+    def write(cls, path, items):
+        """Write a snapshot file.
+
+        The file is replaced at once, so processes mapping the previous
+        snapshot keep reading it until they reopen the cache.
+
+        :param path: path of the snapshot file
+        :param items: iterable of (key, value) pairs
+        :return: int, the number of values written
+        """
+
+        index = []
+
+        with open(path + ".tmp", "wb") as snapshot_file:
+            snapshot_file.write(b"\0" * cls._HEADER.size)
+            offset = cls._HEADER.size
+
+            for key, value in items:
+                data, pickled = _encode(value)
+                snapshot_file.write(data)
+                index.append((key.encode("utf-8"), pickled, offset, len(data)))
+                offset += len(data)
+
+            for key, pickled, value_offset, length in index:
+                snapshot_file.write(cls._ENTRY.pack(len(key), pickled, value_offset, length))
+                snapshot_file.write(key)
+
+            snapshot_file.seek(0)
+            snapshot_file.write(cls._HEADER.pack(cls.MAGIC, offset, len(index)))
+
+        os.replace(path + ".tmp", path)
+
+        return len(index)
+
+    def get(self, key, default=None):
+        location = self._index.get(key)
+
+        if location is None:
+            return default
+
+        offset, length, pickled = location
+
+        return _decode(self._mmap[offset:offset + length], pickled)
+
+    def set(self, key, value):
+        raise OSError(errno.EROFS, "Cache snapshots are read-only")
+
+    def set_many(self, items):
+        raise OSError(errno.EROFS, "Cache snapshots are read-only")
+
+    def delete(self, key):
+        raise OSError(errno.EROFS, "Cache snapshots are read-only")
+
+    def iterate(self, prefix=""):
+        return [key for key in self._index if key.startswith(prefix)]
+
+    def size(self, key):
+        return self._index.get(key, (0, 0, 0))[1]
+
+    def stats(self):
+        return dict(
+            entries=len(self._index), bytes=sum(length for _, length, _ in self._index.values())
+        )
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class FileStore(Store):
+    """Store with a file per value, named after its key, in a directory.
+
+    The default store of the sprites. Only holds bytes.
+    """
+
+    def __init__(self, path):
+        self.directory = path
+
+    def _path(self, key):
+        return os.path.join(self.directory, *key.split("/"))
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), "rb") as value_file:
+                return value_file.read()
+        except FileNotFoundError:
+            return default
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Replace the file, rather than write through the links to it.
+        with open(path + ".tmp", "wb") as value_file:
+            value_file.write(value)
+
+        os.replace(path + ".tmp", path)
+
+    def link(self, key, target):
+        """Hard link the file of the key to the one of the target."""
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        try:
+            os.link(self._path(target), path)
+        except OSError:  # No hard links on this file system.
+            Store.link(self, key, target)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def iterate(self, prefix=""):
+        keys = []
+
+        for dirpath, _, filenames in os.walk(self.directory):
+            relative = os.path.relpath(dirpath, self.directory).replace(os.sep, "/")
+            for filename in filenames:
+                key = filename if relative == "." else "/".join([relative, filename])
+                if key.startswith(prefix):
+                    keys.append(key)
+
+        return keys
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self._path(key))
+        except FileNotFoundError:
+            return 0
+
+    def stats(self):
+        sizes = [self.size(key) for key in self.iterate()]
+
+        return dict(entries=len(sizes), bytes=sum(sizes))
+
+    def compact(self):
+        """Remove the directories left empty."""
+
+        for dirpath, dirnames, filenames in os.walk(self.directory, topdown=False):
+            if dirpath != self.directory and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    def __contains__(self, key):
+        return os.path.isfile(self._path(key))
+
+
+class PackStore(Store):
+    """Store packing the values in a single append-only file, mapped in
+    memory, with an index of their offsets in a second file.
+
+    Suits the sprites: tens of thousands of small images take two files
+    instead of as many files and directories. Replaced and deleted values
+    leave their space in the file until `compact`. Processes sharing the
+    files take turns to write, under a lock where `fcntl` is available, and
+    read the index records the others appended.
+    """
+
+    EXTENSION = ".pack"
+
+    # Index record: key length, flags, value offset, length; then the key.
+    _RECORD = struct.Struct("<HBQQ")
+    _PICKLED = 1
+    _DELETED = 2
+
+    def __init__(self, path):
+        self.path = path
+        self._index = {}
+        self._mmap = None
+        self._open()
+
+    def _open(self):
+        self._data = open(self.path, "ab")
+        self._index_file = open(self.path + ".idx", "ab")
+        self._index_reader = open(self.path + ".idx", "rb")
+        self._read_to = 0
+
+        with self._appending():
+            pass
+
+    def _refresh(self, truncate=False):
+        """Read the index records appended since the last call, by this
+        store or another one.
+
+        :param truncate: drop an incomplete record at the end, only done
+        holding the lock: it was torn by a crash, not still being written
+        """
+
+        size = os.fstat(self._index_reader.fileno()).st_size
+        if size == self._read_to:
+            return
+
+        self._index_reader.seek(self._read_to)
+        records = self._index_reader.read(size - self._read_to)
+        data_end = os.fstat(self._data.fileno()).st_size
+
+        offset = 0
+        while offset + self._RECORD.size <= len(records):
+            key_length, flags, value_offset, length = self._RECORD.unpack_from(records, offset)
+            key = records[offset + self._RECORD.size:offset + self._RECORD.size + key_length]
+            if len(key) < key_length or value_offset + length > data_end:
+                break  # Torn by a crash: the values it points to are lost.
+            offset += self._RECORD.size + key_length
+
+            if flags & self._DELETED:
+                self._index.pop(key.decode("utf-8"), None)
+            else:
+                self._index[key.decode("utf-8")] = (value_offset, length, flags & self._PICKLED)
+
+        self._read_to += offset
+
+        if truncate and self._read_to < size:
+            self._index_file.truncate(self._read_to)
+
+    @contextmanager
+    def _appending(self):
+        # Writers append at the real end of the files, which other processes
+        # may have moved, and write everything out before the next one.
+        if fcntl is not None:
+            fcntl.flock(self._index_file, fcntl.LOCK_EX)
+
+        try:
+            self._refresh(truncate=True)
+            yield
+        finally:
+            # Values first: the index must not point past the end of the file.
+            self._data.flush()
+            self._index_file.flush()
+            self._read_to = os.fstat(self._index_file.fileno()).st_size
+
+            if fcntl is not None:
+                fcntl.flock(self._index_file, fcntl.LOCK_UN)
+
+    def _record(self, key, flags, offset, length):
+        key = key.encode("utf-8")
+        self._index_file.write(self._RECORD.pack(len(key), flags, offset, length) + key)
+
+    def _slice(self, key):
+        self._refresh()
+        location = self._index.get(key)
+
+        if location is None:
+            return None
+
+        offset, length, pickled = location
+
+        if length == 0:  # Empty files can not be mapped.
+            return memoryview(b""), pickled
+
+        # Map the file again once it grew past the mapping. Views of the
+        # previous mapping keep it alive until they are released.
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._data.flush()
+            with open(self.path, "rb") as data_file:
+                self._mmap = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return memoryview(self._mmap)[offset:offset + length], pickled
+
+    def get(self, key, default=None):
+        found = self._slice(key)
+
+        if found is None:
+            return default
+
+        data, pickled = found
+
+        return _decode(data, pickled) if pickled else bytes(data)
+
+    def view(self, key):
+        found = self._slice(key)
+
+        return None if found is None else found[0]
+
+    def set(self, key, value):
+        data, pickled = _encode(value)
+
+        with self._appending():
+            offset = os.fstat(self._data.fileno()).st_size
+            self._data.write(data)
+            self._record(key, self._PICKLED if pickled else 0, offset, len(data))
+            self._index[key] = (offset, len(data), pickled)
+
+    def delete(self, key):
+        with self._appending():
+            if self._index.pop(key, None) is None:
+                return False
+
+            self._record(key, self._DELETED, 0, 0)
+
+        return True
+
+    def link(self, key, target):
+        with self._appending():
+            offset, length, pickled = self._index[target]
+
+            self._record(key, self._PICKLED if pickled else 0, offset, length)
+            self._index[key] = (offset, length, pickled)
+
+    def iterate(self, prefix=""):
+        self._refresh()
+        return [key for key in self._index if key.startswith(prefix)]
+
+    def size(self, key):
+        self._refresh()
+        return self._index.get(key, (0, 0, 0))[1]
+
+    def stats(self):
+        self._refresh()
+        # Linked keys share their bytes.
+        locations = {location[:2] for location in self._index.values()}
+
+        return dict(entries=len(self._index), bytes=sum(length for _, length in locations))
+
+    def compact(self):
+        """Rewrite the files with the stored values only."""
+
+        temp = PackStore(self.path + ".compact")
+        copied = {}
+
+        for key, location in self._index.items():
+            if location[:2] in copied:
+                temp.link(key, copied[location[:2]])
+            else:
+                data, pickled = self._slice(key)
+                temp.set(key, _decode(data, pickled) if pickled else bytes(data))
+                copied[location[:2]] = key
+
+        temp.close()
+
+        self.close()
+        os.replace(temp.path, self.path)
+        os.replace(temp.path + ".idx", self.path + ".idx")
+
+        self._index = {}
+        self._open()
+
+    def sync(self):
+        # Every write is flushed before the lock is released.
+        return None
+
+    def close(self):
+        self._data.close()
+        self._index_file.close()
+        self._index_reader.close()
+
+        # Views still held keep their mapping open until they are released.
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+
+BACKENDS = {
+    "memory": MemoryStore,
+    "shelve": ShelveStore,
+    "sqlite": SQLiteStore,
+    "mmap": MmapStore,
+    "files": FileStore,
+    "pack": PackStore,
+}
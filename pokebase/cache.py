@@ -1,10 +1,116 @@
 # -*- coding: utf-8 -*-
 
+import atexit
+import errno
+import hashlib
 import os
-import shelve
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 
+from . import codec
+from .backends import BACKENDS, MmapStore
 from .common import cache_uri_build, sprite_filepath_build
 
+try:
+    import zstandard as zstd
+except ImportError:  # pragma: no cover
+    zstd = None
+
+# Prefix of the keys holding the metadata (validators, fetch time) of an
+# API cache entry or sprite.
+META_PREFIX = "meta:"
+
+# Prefix of the keys holding the access records of the stores, see `evict`.
+ACCESS_PREFIX = "access:"
+
+# Prefix of the keys holding the zstd dictionaries, see `train_dictionaries`.
+DICT_PREFIX = "zdict:"
+
+# Compression of the API cache entries written: 'none', 'zlib' or 'zstd',
+# at COMPRESSION_LEVEL (None: the default level of the algorithm); change
+# them with `set_compression`. Entries are read whatever their compression.
+COMPRESSION = "none"
+COMPRESSION_LEVEL = None
+
+# Tags of the compressed entries; plain JSON documents start with '{' or '['.
+_ZLIB = b"\x01"
+_ZSTD = b"\x02"
+
+# zstd compressors by endpoint, and decompressors by dictionary id (0 for
+# none), for the stores in use. Both use `_stores_lock`.
+_compressors = {}
+_decompressors = {}
+
+# Prefixes of the keys mapping each sprite to the git hash of its content,
+# and each hash to the first sprite seen with that content.
+SPRITE_HASH_PREFIX = "sprite-hash:"
+BLOB_PREFIX = "blob:"
+
+# Prefix of the keys holding the name <-> id index of each endpoint.
+INDEX_PREFIX = "index:"
+
+# Keys of the API cache store that are not entries.
+_INTERNAL_PREFIXES = (META_PREFIX, ACCESS_PREFIX, DICT_PREFIX, SPRITE_HASH_PREFIX, BLOB_PREFIX, INDEX_PREFIX)
+
+# Records of the API cache store other than its entries and their metadata:
+# they are never evicted, so not counted against its budget either.
+_UNBUDGETED_PREFIXES = (
+    ACCESS_PREFIX,
+    DICT_PREFIX,
+    SPRITE_HASH_PREFIX,
+    BLOB_PREFIX,
+    INDEX_PREFIX,
+    META_PREFIX + "sprite/",
+)
+
+# Indexes in use, by endpoint: (count, names -> ids, ids -> names).
+_indexes = {}
+
+# Byte budgets of the API and sprite stores (None: no limit), and how
+# entries are picked for eviction: 'lru' or 'lfu'; change them with
+# `set_size_limit`. Eviction stops below LOW_WATERMARK times the budget.
+MAX_API_BYTES = None
+MAX_SPRITE_BYTES = None
+EVICTION = "lru"
+LOW_WATERMARK = 0.9
+
+# Limits of the in-memory tier kept in front of the API cache; change them
+# with `set_memory_cache`.
+MEMORY_MAX_ENTRIES = 1024
+MEMORY_MAX_BYTES = 32 * 1024 * 1024
+
+# Encoded entries by cache key, least recently used first.
+_memory = OrderedDict()
+_memory_bytes = 0
+_memory_lock = threading.Lock()
+
+# Stores of the API cache and of the sprites, from `backends.BACKENDS`;
+# change them with `set_cache`.
+BACKEND = "shelve"
+SPRITE_BACKEND = "files"
+
+# Seconds between two flushes of the writes to the stores; change it with
+# `set_flush_interval`.
+FLUSH_INTERVAL = 1.0
+
+# The open stores, 'api' and 'sprite', kept between calls; see `_open_store`.
+_stores = {}
+_stores_flushed = {}
+_stores_pending = set()  # Stores with writes not flushed yet.
+_stores_used = {}  # When the stores locking their file were last used.
+_stores_lock = threading.RLock()
+_flush_timer = None
+_abandoned = []  # Stores inherited by a forked child; see `_after_fork_in_child`.
+
+# By store with a budget: {key: [last used, uses]} of its entries, loaded on
+# first use; and the estimated size of the store. Both use `_stores_lock`.
+_access = {}
+_access_changed = set()
+_sizes = {}
+
 # Cache locations will be set at the end of this file.
 CACHE_DIR = None
 API_CACHE = None
@@ -12,20 +118,34 @@ SPRITE_CACHE = None
 
 
 def save(data, endpoint, resource_id=None, subresource=None):
+    """Save an API cache entry.
+
+    :param data: the data, or the JSON document of the data as bytes, such
+    as the body of an API response, saved as it is
+    :return: None
+    """
 
-    if data == dict():  # No point in saving empty data.
+    if data == dict() or data == b"":  # No point in saving empty data.
         return None
 
-    if not isinstance(data, (dict, list)):
+    if not isinstance(data, (dict, list, bytes)):
         raise ValueError("Could not save non-dict data")
 
     uri = cache_uri_build(endpoint, resource_id, subresource)
+    value = data if isinstance(data, bytes) else codec.dumps(data)
+
+    if resource_id is None:
+        _list_saved(endpoint)
+
+    _memory_put(uri, value)
 
     try:
-        with shelve.open(API_CACHE) as cache:
-            cache[uri] = data
+        with _open_store("api", write=True) as store:
+            value = _compress(store, uri, value)
+            store.set(uri, value)
+            _written("api", uri, len(value))
     except OSError as error:
-        if error.errno == 11:  # Cache open by another person/program
+        if error.errno in (11, errno.EROFS):  # Cache open by another person/program, or read-only
             # print('Cache unavailable, skipping save')
             pass
         else:
@@ -34,16 +154,85 @@ def save(data, endpoint, resource_id=None, subresource=None):
     return None
 
 
+def save_many(entries, meta=None):
+    """Save many API cache entries with a single cache open.
+
+    :param entries: iterable of (data, endpoint, resource_id, subresource)
+    tuples; data may also be given already JSON-encoded, as bytes
+    :param meta: metadata saved along with every entry, such as the time it
+    was fetched (see `save_meta`)
+    :return: int, the number of entries saved
+    """
+
+    written = [0]
+    saved = [0]
+    uris = set()
+
+    def items(store):
+        for data, endpoint, resource_id, subresource in entries:
+            if not isinstance(data, bytes):
+                if not isinstance(data, (dict, list)):
+                    raise ValueError("Could not save non-dict data")
+                data = codec.dumps(data)
+
+            uri = cache_uri_build(endpoint, resource_id, subresource)
+            if resource_id is None:
+                _list_saved(endpoint)
+            _memory_put(uri, data)
+            _touch("api", uri)
+            data = _compress(store, uri, data)
+            written[0] += len(data)
+            saved[0] += 1
+            uris.add(uri)
+            yield uri, data
+
+            if meta is not None:
+                yield META_PREFIX + uri, meta
+
+    try:
+        with _open_store("api", write=True) as store:
+            store.set_many(items(store))
+            _written("api", None, written[0], keep=uris)
+            return saved[0]
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
+
+    return 0
+
+
 def save_sprite(data, sprite_type, sprite_id, **kwargs):
+    """Save a sprite.
+
+    Sprites are identified by the hash of their content: one identical to
+    a cached sprite shares its storage, where the backend can.
 
-    abs_path = data["path"]
+    :param data: dict with the image data
+    :return: None
+    """
 
-    # Make intermediate directories; this line removes the file+extension.
-    dirs = abs_path.rpartition(os.path.sep)[0]
-    safe_make_dirs(dirs)
+    key = sprite_filepath_build(sprite_type, sprite_id, **kwargs)
+    img_data = data["img_data"]
+    digest = sprite_hash(img_data)
 
-    with open(abs_path, "wb") as img_file:
-        img_file.write(data["img_data"])
+    try:
+        with _open_store("sprite", write=True) as store, _open_store("api", write=True) as api_store:
+            source = _blob_source(store, api_store, digest, key)
+            _drop_blob(api_store, key)
+
+            if source is not None:
+                store.link(key, source)
+                stored = 0
+            else:
+                store.set(key, img_data)
+                api_store.set(BLOB_PREFIX + digest, key)
+                stored = len(img_data)
+
+            api_store.set(SPRITE_HASH_PREFIX + key, digest)
+            _written("sprite", key, stored)
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
 
     return None
 
@@ -52,9 +241,14 @@ def load(endpoint, resource_id=None, subresource=None):
 
     uri = cache_uri_build(endpoint, resource_id, subresource)
 
+    value = _memory_get(uri)
+    if value is not None:
+        _touch("api", uri)
+        return codec.loads(value)
+
     try:
-        with shelve.open(API_CACHE) as cache:
-            return cache[uri]
+        with _open_store("api") as store:
+            value = _decompress(store, store.get(uri))
     except OSError as error:
         if error.errno == 11:
             # Cache open by another person/program
@@ -63,16 +257,1025 @@ def load(endpoint, resource_id=None, subresource=None):
         else:
             raise
 
+    if value is None:
+        raise KeyError(uri)
+
+    _touch("api", uri)
+
+    if isinstance(value, bytes):
+        _memory_put(uri, value)
+
+    return _decode(value)
+
+
+def load_many(endpoint, resource_ids, subresource=None):
+    """Load several resources of an endpoint with a single cache open.
+
+    :param endpoint: the endpoint of the resources
+    :param resource_ids: iterable of resource ids
+    :param subresource: load this subresource of each resource instead
+    :return: dict of resource id -> data, for the ids found in the cache
+    """
+
+    found = {}
+    uris = {}
+
+    for resource_id in resource_ids:
+        uri = cache_uri_build(endpoint, resource_id, subresource)
+        value = _memory_get(uri)
+
+        if value is None:
+            uris[resource_id] = uri
+        else:
+            _touch("api", uri)
+            found[resource_id] = codec.loads(value)
+
+    if not uris:
+        return found
+
+    try:
+        with _open_store("api") as store:
+            values = {uri: _decompress(store, value) for uri, value in store.get_many(uris.values()).items()}
+    except OSError as error:
+        if error.errno != 11:  # Cache open by another person/program
+            raise
+        values = {}
+
+    for resource_id, uri in uris.items():
+        if uri in values:
+            _touch("api", uri)
+            value = values[uri]
+            if isinstance(value, bytes):
+                _memory_put(uri, value)
+            found[resource_id] = _decode(value)
+
+    return found
+
+
+def _decode(value):
+    """Decode a cache entry; entries saved by older versions are not encoded."""
+
+    if isinstance(value, bytes):
+        return codec.loads(value)
+
+    return value
+
+
+def _compress(store, uri, value):
+    """Compress an API cache entry, as set with `set_compression`."""
+
+    if COMPRESSION == "zlib":
+        return _ZLIB + zlib.compress(value, -1 if COMPRESSION_LEVEL is None else COMPRESSION_LEVEL)
+
+    if COMPRESSION == "zstd":
+        endpoint = uri.split("/")[0]
+
+        if endpoint not in _compressors:
+            dict_id = store.get(DICT_PREFIX + endpoint)
+            dict_data = None
+            if dict_id is not None:
+                dict_data = zstd.ZstdCompressionDict(store.get(DICT_PREFIX + str(dict_id)))
+
+            _compressors[endpoint] = zstd.ZstdCompressor(
+                level=3 if COMPRESSION_LEVEL is None else COMPRESSION_LEVEL, dict_data=dict_data
+            )
+
+        return _ZSTD + _compressors[endpoint].compress(value)
+
+    return value
+
+
+def _decompress(store, value):
+    """Decompress an API cache entry read from the store."""
+
+    if not isinstance(value, bytes):
+        return value
+
+    tag = value[:1]
+
+    if tag == _ZLIB:
+        return zlib.decompress(value[1:])
+
+    if tag == _ZSTD:
+        if zstd is None:
+            raise ImportError("Reading zstd compressed cache entries requires zstandard")
+
+        dict_id = zstd.get_frame_parameters(value[1:]).dict_id
+
+        if dict_id not in _decompressors:
+            dict_data = None
+            if dict_id:
+                dict_data = zstd.ZstdCompressionDict(store.get(DICT_PREFIX + str(dict_id)))
+
+            _decompressors[dict_id] = zstd.ZstdDecompressor(dict_data=dict_data)
+
+        return _decompressors[dict_id].decompress(value[1:])
+
+    return value
+
+
+def set_compression(name=None, level=None):
+    """Change the compression of the API cache entries written.
+
+    Resources of an endpoint share most of their keys and urls, so their
+    entries compress several times over. Entries are decompressed as they
+    are read, whatever the compression they were written with; the memory
+    cache holds them decompressed.
+
+    With zstd, entries are compressed with the dictionary of their
+    endpoint, once trained with `train_dictionaries`.
+
+    :param name: 'zstd' (needs `zstandard` installed), 'zlib' or 'none'
+    (default). If None, zstd is used when installed, zlib otherwise.
+    :param level: compression level, defaults to the one of the algorithm
+    :return: str, the compression in use
+    """
+
+    global COMPRESSION, COMPRESSION_LEVEL
+
+    if name is None:
+        name = "zlib" if zstd is None else "zstd"
+
+    if name not in ("none", "zlib", "zstd") or (name == "zstd" and zstd is None):
+        raise ValueError("Unknown or uninstalled compression '{}'".format(name))
+
+    with _stores_lock:
+        COMPRESSION, COMPRESSION_LEVEL = name, level
+        _compressors.clear()
+
+    return COMPRESSION
+
+
+def train_dictionaries(endpoints=None, size=112640, samples=1000):
+    """Train a zstd dictionary for each endpoint from its cached entries,
+    and recompress them with it.
+
+    Endpoints with too few entries to train a dictionary are skipped.
+    Entries saved afterwards use the dictionary of their endpoint.
+
+    :param endpoints: endpoints to train, defaults to the cached ones
+    :param size: maximum size of each dictionary, in bytes
+    :param samples: maximum number of entries to train each dictionary on
+    :return: dict of endpoint -> number of entries recompressed
+    """
+
+    if COMPRESSION != "zstd":
+        raise ValueError("Dictionaries are only used with zstd compression, see `set_compression`")
+
+    counts = {}
+
+    with _open_store("api", write=True) as store:
+        if endpoints is None:
+            endpoints = sorted(
+                {key.split("/")[0] for key in store.iterate() if not key.startswith(_INTERNAL_PREFIXES)}
+            )
+
+        for endpoint in endpoints:
+            keys = store.iterate(endpoint + "/")
+            step = max(1, len(keys) // samples)
+            sample = [_decompress(store, store.get(key)) for key in keys[::step][:samples]]
+
+            try:
+                dictionary = zstd.train_dictionary(size, [value for value in sample if isinstance(value, bytes)])
+            except zstd.ZstdError:
+                continue
+
+            old_id = store.get(DICT_PREFIX + endpoint)
+            store.set(DICT_PREFIX + str(dictionary.dict_id()), dictionary.as_bytes())
+            store.set(DICT_PREFIX + endpoint, dictionary.dict_id())
+            _compressors.pop(endpoint, None)
+
+            with store.transaction():
+                for key in keys:
+                    value = _decompress(store, store.get(key))
+                    if isinstance(value, bytes):
+                        store.set(key, _compress(store, key, value))
+
+            if old_id is not None and old_id != dictionary.dict_id():
+                store.delete(DICT_PREFIX + str(old_id))
+                _decompressors.pop(old_id, None)
+
+            counts[endpoint] = len(keys)
+
+        _sizes.pop("api", None)
+
+    return counts
+
+
+def _make_store(name):
+    backend = BACKENDS[BACKEND if name == "api" else SPRITE_BACKEND]
+
+    return backend(os.path.join(CACHE_DIR, name + backend.EXTENSION))
+
+
+@contextmanager
+def _open_store(name, write=False):
+    """Use the store of the API cache ('api') or sprites ('sprite').
+
+    The store is opened on first use and kept open until `close`, and used
+    by one thread at a time. Writes are flushed to disk FLUSH_INTERVAL
+    seconds after the last flush at most, by a timer if no other write
+    comes, and when the store is closed.
+
+    A store that may lock its file, such as shelve with gdbm, is closed
+    once it has been idle for FLUSH_INTERVAL, and before forking, so other
+    processes are not kept out of it.
+    """
+
+    with _stores_lock:
+        store = _stores.get(name)
+
+        if store is None:
+            store = _stores[name] = _make_store(name)
+            _stores_flushed[name] = time.monotonic()
+
+        yield store
+
+        if write:
+            elapsed = time.monotonic() - _stores_flushed[name]
+
+            if elapsed >= FLUSH_INTERVAL:
+                store.sync()
+                _stores_flushed[name] = time.monotonic()
+                _stores_pending.discard(name)
+            else:
+                _stores_pending.add(name)
+                _schedule_flush(FLUSH_INTERVAL - elapsed)
+
+        if store.LOCKS_FILE:
+            _stores_used[name] = time.monotonic()
+            _schedule_flush(FLUSH_INTERVAL)
+
+
+def _schedule_flush(delay):
+    # One timer at a time, for the writes no later write flushes.
+    global _flush_timer
+
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(delay, _flush_pending)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _flush_pending():
+    global _flush_timer
+
+    with _stores_lock:
+        _flush_timer = None
+
+        while _stores_pending:
+            name = _stores_pending.pop()
+            if name in _stores:
+                _stores[name].sync()
+                _stores_flushed[name] = time.monotonic()
+
+        # Release the files of the idle stores that lock them; the others
+        # are checked again once they could be idle.
+        for name, used in list(_stores_used.items()):
+            idle = time.monotonic() - used
+
+            if idle >= FLUSH_INTERVAL:
+                _close_store(name)
+            else:
+                _schedule_flush(FLUSH_INTERVAL - idle)
+
+
+def _close_store(name):
+    store = _stores.pop(name, None)
+    _stores_pending.discard(name)
+    _stores_used.pop(name, None)
+
+    if store is not None:
+        store.close()
+
+
+def flush():
+    """Write the pending changes of the cache to disk.
+
+    :return: None
+    """
+
+    with _stores_lock:
+        _save_access()
+
+        for name, store in _stores.items():
+            store.sync()
+            _stores_flushed[name] = time.monotonic()
+
+        _stores_pending.clear()
+
+    return None
+
+
+def close():
+    """Close the cache stores, writing their pending changes to disk.
+
+    They are reopened on next use. Done at exit, and by `set_cache`.
+
+    :return: None
+    """
+
+    with _stores_lock:
+        _save_access()
+        _access.clear()
+        _sizes.clear()
+        _compressors.clear()
+        _decompressors.clear()
+        _indexes.clear()
+
+        while _stores:
+            _close_store(next(iter(_stores)))
+
+    return None
+
+
+def stats():
+    """Get the number of entries, and their total size, of each store.
+
+    :return: dict of store ('api' or 'sprite') -> dict with `entries` and
+    `bytes`
+    """
+
+    result = {}
+
+    for name in ("api", "sprite"):
+        with _open_store(name) as store:
+            result[name] = store.stats()
+
+    return result
+
+
+def snapshot(path=None):
+    """Write the API cache to a snapshot file, for the 'mmap' backend.
+
+    Build the snapshot once, then ship it to hosts that only read the
+    cache, using `set_cache(backend='mmap')`.
+
+    :param path: path of the snapshot file, defaults to the one the 'mmap'
+    backend uses in the cache directory
+    :return: int, the number of entries written
+    """
+
+    if path is None:
+        path = os.path.join(CACHE_DIR, "api" + MmapStore.EXTENSION)
+
+    with _open_store("api") as store:
+        store.sync()
+        return MmapStore.write(path, ((key, store.get(key)) for key in store.iterate()))
+
+
+def _limit(name):
+    return (MAX_API_BYTES if name == "api" else MAX_SPRITE_BYTES) or None
+
+
+def _access_table(name):
+    if name not in _access:
+        try:
+            with _open_store("api") as store:
+                _access[name] = store.get(ACCESS_PREFIX + name) or {}
+        except OSError as error:
+            if error.errno != 11:  # Cache open by another person/program
+                raise
+            _access[name] = {}
+
+    return _access[name]
+
+
+def _touch(name, key):
+    """Record a use of an entry, for the stores with a budget."""
+
+    if _limit(name) is None:
+        return None
+
+    with _stores_lock:
+        record = _access_table(name).setdefault(key, [0.0, 0])
+        record[0] = time.time()
+        record[1] += 1
+        _access_changed.add(name)
+
+    return None
+
+
+def _written(name, key, size, keep=()):
+    """Account for a write to a store, and keep the store within budget.
+
+    The entry written, and those in `keep`, are not evicted.
+    """
+
+    limit = _limit(name)
+
+    if limit is None:
+        return None
+
+    if key is not None:
+        _touch(name, key)
+        keep = {key}
+
+    with _stores_lock:
+        if name not in _sizes:
+            with _open_store(name) as store:
+                _sizes[name] = _budgeted_bytes(name, store)
+        else:
+            _sizes[name] += size  # Overwrites are counted twice, until `evict` measures.
+
+        if _sizes[name] > limit:
+            _evict(name, limit, keep)
+
+    return None
+
+
+def _budgeted_bytes(name, store):
+    """Size of the entries of a store and their metadata, as counted
+    against its budget.
+    """
+
+    total = store.stats()["bytes"]
+
+    if name == "api":
+        total -= sum(store.size(key) for key in store.iterate() if key.startswith(_UNBUDGETED_PREFIXES))
+
+    return total
+
+
+def _save_access():
+    for name in list(_access_changed):
+        try:
+            with _open_store("api", write=True) as store:
+                if _access[name]:
+                    store.set(ACCESS_PREFIX + name, _access[name])
+                else:
+                    store.delete(ACCESS_PREFIX + name)
+        except OSError as error:
+            if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+                raise
+
+        _access_changed.discard(name)
+
+
+def set_size_limit(api_bytes=None, sprite_bytes=None, policy=None):
+    """Change the byte budgets of the API cache and sprite stores.
+
+    When a write takes a store over its budget, entries (with their
+    metadata) are evicted until it is back under LOW_WATERMARK times the
+    budget: the least recently used ones with the 'lru' policy, the least
+    often used ones with 'lfu'. Arguments left as None keep their current
+    value; set a budget to 0 to remove it. Only the entries and their
+    metadata are counted: the other records of the API cache store, such as
+    the access records and the endpoint indexes, are not.
+
+    Evicted entries leave space in the files of some backends; reclaim it
+    with `compact`.
+
+    :param api_bytes: budget of the API cache store
+    :param sprite_bytes: budget of the sprite store
+    :param policy: 'lru' or 'lfu'
+    :return: int or None, int or None, str
+    """
+
+    global MAX_API_BYTES, MAX_SPRITE_BYTES, EVICTION
+
+    if policy is not None:
+        if policy not in ("lru", "lfu"):
+            raise ValueError("Unknown eviction policy '{}'".format(policy))
+        EVICTION = policy
+
+    with _stores_lock:
+        if api_bytes is not None:
+            MAX_API_BYTES = api_bytes or None
+        if sprite_bytes is not None:
+            MAX_SPRITE_BYTES = sprite_bytes or None
+
+        _sizes.clear()
+
+    return MAX_API_BYTES, MAX_SPRITE_BYTES, EVICTION
+
+
+def evict(name=None, max_bytes=None):
+    """Evict entries from a store until it fits its budget.
+
+    Done on its own when writes take a store over its budget; see
+    `set_size_limit`.
+
+    :param name: 'api' or 'sprite', None for both
+    :param max_bytes: budget to apply, defaults to the one set with
+    `set_size_limit`
+    :return: int, the number of entries evicted
+    """
+
+    evicted = 0
+
+    for store_name in [name] if name else ["api", "sprite"]:
+        limit = max_bytes if max_bytes is not None else _limit(store_name)
+        if limit is not None:
+            evicted += _evict(store_name, limit)
+
+    return evicted
+
+
+def _evict(name, limit, keep=()):
+    """Evict entries from a store, but those in `keep`, until it fits
+    `limit`.
+
+    :return: int, the number of entries evicted
+    """
+
+    evicted = 0
+
+    with _open_store(name, write=True) as store:
+        total = _budgeted_bytes(name, store)
+        if total <= limit:
+            _sizes[name] = total
+            return 0
+
+        access = _access_table(name)
+        keys = [key for key in store.iterate() if key not in keep]
+        if name == "api":
+            keys = [key for key in keys if not key.startswith(_INTERNAL_PREFIXES)]
+
+        if EVICTION == "lfu":
+            keys.sort(key=lambda key: access.get(key, [0.0, 0])[::-1])
+        else:
+            keys.sort(key=lambda key: access.get(key, [0.0, 0])[0])
+
+        for key in keys:
+            if total <= limit * LOW_WATERMARK:
+                break
+
+            total -= store.size(key)
+            store.delete(key)
+            access.pop(key, None)
+
+            if name == "api":
+                _memory_drop(key)
+                meta_key = META_PREFIX + key
+            else:
+                meta_key = META_PREFIX + "sprite/" + key
+
+            with _open_store("api", write=True) as api_store:
+                if name == "api":
+                    total -= api_store.size(meta_key)
+                else:
+                    _drop_blob(api_store, key)
+                api_store.delete(meta_key)
+
+            evicted += 1
+
+        _sizes[name] = total
+        _access_changed.add(name)
+
+    _save_access()
+
+    return evicted
+
+
+def compact(name=None):
+    """Rewrite the stores without the space left by replaced and evicted
+    entries; dbm files, in particular, never shrink by themselves.
+
+    Other processes must not use the cache meanwhile.
+
+    :param name: 'api' or 'sprite', None for both
+    :return: dict of store -> dict with `entries` and `bytes`, after
+    """
+
+    for store_name in [name] if name else ["api", "sprite"]:
+        with _open_store(store_name, write=True) as store:
+            _save_access()
+            store.compact()
+
+    return stats()
+
+
+def delete(endpoint, resource_id=None, subresource=None):
+    """Remove an entry, and its metadata, from the API cache.
+
+    :return: bool, whether the entry was cached
+    """
+
+    uri = cache_uri_build(endpoint, resource_id, subresource)
+
+    invalidate(endpoint, resource_id, subresource)
+
+    with _open_store("api", write=True) as store:
+        store.delete(META_PREFIX + uri)
+        return store.delete(uri)
+
+
+def load_index(endpoint):
+    """Get the name <-> id index of an endpoint, built by `build_index`.
+
+    :return: (count, dict of name -> id, dict of id -> name), or None if
+    the index was not built, or is out of date
+    """
+
+    index = _indexes.get(endpoint)
+
+    if index is None:
+        try:
+            with _open_store("api") as store:
+                saved = store.get(INDEX_PREFIX + endpoint)
+        except OSError as error:
+            if error.errno != 11:  # Cache open by another person/program
+                raise
+            saved = None
+
+        if saved is None:
+            return None
+
+        index = _indexes[endpoint] = _make_index(saved["count"], saved["entries"])
+
+    return index
+
+
+def build_index(endpoint, data):
+    """Build the name <-> id index of an endpoint from its list, and save it.
+
+    Resources without a name are indexed by their id as a string. The index
+    is dropped when the list is saved again.
+
+    :param data: the list of the endpoint, with `count` and `results`
+    :return: the index, as `load_index`
+    """
+
+    entries = [
+        [int(resource["url"].split("/")[-2]), resource.get("name")] for resource in data["results"]
+    ]
+
+    index = _indexes[endpoint] = _make_index(data["count"], entries)
+
+    try:
+        with _open_store("api", write=True) as store:
+            store.set(INDEX_PREFIX + endpoint, dict(count=data["count"], entries=entries))
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
+
+    return index
+
+
+def drop_index(endpoint=None):
+    """Drop the name <-> id index of an endpoint.
+
+    :param endpoint: None for every endpoint
+    :return: None
+    """
+
+    with _stores_lock:
+        if endpoint is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(endpoint, None)
+
+        try:
+            with _open_store("api", write=True) as store:
+                if endpoint is None:
+                    for key in store.iterate(INDEX_PREFIX):
+                        store.delete(key)
+                else:
+                    store.delete(INDEX_PREFIX + endpoint)
+        except OSError as error:
+            if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+                raise
+
+    return None
+
+
+def _make_index(count, entries):
+    names = {name: id_ for id_, name in entries if name is not None}
+    ids = {id_: str(id_) if name is None else name for id_, name in entries}
+
+    return count, names, ids
+
+
+def _list_saved(endpoint):
+    """Drop the index of an endpoint, as its list changed."""
+
+    if load_index(endpoint) is not None:
+        drop_index(endpoint)
+
+
+def set_flush_interval(seconds):
+    """Change how often writes to the cache are flushed to disk.
+
+    Until they are, the writes may be lost if the process is killed, and
+    are not seen by other processes using the cache.
+
+    :param seconds: seconds between two flushes, 0 to flush every write
+    :return: float
+    """
+
+    global FLUSH_INTERVAL
+
+    with _stores_lock:
+        FLUSH_INTERVAL = seconds
+
+        # A timer set for the former interval flushes now instead.
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_pending()
+
+    return FLUSH_INTERVAL
+
+
+def _before_fork():
+    # Hold the stores while forking, with their writes flushed, so the
+    # child does not inherit them in the middle of a change.
+    _stores_lock.acquire()
+
+    for name, store in list(_stores.items()):
+        if store.LOCKS_FILE:
+            _close_store(name)  # The child could not open it otherwise.
+        else:
+            store.sync()
+
+
+def _after_fork_in_parent():
+    _stores_lock.release()
+
+
+def _after_fork_in_child():
+    """Drop the inherited stores in a forked child.
+
+    They are abandoned rather than closed, and kept referenced so they are
+    never closed: the parent still uses their files. The child opens its
+    own on first use.
+    """
+
+    global _stores_lock, _memory_lock, _flush_timer
+
+    _abandoned.extend(_stores.values())
+    _stores.clear()
+    _stores_pending.clear()
+    _stores_used.clear()
+    _flush_timer = None  # Its thread is gone.
+
+    _stores_lock = threading.RLock()
+    _memory_lock = threading.Lock()
+
+
+def _memory_get(uri):
+    with _memory_lock:
+        value = _memory.get(uri)
+        if value is not None:
+            _memory.move_to_end(uri)
+
+    return value
+
+
+def _memory_put(uri, value):
+    global _memory_bytes
+
+    with _memory_lock:
+        if uri in _memory:
+            _memory_bytes -= len(_memory.pop(uri))
+
+        if len(value) > MEMORY_MAX_BYTES or not MEMORY_MAX_ENTRIES:
+            return None
+
+        _memory[uri] = value
+        _memory_bytes += len(value)
+
+        while len(_memory) > MEMORY_MAX_ENTRIES or _memory_bytes > MEMORY_MAX_BYTES:
+            _memory_bytes -= len(_memory.popitem(last=False)[1])
+
+    return None
+
+
+def invalidate(endpoint, resource_id=None, subresource=None):
+    """Drop an entry from the in-memory tier, so it is next read from disk.
+
+    Use it when another process may have changed the entry on disk.
+
+    :return: None
+    """
+
+    _memory_drop(cache_uri_build(endpoint, resource_id, subresource))
+
+    return None
+
+
+def _memory_drop(uri):
+    global _memory_bytes
+
+    with _memory_lock:
+        if uri in _memory:
+            _memory_bytes -= len(_memory.pop(uri))
+
+
+def clear_memory():
+    """Drop every entry from the in-memory tier.
+
+    :return: None
+    """
+
+    global _memory_bytes
+
+    with _memory_lock:
+        _memory.clear()
+        _memory_bytes = 0
+
+    return None
+
+
+def set_memory_cache(max_entries=None, max_bytes=None):
+    """Change the limits of the in-memory tier of the API cache.
+
+    Recently used entries are kept in memory, as their encoded JSON, and
+    served without opening the cache on disk; the least recently used ones
+    are dropped past either limit. Writes go to both tiers. Arguments left
+    as None keep their current value; set `max_entries` to 0 to turn the
+    tier off.
+
+    :param max_entries: maximum number of entries kept in memory
+    :param max_bytes: maximum total size of the entries kept in memory
+    :return: int, int
+    """
+
+    global MEMORY_MAX_ENTRIES, MEMORY_MAX_BYTES
+
+    if max_entries is not None:
+        MEMORY_MAX_ENTRIES = max_entries
+    if max_bytes is not None:
+        MEMORY_MAX_BYTES = max_bytes
+
+    clear_memory()
+
+    return MEMORY_MAX_ENTRIES, MEMORY_MAX_BYTES
+
+
+def save_meta(meta, endpoint, resource_id=None, subresource=None):
+    """Save the metadata of an API cache entry.
+
+    :param meta: dict of metadata, such as the response validators
+    :return: None
+    """
+
+    _save_meta(meta, cache_uri_build(endpoint, resource_id, subresource))
+
+    return None
+
+
+def load_meta(endpoint, resource_id=None, subresource=None):
+    """Load the metadata of an API cache entry.
+
+    :return: dict of metadata, empty if none was saved
+    """
+
+    return _load_meta(cache_uri_build(endpoint, resource_id, subresource))
+
+
+def save_sprite_meta(meta, sprite_type, sprite_id, **kwargs):
+    """Save the metadata of a cached sprite.
+
+    :param meta: dict of metadata, such as the response validators
+    :return: None
+    """
+
+    _save_meta(meta, "/".join(["sprite", sprite_filepath_build(sprite_type, sprite_id, **kwargs)]))
+
+    return None
+
+
+def load_sprite_meta(sprite_type, sprite_id, **kwargs):
+    """Load the metadata of a cached sprite.
+
+    :return: dict of metadata, empty if none was saved
+    """
+
+    return _load_meta("/".join(["sprite", sprite_filepath_build(sprite_type, sprite_id, **kwargs)]))
+
+
+def _save_meta(meta, key):
+    try:
+        with _open_store("api", write=True) as store:
+            store.set(META_PREFIX + key, meta)
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
+
+
+def _load_meta(key):
+    try:
+        with _open_store("api") as store:
+            return store.get(META_PREFIX + key, {})
+    except OSError as error:
+        if error.errno != 11:  # Cache open by another person/program
+            raise
+
+    return {}
+
+
+def load_sprite(sprite_type, sprite_id, zero_copy=False, **kwargs):
+    """Load a cached sprite.
+
+    :param zero_copy: get the image data as a read-only memoryview; the
+    'pack' backend then hands out a view of its mapping, without copying
+    :return: dict with the image data and its cache path
+    """
 
-def load_sprite(sprite_type, sprite_id, **kwargs):
     abs_path = get_sprite_path(sprite_type, sprite_id, **kwargs)
 
-    with open(abs_path, "rb") as img_file:
-        img_data = img_file.read()
+    key = sprite_filepath_build(sprite_type, sprite_id, **kwargs)
+
+    with _open_store("sprite") as store:
+        img_data = store.view(key) if zero_copy else store.get(key)
+
+        # Not cached, but known to be identical to a cached sprite.
+        if img_data is None and _link_sprite(store, key):
+            img_data = store.view(key) if zero_copy else store.get(key)
+
+    if img_data is None:
+        raise FileNotFoundError(errno.ENOENT, "Sprite not in the cache", abs_path)
+
+    _touch("sprite", key)
 
     return dict(img_data=img_data, path=abs_path)
 
 
+def sprite_hash(img_data):
+    """Hash the content of a sprite, the way git does.
+
+    :return: str, the hex SHA-1 of the git blob of the content
+    """
+
+    return hashlib.sha1(b"blob %d\0" % len(img_data) + img_data).hexdigest()
+
+
+def _link_sprite(store, key):
+    """Fill in a sprite from a cached one with the same hash, if any.
+
+    :return: bool, whether it was
+    """
+
+    try:
+        with _open_store("api") as api_store:
+            digest = api_store.get(SPRITE_HASH_PREFIX + key)
+            source = None if digest is None else _blob_source(store, api_store, digest, key)
+
+        if source is None:
+            return False
+
+        store.link(key, source)
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
+        return False
+
+    return True
+
+
+def _blob_source(store, api_store, digest, key):
+    """Get the cached sprite to link `key` to, for its hash.
+
+    :return: the key of the sprite, or None if there is none, or if its
+    image was replaced since
+    """
+
+    source = api_store.get(BLOB_PREFIX + digest)
+
+    if source is None or source == key or source not in store:
+        return None
+
+    if api_store.get(SPRITE_HASH_PREFIX + source) != digest:
+        return None
+
+    return source
+
+
+def _drop_blob(api_store, key):
+    # Called before the image of `key` is replaced or evicted, so no other
+    # sprite is linked to it for its former hash.
+    digest = api_store.get(SPRITE_HASH_PREFIX + key)
+
+    if digest is not None and api_store.get(BLOB_PREFIX + digest) == key:
+        api_store.delete(BLOB_PREFIX + digest)
+
+
+def save_sprite_hashes(hashes):
+    """Record the hashes of sprites before they are fetched, such as those
+    of the tree of the sprites repository (see
+    `pokebase.api.fetch_sprite_hashes`).
+
+    A sprite with the hash of a cached one is then loaded from the cache,
+    without a request: many variants of a sprite are the same image.
+
+    :param hashes: iterable of (path, hash) pairs, the path of the sprite
+    relative to SPRITE_CACHE and its git hash (see `sprite_hash`)
+    :return: int, the number of hashes saved
+    """
+
+    try:
+        with _open_store("api", write=True) as store:
+            return store.set_many(
+                (SPRITE_HASH_PREFIX + os.path.join(*path.split("/")), digest) for path, digest in hashes
+            )
+    except OSError as error:
+        if error.errno not in (11, errno.EROFS):  # Cache open by another person/program, or read-only
+            raise
+
+    return 0
+
+
 def safe_make_dirs(path, mode=0o777):
     """Create a leaf directory and all intermediate ones in a safe way.
 
@@ -115,32 +1318,64 @@ def get_sprite_path(sprite_type, sprite_id, **kwargs):
     return abs_path
 
 
-def set_cache(new_path=None):
+def set_cache(new_path=None, backend=None, sprite_backend=None):
     """Simple function to change the cache location.
 
     `new_path` can be an absolute or relative path. If the directory does not
     exist yet, this function will create it. If None it will set the cache to
     the default cache directory.
 
+    The API cache is stored with `shelve` by default, and sprites as files.
+    Other backends, from `pokebase.backends`, fit other deployments:
+    'sqlite' when several processes share the cache, such as the workers of
+    a web server; 'memory' for tests and short-lived processes; 'mmap' for
+    hosts that only read a snapshot made with `snapshot`; 'pack' for many
+    sprites, packed in a single file.
+
     If you are going to change the cache directory, this function should be
     called at the top of your script, before you make any calls to the API.
     This is to avoid duplicate files and excess API calls.
 
     :param new_path: relative or absolute path to the desired new cache
     directory
+    :param backend: backend of the API cache: 'shelve', 'sqlite', 'memory'
+    or 'mmap', None to keep the current one
+    :param sprite_backend: backend of the sprites: 'files', 'pack' or one
+    of the above, None to keep the current one
     :return: str, str
     """
 
-    global CACHE_DIR, API_CACHE, SPRITE_CACHE
+    global CACHE_DIR, API_CACHE, SPRITE_CACHE, BACKEND, SPRITE_BACKEND
 
     if new_path is None:
         new_path = get_default_cache()
 
+    # Files are named after the cache keys, which API keys are not fit for.
+    if backend is not None and (backend not in BACKENDS or backend == "files"):
+        raise ValueError("Unknown cache backend '{}'".format(backend))
+    if sprite_backend is not None and sprite_backend not in BACKENDS:
+        raise ValueError("Unknown cache backend '{}'".format(sprite_backend))
+
+    close()
+    clear_memory()
+
+    BACKEND = backend or BACKEND
+    SPRITE_BACKEND = sprite_backend or SPRITE_BACKEND
+
     CACHE_DIR = safe_make_dirs(os.path.abspath(new_path))
-    API_CACHE = os.path.join(CACHE_DIR, "api.cache")
+    API_CACHE = os.path.join(CACHE_DIR, "api" + BACKENDS[BACKEND].EXTENSION)
     SPRITE_CACHE = safe_make_dirs(os.path.join(CACHE_DIR, "sprite"))
 
     return CACHE_DIR, API_CACHE, SPRITE_CACHE
 
 
 CACHE_DIR, API_CACHE, SPRITE_CACHE = set_cache()
+
+atexit.register(close)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
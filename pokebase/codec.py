@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+# The codec in use, set at the end of this file. As with the cache
+# constants, use them through the module (`codec.loads`), so `set_codec`
+# is taken into account.
+NAME = None
+loads = None
+dumps = None
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _ujson_dumps(obj):
+    return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# orjson only handles 64-bit integers: it rounds bigger ones to floats when
+# decoding, and refuses them when encoding. Such documents, rare as they
+# are, go through the standard library instead.
+_BIG_INTEGER = re.compile(rb"\d{20}")
+
+
+def _orjson_loads(data):
+    if _BIG_INTEGER.search(data):
+        return _json_loads(data)
+
+    return orjson.loads(data)
+
+
+def _orjson_dumps(obj):
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        return _json_dumps(obj)
+
+
+CODECS = {"json": (_json_loads, _json_dumps)}
+
+if ujson is not None:
+    CODECS["ujson"] = (ujson.loads, _ujson_dumps)
+
+if orjson is not None:
+    CODECS["orjson"] = (_orjson_loads, _orjson_dumps)
+
+
+def set_codec(name=None):
+    """Change the JSON codec used to decode responses and cache entries.
+
+    Both functions of a codec work on bytes: `loads` decodes a UTF-8
+    encoded document straight from bytes, `dumps` returns UTF-8 bytes.
+
+    :param name: 'orjson', 'ujson' or 'json'. If None, the fastest one
+    installed is used, in that order.
+    :return: str, the name of the codec in use
+    """
+
+    global NAME, loads, dumps
+
+    if name is None:
+        name = next(codec for codec in ("orjson", "ujson", "json") if codec in CODECS)
+
+    if name not in CODECS:
+        raise ValueError("Unknown or uninstalled JSON codec '{}'".format(name))
+
+    NAME = name
+    loads, dumps = CODECS[name]
+
+    return NAME
+
+
+set_codec()
@@ -4,6 +4,7 @@ import os
 
 BASE_URL = "http://pokeapi.co/api/v2"
 SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites"
+SPRITE_TREE_URL = "https://api.github.com/repos/PokeAPI/sprites/git/trees/master?recursive=1"
 ENDPOINTS = [
     "ability",
     "berry",
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tarfile
+import time
+import zipfile
+
+from . import cache
+from .common import BASE_URL, ENDPOINTS
+
+# The dump links resources with urls relative to the server root; they are
+# made absolute, as in the responses of the API itself.
+_RELATIVE_URL = b'"/api/v2/'
+_ABSOLUTE_URL = '"{}/'.format(BASE_URL).encode("utf-8")
+
+
+def _parse_path(path):
+    """Get the cache location of a file of the dump, from its path.
+
+    Files are laid out as the API urls: `<...>/api/v2/<endpoint>/index.json`
+    for the lists, `<...>/api/v2/<endpoint>/<id>/index.json` for the
+    resources, and `<...>/api/v2/<endpoint>/<id>/<subresource>/index.json`.
+
+    :return: (endpoint, resource_id, subresource), or None for the files
+    that do not map to a cache entry
+    """
+
+    parts = path.replace(os.sep, "/").split("/")
+
+    if parts[-1] != "index.json":
+        return None
+
+    for i in range(len(parts) - 2, -1, -1):
+        if parts[i:i + 2] == ["api", "v2"]:
+            parts = parts[i + 2:-1]
+            break
+    else:
+        return None
+
+    if not parts or len(parts) > 3 or parts[0] not in ENDPOINTS:
+        return None
+
+    endpoint, resource_id, subresource = (parts + [None, None])[:3]
+
+    if resource_id is not None:
+        if not resource_id.isdigit():
+            return None
+        resource_id = int(resource_id)
+
+    return endpoint, resource_id, subresource
+
+
+def _iter_directory(path):
+    for dirpath, _, filenames in os.walk(path):
+        if "index.json" in filenames:
+            file_path = os.path.join(dirpath, "index.json")
+            with open(file_path, "rb") as json_file:
+                yield os.path.relpath(file_path, path), json_file.read()
+
+
+def _iter_zip(path):
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.endswith("index.json"):
+                yield name, archive.read(name)
+
+
+def _iter_tar(path):
+    # Read as a stream: compressed archives are not seeked back and forth.
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and member.name.endswith("index.json"):
+                yield member.name, archive.extractfile(member).read()
+
+
+def _iter_files(path):
+    if os.path.isdir(path):
+        return _iter_directory(path)
+    if zipfile.is_zipfile(path):
+        return _iter_zip(path)
+    if tarfile.is_tarfile(path):
+        return _iter_tar(path)
+
+    raise ValueError("'{}' is not a directory, zip or tar archive".format(path))
+
+
+def import_dump(path, endpoints=None):
+    """Import a static dump of the API into the cache, without any request.
+
+    The dump is a tree of JSON files laid out as the API urls, such as
+    the `data` directory of https://github.com/PokeAPI/api-data, given as a
+    directory or a zip or tar archive. Its files are stored as they are,
+    without decoding them, in a single write to the cache. They count as
+    fetched at the time of the import for the TTLs (see `api.set_ttl`).
+
+    :param path: path of the directory or archive
+    :param endpoints: only import these endpoints, defaults to all of them
+    :return: dict of endpoint -> number of entries imported
+    """
+
+    if endpoints is not None:
+        for endpoint in endpoints:
+            if endpoint not in ENDPOINTS:
+                raise ValueError("Unknown API endpoint '{}'".format(endpoint))
+
+    counts = {}
+
+    def entries():
+        for name, content in _iter_files(path):
+            location = _parse_path(name)
+
+            if location is None or (endpoints is not None and location[0] not in endpoints):
+                continue
+
+            counts[location[0]] = counts.get(location[0], 0) + 1
+
+            yield (content.strip().replace(_RELATIVE_URL, _ABSOLUTE_URL),) + location
+
+    cache.save_many(entries(), meta={"fetched": time.time()})
+
+    return counts
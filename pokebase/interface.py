@@ -1,10 +1,85 @@
 # -*- coding: utf-8 -*-
 
-from .api import get_data, get_sprite
-from .common import api_url_build, sprite_url_build
+import re
+import weakref
+from types import MappingProxyType
 
+from .api import get_data, get_many, get_sprite, iter_pages
+from .cache import build_index, load_index
+from .common import ENDPOINTS, api_url_build, sprite_url_build, validate
 
-def _make_obj(obj):
+# Shared by the instances that have no data or custom values yet.
+_EMPTY = MappingProxyType({})
+
+# Model classes, made on first use: one per endpoint, and one per name and
+# keys of the nested data.
+_resource_classes = {}
+_metadata_classes = {}
+
+# The references to a resource, as found in the data of others, share one
+# instance while it is in use; see `APIResource.from_reference`.
+_references = weakref.WeakValueDictionary()
+
+# Returned when there is no raw value to convert.
+_MISSING = object()
+
+
+def _class_name(name):
+    # 'pokemon-species' -> 'PokemonSpecies'
+    return "".join(word.capitalize() for word in re.split("[-_]", name))
+
+
+def _singular(name):
+    # 'version_group_details' -> 'version_group_detail'
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def _resource_class(endpoint):
+    """Model class of the resources of an endpoint, ex. `Pokemon`.
+
+    The classes only add a name to APIResource; instances are made of them
+    when the endpoint is known, APIResource itself otherwise.
+    """
+
+    if endpoint not in ENDPOINTS:
+        return APIResource
+
+    try:
+        return _resource_classes[endpoint]
+    except KeyError:
+        cls = type(_class_name(endpoint), (APIResource,), {"__slots__": (), "__module__": __name__})
+        return _resource_classes.setdefault(endpoint, cls)
+
+
+def _metadata_class(name, keys):
+    """Model class of the nested data found under the attribute `name` with
+    the given keys, ex. `VersionGroupDetail`.
+
+    The class has a slot for each key, so its instances need no `__dict__`
+    for the data. Data whose keys cannot be slots is left to APIMetadata.
+    """
+
+    if name is None:
+        return APIMetadata
+
+    try:
+        return _metadata_classes[name, keys]
+    except KeyError:
+        pass
+
+    if all(key.isidentifier() and not key.startswith("_") and not hasattr(APIMetadata, key) for key in keys):
+        cls = type(_class_name(name), (APIMetadata,), {"__slots__": keys, "__module__": __name__, "_name": name})
+    else:
+        cls = APIMetadata
+
+    return _metadata_classes.setdefault((name, keys), cls)
+
+
+def _make_obj(obj, name=None):
     """Takes an object and returns a corresponding API class.
 
     The names and values of the data will match exactly with those found
@@ -13,6 +88,7 @@ def _make_obj(obj):
     the input value is simply returned, unchanged.
 
     :param obj: the object to be converted
+    :param name: the attribute holding the object, names its model class
     :return either the same value, if it does not need to be converted, or a
     APIResource or APIMetadata instance, depending on the data inputted.
     """
@@ -30,15 +106,49 @@ def _make_obj(obj):
             url = obj["url"]
             id_ = int(url.split("/")[-2])  # ID of the data.
             endpoint = url.split("/")[-3]  # Where the data is located.
-            return APIResource(endpoint, id_, lazy_load=True)
+            return APIResource.from_reference(endpoint, id_, obj.get("name"))
         if all(k in obj for k in ("other", "back_default")):
             obj = change_sprite_key(obj)  # Change hyphens in sprite keys to underscores
 
-        return APIMetadata(obj)
+        return _metadata_class(name, tuple(obj))(obj)
 
     return obj
 
 
+def _convert(val, name=None):
+    """Convert a raw value of the data, as `_make_obj` does, applying it to
+    every item of the lists.
+    """
+
+    if isinstance(val, list):
+        name = name and _singular(name)
+        return [_make_obj(i, name) for i in val]
+
+    return _make_obj(val, name)
+
+
+def _resource(endpoint, id_, name=None, custom=None, values=None):
+    """Rebuild a pickled APIResource, see `APIResource.__reduce__`."""
+
+    if not custom and values is None:
+        return APIResource.from_reference(endpoint, id_, name)
+
+    resource = APIResource._reference(endpoint, id_, name)
+
+    if custom:
+        resource._custom = custom
+    if values is not None:
+        resource._set_values(values)
+
+    return resource
+
+
+def _metadata(name, keys, data, raw):
+    """Rebuild a pickled APIMetadata, see `APIMetadata.__reduce__`."""
+
+    return _metadata_class(name, keys)(data, raw)
+
+
 def name_id_convert(endpoint, name_or_id):
     if isinstance(name_or_id, int):
         id_ = name_or_id
@@ -54,26 +164,64 @@ def name_id_convert(endpoint, name_or_id):
     return name, id_
 
 
-def _convert_id_to_name(endpoint, id_):
-    resource_data = get_data(endpoint)["results"]
+def _index(endpoint, key, position):
+    """Look a name or id up in the index of an endpoint (see
+    `cache.build_index`), built from the endpoint list on first use.
+
+    On a miss, the list is got again, within its TTL: if it was fetched
+    again since, or its count changed, the index is rebuilt and the lookup
+    retried.
 
-    for resource in resource_data:
-        if resource["url"].split("/")[-2] == str(id_):
+    :param position: 1 to look a name up, 2 for an id
+    """
+
+    index = load_index(endpoint)
+
+    if index is None:
+        index = build_index(endpoint, get_data(endpoint))
+
+    if key not in index[position]:
+        data = get_data(endpoint)
+        if load_index(endpoint) is None or data["count"] != index[0]:
+            index = build_index(endpoint, data)
 
-            # Return the matching name, or id_ if it doesn't exsist.
-            return resource.get("name", str(id_))
+    return index[position].get(key)
 
-    return None
+
+def _convert_id_to_name(endpoint, id_):
+    # The name, or the id as a string if the resource has no name.
+    return _index(endpoint, id_, 2)
 
 
 def _convert_name_to_id(endpoint, name):
-    resource_data = get_data(endpoint)["results"]
+    return _index(endpoint, name, 1)
 
-    for resource in resource_data:
-        if resource.get("name") == name:
-            return int(resource.get("url").split("/")[-2])
 
-    return None
+def get_resources(endpoint, names_or_ids, max_workers=None, ordered=True, **kwargs):
+    """Batch counterpart of `APIResource`.
+
+    Names are converted to ids up front, then the resources missing from the
+    cache are fetched in parallel (see `api.get_many`) and each one is built
+    from the cache.
+
+    :param endpoint: the endpoint of the resources (ex. 'berry' or 'move')
+    :param names_or_ids: iterable of names or ids of the resources
+    :param max_workers: maximum number of concurrent requests
+    :param ordered: yield in the order of `names_or_ids`, rather than as the
+    requests complete
+    :return: generator of loaded APIResource instances
+    """
+
+    ids = [name_id_convert(endpoint, name_or_id)[1] for name_or_id in names_or_ids]
+
+    for data in get_many(
+        endpoint,
+        ids,
+        max_workers=max_workers,
+        ordered=ordered,
+        force_lookup=kwargs.get("force_lookup", False),
+    ):
+        yield APIResource(endpoint, data["id"], custom=kwargs.get("custom"))
 
 
 class APIResource(object):
@@ -86,30 +234,92 @@ class APIResource(object):
 
     This class takes the complexity out of lots of similar classes for each
     different kind of data served by the API, all of which are very similar,
-    but not identical.
+    but not identical. Resources are made of a subclass named after their
+    endpoint, ex. `Pokemon`. Once loaded, its data is kept by an APIMetadata
+    with a slot for each key, and read through `__getattr__`.
     """
 
+    __slots__ = ("endpoint", "id_", "name", "_custom", "__loaded", "__force_lookup", "__values", "__weakref__")
+
+    def __new__(cls, endpoint=None, *args, **kwargs):
+        if cls is APIResource:
+            cls = _resource_class(endpoint)
+
+        return super().__new__(cls)
+
     def __init__(
         self, endpoint, name_or_id, lazy_load=False, force_lookup=False, custom=None
     ):
 
         name, id_ = name_id_convert(endpoint, name_or_id)
-        url = api_url_build(endpoint, id_)
+        validate(endpoint, id_)
 
-        self.__dict__.update({"name": name, "endpoint": endpoint, "id_": id_, "url": url})
+        self.name = name
+        self.endpoint = endpoint
+        self.id_ = id_
 
         self.__loaded = False
         self.__force_lookup = force_lookup
+        self.__values = None
 
         if custom:
             self._custom = custom
         else:
-            self._custom = {}
+            self._custom = _EMPTY
 
         if not lazy_load:
             self._load()
             self.__loaded = True
 
+    @classmethod
+    def from_reference(cls, endpoint, id_, name=None):
+        """Build a lazy APIResource from a reference to it, as found in the
+        data of another resource, without any lookup.
+
+        Nothing is read from the cache or the API until an attribute other
+        than `endpoint`, `id_`, `url` or a given `name` is read. The
+        references to the same resource share one instance while any of
+        them is in use, so it is loaded once for all.
+
+        :param endpoint: the endpoint of the resource
+        :param id_: the id of the resource
+        :param name: the name of the resource, if the reference has one
+        :return: APIResource
+        """
+
+        resource = _references.get((endpoint, id_))
+
+        if resource is None:
+            resource = _references.setdefault((endpoint, id_), cls._reference(endpoint, id_, name))
+        elif name is not None and not resource.__loaded:
+            resource.name = name
+
+        return resource
+
+    @classmethod
+    def _reference(cls, endpoint, id_, name=None):
+        # A lazy resource of its own, see `from_reference`.
+        validate(endpoint, id_)
+
+        resource = cls.__new__(cls, endpoint)
+        resource.endpoint = endpoint
+        resource.id_ = id_
+
+        if name is not None:
+            resource.name = name
+
+        resource.__loaded = False
+        resource.__force_lookup = False
+        resource.__values = None
+        resource._custom = _EMPTY
+
+        return resource
+
+    @property
+    def url(self):
+        # Built when read, rather than kept by every reference.
+        return api_url_build(self.endpoint, self.id_)
+
     def __getattr__(self, attr):
         """Modified method to auto-load the data when it is needed.
 
@@ -118,15 +328,45 @@ class APIResource(object):
         raised.
         """
 
+        # Special names, looked up by `dir`, `copy` and the like, are not data.
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(f"{type(self)} object has no attribute {attr}")
+
         if not self.__loaded:
             self._load()
             self.__loaded = True
 
-            return self.__getattribute__(attr)
+            return getattr(self, attr)
 
+        if attr in self._custom:
+            custom = self._custom[attr]
+            val = self.__values._convert_attr(attr, lambda val, name: _convert(get_data(*custom(val)), name))
         else:
+            val = self.__values._convert_attr(attr)
+
+        if val is _MISSING:
             raise AttributeError(f"{type(self)} object has no attribute {attr}")
 
+        return val
+
+    def __dir__(self):
+        fields = self.__values._fields() if self.__values is not None else ()
+
+        return sorted(set(super().__dir__()).union(fields))
+
+    def __reduce__(self):
+        # The model classes are made at run time, so they can not be pickled
+        # by name. A resource is pickled as a reference, along with the data
+        # it loaded, if any; reading its name here would load it.
+        try:
+            name = object.__getattribute__(self, "name")
+        except AttributeError:
+            name = None
+
+        values = self.__values if self.__loaded else None
+
+        return _resource, (self.endpoint, self.id_, name, dict(self._custom) or None, values)
+
     def __str__(self):
         return str(self.name)
 
@@ -145,20 +385,21 @@ class APIResource(object):
 
         data = get_data(self.endpoint, self.id_, force_lookup=self.__force_lookup)
 
-        # Make our custom objects from the data.
-        for key, val in data.items():
-            if key in self._custom:
-                val = get_data(*self._custom[key](val))
+        # Only the plain values are set now; the dicts, lists and custom
+        # values are made into objects by `__getattr__` when first read.
+        values = _metadata_class(self.endpoint + "_data", tuple(data))(data, self._custom)
 
-            if isinstance(val, dict):
-                data[key] = _make_obj(val)
+        # Resources without a name go by their id, as in `name_id_convert`.
+        self._set_values(values, data.get("name", str(self.id_)))
 
-            elif isinstance(val, list):
-                data[key] = [_make_obj(i) for i in val]
+        return None
 
-        self.__dict__.update(data)
+    def _set_values(self, values, name=None):
+        self.__values = values
+        self.__loaded = True
 
-        return None
+        if name is not None:
+            self.name = name
 
 
 class APIResourceList(object):
@@ -172,15 +413,20 @@ class APIResourceList(object):
     You can iterate through all the names or all the urls, using the respective
     properties. You can also iterate on the object itself to run through the
     `dict`s with names and urls together, whatever floats your boat.
+
+    If the list is not cached, it is fetched page by page while iterating, so
+    the first results are available before the last page arrives.
     """
 
-    def __init__(self, endpoint, force_lookup=False):
+    def __init__(self, endpoint, force_lookup=False, page_size=None):
         """Creates a new APIResourceList instance.
 
         :param name: the name of the resource to get (ex. 'berry' or 'move')
+        :param page_size: number of results fetched per request
         """
 
-        response = get_data(endpoint, force_lookup=force_lookup)
+        self.__pages = iter_pages(endpoint, page_size=page_size, force_lookup=force_lookup)
+        response = next(self.__pages)
 
         self.name = endpoint
         self.__results = [i for i in response["results"]]
@@ -190,21 +436,49 @@ class APIResourceList(object):
         return self.count
 
     def __iter__(self):
-        return iter(self.__results)
+        position = 0
+
+        while True:
+            while position < len(self.__results):
+                yield self.__results[position]
+                position += 1
+
+            if not self.__fetch_page():
+                return
 
     def __str__(self):
+        while self.__fetch_page():
+            pass
+
         return str(self.__results)
 
+    def __fetch_page(self):
+        """Add the next page to the results, if there is one left.
+
+        :return: whether a page was added
+        """
+
+        if self.__pages is None:
+            return False
+
+        for page in self.__pages:
+            self.__results.extend(page["results"])
+            return True
+
+        self.__pages = None
+
+        return False
+
     @property
     def names(self):
         """Useful iterator for all the resource's names."""
-        for result in self.__results:
+        for result in self:
             yield result.get("name", result["url"].split("/")[-2])
 
     @property
     def urls(self):
         """Useful iterator for all of the resource's urls."""
-        for result in self.__results:
+        for result in self:
             yield result["url"]
 
 
@@ -216,19 +490,116 @@ class APIMetadata(object):
 
     Used for "Common Models" classes and APIResource helper classes.
     https://pokeapi.co/docsv2/#common-models
+
+    Nested data is made of a subclass named after the attribute holding it,
+    ex. `VersionGroupDetail`, with a slot for each of its keys.
     """
 
-    def __init__(self, data):
+    __slots__ = ("__data", "__dict__")
+
+    _name = None  # Attribute the data of a model class is found under.
+
+    def __init__(self, data, raw=()):
+        """
+        :param data: dict of the data
+        :param raw: keys whose values are kept as they are until read, even
+        plain ones, for `APIResource` to convert its custom values
+        """
+
+        # As in `APIResource`, nested data is converted when first read. Only
+        # the raw values not converted yet are kept, in a dict of their own:
+        # the data itself may be shared with other threads.
+        pending = {}
 
         for key, val in data.items():
+            if isinstance(val, (dict, list)) or key in raw:
+                pending[key] = val
+            else:
+                self._set(key, val)
 
-            if isinstance(val, dict):
-                data[key] = _make_obj(val)
+        self.__data = pending or _EMPTY
 
-            if isinstance(val, list):
-                data[key] = [_make_obj(i) for i in val]
+    def __getattr__(self, attr):
+        val = _MISSING if attr == "_APIMetadata__data" else self._convert_attr(attr)
 
-        self.__dict__.update(data)
+        if val is _MISSING:
+            raise AttributeError(f"{type(self)} object has no attribute {attr}")
+
+        return val
+
+    def _convert_attr(self, attr, convert=_convert):
+        """Get an attribute, converting its raw value with
+        `convert(val, attr)` if it was not yet. The raw value is then
+        dropped.
+
+        :return: the value, or _MISSING if there is no such attribute
+        """
+
+        pending = self.__data
+        val = pending.get(attr, _MISSING)
+
+        if val is _MISSING:
+            # Not an attribute, or converted by another thread meanwhile.
+            try:
+                return object.__getattribute__(self, attr)
+            except AttributeError:
+                return _MISSING
+
+        val = convert(val, attr)
+        self._set(attr, val)
+
+        if attr in pending:
+            pending.pop(attr, None)
+            if not pending:
+                self.__data = _EMPTY
+
+        return val
+
+    def _set(self, key, val):
+        # Any key goes in the dict of APIMetadata; the model classes have a
+        # slot for each of theirs.
+        if type(self) is APIMetadata:
+            self.__dict__[key] = val
+        else:
+            setattr(self, key, val)
+
+    def _fields(self):
+        """The keys of the data, converted or not."""
+
+        if type(self) is APIMetadata:
+            return list(self.__dict__) + list(self.__data)
+
+        return list(type(self).__slots__)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()).union(self._fields()))
+
+    def __reduce__(self):
+        # As `APIResource`: rebuilt from the name and keys of the model
+        # class, with the values converted so far and the raw ones.
+        cls = type(self)
+        data = {}
+
+        for key in self._fields():
+            val = self._peek(key)
+            if val is not _MISSING:
+                data[key] = val
+
+        keys = () if cls is APIMetadata else cls.__slots__
+
+        return _metadata, (cls._name, keys, data, tuple(self.__data))
+
+    def _peek(self, key):
+        # The value of a key, without converting it.
+        val = self.__data.get(key, _MISSING)
+
+        if val is _MISSING:
+            try:
+                val = object.__getattribute__(self, key)
+            except AttributeError:
+                pass
+
+        return val
 
 
 class SpriteResource(object):
@@ -1,6 +1,18 @@
 # -*- coding: utf-8 -*-
 
-from .interface import APIResource, SpriteResource
+from .interface import APIResource, SpriteResource, get_resources
+
+
+def _get_location_area_encounters(val):
+    params = val.split("/")[-3:]
+    params[1] = int(params[1])
+    return params
+
+
+def _get_evolution_chain(val):
+    params = val["url"].split("/")[-3:-1]
+    params[1] = int(params[1])
+    return params
 
 
 def berry(id_or_name, **kwargs):
@@ -15,6 +27,18 @@ def berry(id_or_name, **kwargs):
     return APIResource("berry", id_or_name, **kwargs)
 
 
+def berry_many(ids_or_names, **kwargs):
+    """Batch berry lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("berry", ids_or_names, **kwargs)
+
+
 def berry_firmness(id_or_name, **kwargs):
     """Quick berry-firmness lookup.
 
@@ -27,6 +51,18 @@ def berry_firmness(id_or_name, **kwargs):
     return APIResource("berry-firmness", id_or_name, **kwargs)
 
 
+def berry_firmness_many(ids_or_names, **kwargs):
+    """Batch berry-firmness lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("berry-firmness", ids_or_names, **kwargs)
+
+
 def berry_flavor(id_or_name, **kwargs):
     """Quick berry-flavor lookup.
 
@@ -39,6 +75,18 @@ def berry_flavor(id_or_name, **kwargs):
     return APIResource("berry-flavor", id_or_name, **kwargs)
 
 
+def berry_flavor_many(ids_or_names, **kwargs):
+    """Batch berry-flavor lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("berry-flavor", ids_or_names, **kwargs)
+
+
 def contest_type(id_or_name, **kwargs):
     """Quick contest-type lookup.
 
@@ -51,6 +99,18 @@ def contest_type(id_or_name, **kwargs):
     return APIResource("contest-type", id_or_name, **kwargs)
 
 
+def contest_type_many(ids_or_names, **kwargs):
+    """Batch contest-type lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("contest-type", ids_or_names, **kwargs)
+
+
 def contest_effect(id_, **kwargs):
     """Quick contest-effect lookup.
 
@@ -63,6 +123,18 @@ def contest_effect(id_, **kwargs):
     return APIResource("contest-effect", id_, **kwargs)
 
 
+def contest_effect_many(ids, **kwargs):
+    """Batch contest-effect lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("contest-effect", ids, **kwargs)
+
+
 def super_contest_effect(id_, **kwargs):
     """Quick super-contest-effect lookup.
 
@@ -75,6 +147,18 @@ def super_contest_effect(id_, **kwargs):
     return APIResource("super-contest-effect", id_, **kwargs)
 
 
+def super_contest_effect_many(ids, **kwargs):
+    """Batch super-contest-effect lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("super-contest-effect", ids, **kwargs)
+
+
 def encounter_method(id_or_name, **kwargs):
     """Quick encounter-method lookup.
 
@@ -87,6 +171,18 @@ def encounter_method(id_or_name, **kwargs):
     return APIResource("encounter-method", id_or_name, **kwargs)
 
 
+def encounter_method_many(ids_or_names, **kwargs):
+    """Batch encounter-method lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("encounter-method", ids_or_names, **kwargs)
+
+
 def encounter_condition(id_or_name, **kwargs):
     """Quick encounter-condition lookup.
 
@@ -99,6 +195,18 @@ def encounter_condition(id_or_name, **kwargs):
     return APIResource("encounter-condition", id_or_name, **kwargs)
 
 
+def encounter_condition_many(ids_or_names, **kwargs):
+    """Batch encounter-condition lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("encounter-condition", ids_or_names, **kwargs)
+
+
 def encounter_condition_value(id_or_name, **kwargs):
     """Quick encounter-condition-value lookup.
 
@@ -111,6 +219,18 @@ def encounter_condition_value(id_or_name, **kwargs):
     return APIResource("encounter-condition-value", id_or_name, **kwargs)
 
 
+def encounter_condition_value_many(ids_or_names, **kwargs):
+    """Batch encounter-condition-value lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("encounter-condition-value", ids_or_names, **kwargs)
+
+
 def evolution_chain(id_, **kwargs):
     """Quick evolution-chain lookup.
 
@@ -123,6 +243,18 @@ def evolution_chain(id_, **kwargs):
     return APIResource("evolution-chain", id_, **kwargs)
 
 
+def evolution_chain_many(ids, **kwargs):
+    """Batch evolution-chain lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("evolution-chain", ids, **kwargs)
+
+
 def evolution_trigger(id_or_name, **kwargs):
     """Quick evolution-trigger lookup.
 
@@ -135,6 +267,18 @@ def evolution_trigger(id_or_name, **kwargs):
     return APIResource("evolution-trigger", id_or_name, **kwargs)
 
 
+def evolution_trigger_many(ids_or_names, **kwargs):
+    """Batch evolution-trigger lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("evolution-trigger", ids_or_names, **kwargs)
+
+
 def generation(id_or_name, **kwargs):
     """Quick generation lookup.
 
@@ -147,6 +291,18 @@ def generation(id_or_name, **kwargs):
     return APIResource("generation", id_or_name, **kwargs)
 
 
+def generation_many(ids_or_names, **kwargs):
+    """Batch generation lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("generation", ids_or_names, **kwargs)
+
+
 def pokedex(id_or_name, **kwargs):
     """Quick pokedex lookup.
 
@@ -159,6 +315,18 @@ def pokedex(id_or_name, **kwargs):
     return APIResource("pokedex", id_or_name, **kwargs)
 
 
+def pokedex_many(ids_or_names, **kwargs):
+    """Batch pokedex lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokedex", ids_or_names, **kwargs)
+
+
 def version(id_or_name, **kwargs):
     """Quick version lookup.
 
@@ -171,6 +339,18 @@ def version(id_or_name, **kwargs):
     return APIResource("version", id_or_name, **kwargs)
 
 
+def version_many(ids_or_names, **kwargs):
+    """Batch version lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("version", ids_or_names, **kwargs)
+
+
 def version_group(id_or_name, **kwargs):
     """Quick version-group lookup.
 
@@ -183,6 +363,18 @@ def version_group(id_or_name, **kwargs):
     return APIResource("version-group", id_or_name, **kwargs)
 
 
+def version_group_many(ids_or_names, **kwargs):
+    """Batch version-group lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("version-group", ids_or_names, **kwargs)
+
+
 def item(id_or_name, **kwargs):
     """Quick item lookup.
 
@@ -195,6 +387,18 @@ def item(id_or_name, **kwargs):
     return APIResource("item", id_or_name, **kwargs)
 
 
+def item_many(ids_or_names, **kwargs):
+    """Batch item lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("item", ids_or_names, **kwargs)
+
+
 def item_attribute(id_or_name, **kwargs):
     """Quick item-attribute lookup.
 
@@ -207,6 +411,18 @@ def item_attribute(id_or_name, **kwargs):
     return APIResource("item-attribute", id_or_name, **kwargs)
 
 
+def item_attribute_many(ids_or_names, **kwargs):
+    """Batch item-attribute lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("item-attribute", ids_or_names, **kwargs)
+
+
 def item_category(id_or_name, **kwargs):
     """Quick item-category lookup.
 
@@ -219,6 +435,18 @@ def item_category(id_or_name, **kwargs):
     return APIResource("item-category", id_or_name, **kwargs)
 
 
+def item_category_many(ids_or_names, **kwargs):
+    """Batch item-category lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("item-category", ids_or_names, **kwargs)
+
+
 def item_fling_effect(id_or_name, **kwargs):
     """Quick item-fling-effect lookup.
 
@@ -231,6 +459,18 @@ def item_fling_effect(id_or_name, **kwargs):
     return APIResource("item-fling-effect", id_or_name, **kwargs)
 
 
+def item_fling_effect_many(ids_or_names, **kwargs):
+    """Batch item-fling-effect lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("item-fling-effect", ids_or_names, **kwargs)
+
+
 def item_pocket(id_or_name, **kwargs):
     """Quick item-pocket lookup.
 
@@ -243,6 +483,18 @@ def item_pocket(id_or_name, **kwargs):
     return APIResource("item-pocket", id_or_name, **kwargs)
 
 
+def item_pocket_many(ids_or_names, **kwargs):
+    """Batch item-pocket lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("item-pocket", ids_or_names, **kwargs)
+
+
 def machine(id_, **kwargs):
     """Quick machine lookup.
 
@@ -255,6 +507,18 @@ def machine(id_, **kwargs):
     return APIResource("machine", id_, **kwargs)
 
 
+def machine_many(ids, **kwargs):
+    """Batch machine lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("machine", ids, **kwargs)
+
+
 def move(id_or_name, **kwargs):
     """Quick move lookup.
 
@@ -267,6 +531,18 @@ def move(id_or_name, **kwargs):
     return APIResource("move", id_or_name, **kwargs)
 
 
+def move_many(ids_or_names, **kwargs):
+    """Batch move lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move", ids_or_names, **kwargs)
+
+
 def move_ailment(id_or_name, **kwargs):
     """Quick move-ailment lookup.
 
@@ -279,6 +555,18 @@ def move_ailment(id_or_name, **kwargs):
     return APIResource("move-ailment", id_or_name, **kwargs)
 
 
+def move_ailment_many(ids_or_names, **kwargs):
+    """Batch move-ailment lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-ailment", ids_or_names, **kwargs)
+
+
 def move_battle_style(id_or_name, **kwargs):
     """Quick move-battle-style lookup.
 
@@ -291,6 +579,18 @@ def move_battle_style(id_or_name, **kwargs):
     return APIResource("move-battle-style", id_or_name, **kwargs)
 
 
+def move_battle_style_many(ids_or_names, **kwargs):
+    """Batch move-battle-style lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-battle-style", ids_or_names, **kwargs)
+
+
 def move_category(id_or_name, **kwargs):
     """Quick move-category lookup.
 
@@ -303,6 +603,18 @@ def move_category(id_or_name, **kwargs):
     return APIResource("move-category", id_or_name, **kwargs)
 
 
+def move_category_many(ids_or_names, **kwargs):
+    """Batch move-category lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-category", ids_or_names, **kwargs)
+
+
 def move_damage_class(id_or_name, **kwargs):
     """Quick move-damage-class lookup.
 
@@ -315,6 +627,18 @@ def move_damage_class(id_or_name, **kwargs):
     return APIResource("move-damage-class", id_or_name, **kwargs)
 
 
+def move_damage_class_many(ids_or_names, **kwargs):
+    """Batch move-damage-class lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-damage-class", ids_or_names, **kwargs)
+
+
 def move_learn_method(id_or_name, **kwargs):
     """Quick move-learn-method lookup.
 
@@ -327,6 +651,18 @@ def move_learn_method(id_or_name, **kwargs):
     return APIResource("move-learn-method", id_or_name, **kwargs)
 
 
+def move_learn_method_many(ids_or_names, **kwargs):
+    """Batch move-learn-method lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-learn-method", ids_or_names, **kwargs)
+
+
 def move_target(id_or_name, **kwargs):
     """Quick move-target lookup.
 
@@ -339,6 +675,18 @@ def move_target(id_or_name, **kwargs):
     return APIResource("move-target", id_or_name, **kwargs)
 
 
+def move_target_many(ids_or_names, **kwargs):
+    """Batch move-target lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("move-target", ids_or_names, **kwargs)
+
+
 def location(id_, **kwargs):
     """Quick location lookup.
 
@@ -351,6 +699,18 @@ def location(id_, **kwargs):
     return APIResource("location", id_, **kwargs)
 
 
+def location_many(ids, **kwargs):
+    """Batch location lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("location", ids, **kwargs)
+
+
 def location_area(id_, **kwargs):
     """Quick location-area lookup.
 
@@ -363,6 +723,18 @@ def location_area(id_, **kwargs):
     return APIResource("location-area", id_, **kwargs)
 
 
+def location_area_many(ids, **kwargs):
+    """Batch location-area lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("location-area", ids, **kwargs)
+
+
 def pal_park_area(id_or_name, **kwargs):
     """Quick pal-park-area lookup.
 
@@ -375,6 +747,18 @@ def pal_park_area(id_or_name, **kwargs):
     return APIResource("pal-park-area", id_or_name, **kwargs)
 
 
+def pal_park_area_many(ids_or_names, **kwargs):
+    """Batch pal-park-area lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pal-park-area", ids_or_names, **kwargs)
+
+
 def region(id_or_name, **kwargs):
     """Quick region lookup.
 
@@ -387,6 +771,18 @@ def region(id_or_name, **kwargs):
     return APIResource("region", id_or_name, **kwargs)
 
 
+def region_many(ids_or_names, **kwargs):
+    """Batch region lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("region", ids_or_names, **kwargs)
+
+
 def ability(id_or_name, **kwargs):
     """Quick ability lookup.
 
@@ -399,6 +795,18 @@ def ability(id_or_name, **kwargs):
     return APIResource("ability", id_or_name, **kwargs)
 
 
+def ability_many(ids_or_names, **kwargs):
+    """Batch ability lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("ability", ids_or_names, **kwargs)
+
+
 def characteristic(id_, **kwargs):
     """Quick characteristic lookup.
 
@@ -411,6 +819,18 @@ def characteristic(id_, **kwargs):
     return APIResource("characteristic", id_, **kwargs)
 
 
+def characteristic_many(ids, **kwargs):
+    """Batch characteristic lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids: ids of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("characteristic", ids, **kwargs)
+
+
 def egg_group(id_or_name, **kwargs):
     """Quick egg-group lookup.
 
@@ -423,6 +843,18 @@ def egg_group(id_or_name, **kwargs):
     return APIResource("egg-group", id_or_name, **kwargs)
 
 
+def egg_group_many(ids_or_names, **kwargs):
+    """Batch egg-group lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("egg-group", ids_or_names, **kwargs)
+
+
 def gender(id_or_name, **kwargs):
     """Quick gender lookup.
 
@@ -435,6 +867,18 @@ def gender(id_or_name, **kwargs):
     return APIResource("gender", id_or_name, **kwargs)
 
 
+def gender_many(ids_or_names, **kwargs):
+    """Batch gender lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("gender", ids_or_names, **kwargs)
+
+
 def growth_rate(id_or_name, **kwargs):
     """Quick growth-rate lookup.
 
@@ -447,6 +891,18 @@ def growth_rate(id_or_name, **kwargs):
     return APIResource("growth-rate", id_or_name, **kwargs)
 
 
+def growth_rate_many(ids_or_names, **kwargs):
+    """Batch growth-rate lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("growth-rate", ids_or_names, **kwargs)
+
+
 def nature(id_or_name, **kwargs):
     """Quick nature lookup.
 
@@ -459,6 +915,18 @@ def nature(id_or_name, **kwargs):
     return APIResource("nature", id_or_name, **kwargs)
 
 
+def nature_many(ids_or_names, **kwargs):
+    """Batch nature lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("nature", ids_or_names, **kwargs)
+
+
 def pokeathlon_stat(id_or_name, **kwargs):
     """Quick pokeathlon-stat lookup.
 
@@ -471,6 +939,18 @@ def pokeathlon_stat(id_or_name, **kwargs):
     return APIResource("pokeathlon-stat", id_or_name, **kwargs)
 
 
+def pokeathlon_stat_many(ids_or_names, **kwargs):
+    """Batch pokeathlon-stat lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokeathlon-stat", ids_or_names, **kwargs)
+
+
 def pokemon(id_or_name, **kwargs):
     """Quick pokemon lookup.
 
@@ -480,16 +960,27 @@ def pokemon(id_or_name, **kwargs):
     :param id_or_name: id or name of the resource to lookup
     :return: NamedAPIResource with the appropriate data
     """
-
-    def get_location_area_encounters(val):
-        params = val.split("/")[-3:]
-        params[1] = int(params[1])
-        return params
-
     return APIResource(
         "pokemon",
         id_or_name,
-        custom={"location_area_encounters": get_location_area_encounters},
+        custom={"location_area_encounters": _get_location_area_encounters},
+        **kwargs
+    )
+
+
+def pokemon_many(ids_or_names, **kwargs):
+    """Batch pokemon lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources(
+        "pokemon",
+        ids_or_names,
+        custom={"location_area_encounters": _get_location_area_encounters},
         **kwargs
     )
 
@@ -506,6 +997,18 @@ def pokemon_color(id_or_name, **kwargs):
     return APIResource("pokemon-color", id_or_name, **kwargs)
 
 
+def pokemon_color_many(ids_or_names, **kwargs):
+    """Batch pokemon-color lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokemon-color", ids_or_names, **kwargs)
+
+
 def pokemon_form(id_or_name, **kwargs):
     """Quick pokemon-form lookup.
 
@@ -518,6 +1021,18 @@ def pokemon_form(id_or_name, **kwargs):
     return APIResource("pokemon-form", id_or_name, **kwargs)
 
 
+def pokemon_form_many(ids_or_names, **kwargs):
+    """Batch pokemon-form lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokemon-form", ids_or_names, **kwargs)
+
+
 def pokemon_habitat(id_or_name, **kwargs):
     """Quick pokemon-habitat lookup.
 
@@ -530,6 +1045,18 @@ def pokemon_habitat(id_or_name, **kwargs):
     return APIResource("pokemon-habitat", id_or_name, **kwargs)
 
 
+def pokemon_habitat_many(ids_or_names, **kwargs):
+    """Batch pokemon-habitat lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokemon-habitat", ids_or_names, **kwargs)
+
+
 def pokemon_shape(id_or_name, **kwargs):
     """Quick pokemon-shape lookup.
 
@@ -542,6 +1069,18 @@ def pokemon_shape(id_or_name, **kwargs):
     return APIResource("pokemon-shape", id_or_name, **kwargs)
 
 
+def pokemon_shape_many(ids_or_names, **kwargs):
+    """Batch pokemon-shape lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("pokemon-shape", ids_or_names, **kwargs)
+
+
 def pokemon_species(id_or_name, **kwargs):
     """Quick pokemon-species lookup.
 
@@ -551,16 +1090,27 @@ def pokemon_species(id_or_name, **kwargs):
     :param id_or_name: id or name of the resource to lookup
     :return: NamedAPIResource with the appropriate data
     """
-
-    def get_evolution_chain(val):
-        params = val["url"].split("/")[-3:-1]
-        params[1] = int(params[1])
-        return params
-
     return APIResource(
         "pokemon-species",
         id_or_name,
-        custom={"evolution_chain": get_evolution_chain},
+        custom={"evolution_chain": _get_evolution_chain},
+        **kwargs
+    )
+
+
+def pokemon_species_many(ids_or_names, **kwargs):
+    """Batch pokemon-species lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources(
+        "pokemon-species",
+        ids_or_names,
+        custom={"evolution_chain": _get_evolution_chain},
         **kwargs
     )
 
@@ -577,6 +1127,18 @@ def stat(id_or_name, **kwargs):
     return APIResource("stat", id_or_name, **kwargs)
 
 
+def stat_many(ids_or_names, **kwargs):
+    """Batch stat lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("stat", ids_or_names, **kwargs)
+
+
 def type_(id_or_name, **kwargs):
     """Quick type lookup.
 
@@ -589,6 +1151,18 @@ def type_(id_or_name, **kwargs):
     return APIResource("type", id_or_name, **kwargs)
 
 
+def type_many(ids_or_names, **kwargs):
+    """Batch type lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("type", ids_or_names, **kwargs)
+
+
 def language(id_or_name, **kwargs):
     """Quick language lookup.
 
@@ -601,5 +1175,17 @@ def language(id_or_name, **kwargs):
     return APIResource("language", id_or_name, **kwargs)
 
 
+def language_many(ids_or_names, **kwargs):
+    """Batch language lookup.
+
+    Resources missing from the cache are fetched in parallel; see
+    `interface.get_resources` for the options.
+
+    :param ids_or_names: ids or names of the resources to lookup
+    :return: generator of NamedAPIResource with the appropriate data
+    """
+    return get_resources("language", ids_or_names, **kwargs)
+
+
 def sprite(sprite_type, sprite_id, **kwargs):
     return SpriteResource(sprite_type, sprite_id, **kwargs)
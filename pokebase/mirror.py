@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from . import cache
+from .api import MAX_WORKERS, fetch_sprite_hashes, get_data, get_many, get_sprite
+from .common import ENDPOINTS
+
+
+def _entry_id(entry):
+    return int(entry["url"].split("/")[-2])
+
+
+# Endpoints whose resources have subresources used by the loaders.
+SUBRESOURCES = {"pokemon": ["encounters"]}
+
+# Sprite types warmed along with an endpoint, and how the endpoint list
+# entries map to their sprite ids.
+SPRITES = {
+    "pokemon": ("pokemon", _entry_id),
+    "item": ("items", lambda entry: entry["name"]),
+}
+
+# The variants of the sprites of each type, as the options of
+# `common.parse_sprite_options`. Those a sprite does not have are skipped.
+SPRITE_VARIANTS = {
+    "pokemon": [
+        {},
+        {"back": True},
+        {"shiny": True},
+        {"back": True, "shiny": True},
+        {"female": True},
+        {"back": True, "female": True},
+        {"shiny": True, "female": True},
+        {"back": True, "shiny": True, "female": True},
+        {"model": True},
+        {"other": True, "official_artwork": True},
+        {"other": True, "dream_world": True},
+    ],
+    "items": [
+        {},
+        {"berries": True},
+        {"dream_world": True},
+        {"gen3": True},
+        {"gen5": True},
+        {"underground": True},
+    ],
+}
+
+
+def _report(endpoint, done, total):
+    """Default progress report: one updating line per endpoint, on stderr."""
+
+    end = "\n" if done == total else ""
+    print("\r{}: {}/{}".format(endpoint, done, total), end=end, file=sys.stderr, flush=True)
+
+
+def _load_checkpoint(path):
+    try:
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return {"done": []}
+
+
+def _save_checkpoint(state, path):
+    # Write then rename, so an interrupted run never leaves half a file.
+    with open(path + ".tmp", "w") as checkpoint_file:
+        json.dump(state, checkpoint_file)
+
+    os.replace(path + ".tmp", path)
+
+
+def warm(
+    endpoints=None,
+    workers=None,
+    sprites=False,
+    force_lookup=False,
+    checkpoint=None,
+    progress=_report,
+):
+    """Fetch every resource of the given endpoints into the cache.
+
+    For each endpoint, the list is fetched, then every resource missing from
+    the cache (and the subresources the loaders use) is fetched in parallel.
+    Endpoints are recorded in a checkpoint file as they complete, so an
+    interrupted run resumes where it stopped; the file is removed once all
+    the endpoints are done.
+
+    :param endpoints: endpoints to warm, defaults to all of them
+    :param workers: maximum number of concurrent requests
+    :param sprites: also fetch the sprites of every pokemon and item, in
+    all their variants (see SPRITE_VARIANTS)
+    :param force_lookup: revalidate resources that are already cached
+    :param checkpoint: path of the checkpoint file, defaults to
+    'warm.checkpoint' in the cache directory
+    :param progress: called as `progress(label, done, total)` while fetching,
+    None to stay silent
+    :return: dict of endpoint -> number of resources warmed
+    """
+
+    if endpoints is None:
+        endpoints = ENDPOINTS
+
+    for endpoint in endpoints:
+        if endpoint not in ENDPOINTS:
+            raise ValueError("Unknown API endpoint '{}'".format(endpoint))
+
+    if checkpoint is None:
+        checkpoint = os.path.join(cache.CACHE_DIR, "warm.checkpoint")
+
+    state = _load_checkpoint(checkpoint)
+    progress = progress or (lambda label, done, total: None)
+    counts = {}
+
+    if sprites and any(endpoint in SPRITES for endpoint in endpoints):
+        # Sprites that are the same image as a cached one are then skipped;
+        # without the hashes, every sprite is fetched.
+        try:
+            fetch_sprite_hashes()
+        except requests.RequestException:
+            pass
+
+    for endpoint in endpoints:
+        if endpoint in state["done"]:
+            continue
+
+        entries = get_data(endpoint, force_lookup=force_lookup)["results"]
+        ids = [_entry_id(entry) for entry in entries]
+
+        for done, _ in enumerate(
+            get_many(endpoint, ids, max_workers=workers, ordered=False, force_lookup=force_lookup), 1
+        ):
+            progress(endpoint, done, len(ids))
+
+        for subresource in SUBRESOURCES.get(endpoint, []):
+            label = "{}/{}".format(endpoint, subresource)
+            for done, _ in enumerate(
+                get_many(
+                    endpoint,
+                    ids,
+                    max_workers=workers,
+                    ordered=False,
+                    force_lookup=force_lookup,
+                    subresource=subresource,
+                ),
+                1,
+            ):
+                progress(label, done, len(ids))
+
+        if sprites and endpoint in SPRITES:
+            sprite_type, sprite_id = SPRITES[endpoint]
+            sprite_ids = [sprite_id(entry) for entry in entries]
+            _warm_sprites(sprite_type, sprite_ids, workers, force_lookup, progress)
+
+        counts[endpoint] = len(ids)
+        state["done"].append(endpoint)
+        _save_checkpoint(state, checkpoint)
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    return counts
+
+
+def _warm_sprites(sprite_type, sprite_ids, workers, force_lookup, progress, variants=None):
+    """Fetch sprites in parallel, through `get_sprite`.
+
+    With `force_lookup`, cached sprites are revalidated rather than fetched
+    again. Not every resource has a sprite, nor every sprite each variant;
+    those the server does not have are skipped.
+
+    :param variants: options of the variants to fetch, defaults to
+    SPRITE_VARIANTS of the sprite type
+    """
+
+    if variants is None:
+        variants = SPRITE_VARIANTS.get(sprite_type, [{}])
+
+    sprites = [(sprite_id, variant) for sprite_id in sprite_ids for variant in variants]
+
+    if force_lookup:
+        missing = sprites
+    else:
+        missing = []
+        for sprite_id, variant in sprites:
+            try:
+                cache.load_sprite(sprite_type, sprite_id, **variant)
+            except FileNotFoundError:
+                missing.append((sprite_id, variant))
+
+    label = "sprite/{}".format(sprite_type)
+    done = len(sprites) - len(missing)
+
+    with ThreadPoolExecutor(max_workers=workers or MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(get_sprite, sprite_type, sprite_id, force_lookup=force_lookup, **variant)
+            for sprite_id, variant in missing
+        ]
+
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except requests.HTTPError:
+                pass
+
+            done += 1
+            progress(label, done, len(sprites))
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Statuses meaning the server wants us to slow down.
+RETRY_STATUSES = (429, 503)
+
+# How often a throttled or failed request is retried, and how long to wait
+# between attempts when the server does not say (exponential, with jitter).
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 60.0
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """Token bucket rate limiter, shared by all the threads using it.
+
+    Holds up to `burst` tokens, refilled at `rate` tokens per second; every
+    request takes one token, waiting for it if the bucket is empty.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return None
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency(object):
+    """Limit on concurrent requests, tuned by AIMD.
+
+    Every successful request raises the limit by `increase / limit` (about
+    `increase` per round of requests), every throttled or failed request
+    multiplies it by `decrease`.
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=64, increase=1.0, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, success=True):
+        with self._condition:
+            self._in_flight -= 1
+
+            if success:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            else:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+
+            self._condition.notify_all()
+
+
+class HostLimiter(object):
+    """Throttling applied to every request made to one host.
+
+    :param rate: maximum requests per second, None for no limit
+    :param burst: number of requests that may be made at once before `rate`
+    applies, defaults to `rate`
+    :param concurrency: maximum concurrent requests, None for no limit
+    :param adaptive: tune `concurrency` with AIMD, starting at its value
+    """
+
+    def __init__(self, rate=None, burst=None, concurrency=None, adaptive=False):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+
+        if concurrency and adaptive:
+            self.concurrency = AdaptiveConcurrency(initial=concurrency)
+        elif concurrency:
+            self.concurrency = AdaptiveConcurrency(
+                initial=concurrency, minimum=concurrency, maximum=concurrency
+            )
+        else:
+            self.concurrency = None
+
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a request may be made to the host."""
+
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+
+        if self.bucket is not None:
+            self.bucket.acquire()
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+
+    def release(self, success=True):
+        """Mark the end of a request, and whether the server accepted it."""
+
+        if self.concurrency is not None:
+            self.concurrency.release(success)
+
+    def pause(self, seconds):
+        """Hold back every request to the host for `seconds`."""
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def set_rate_limit(host, rate=None, burst=None, concurrency=None, adaptive=False):
+    """Change the throttling of the requests made to a host.
+
+    Applies to every thread of the process. Call it with only `host` to
+    remove all limits.
+
+    :param host: the host name (ex. 'pokeapi.co')
+    :param rate: maximum requests per second
+    :param burst: number of requests that may be made at once before `rate`
+    applies
+    :param concurrency: maximum concurrent requests
+    :param adaptive: tune `concurrency` with AIMD, backing off when the
+    server throttles us and growing again while it does not
+    :return: the new HostLimiter
+    """
+
+    limiter = HostLimiter(rate, burst, concurrency, adaptive)
+
+    with _limiters_lock:
+        _limiters[host] = limiter
+
+    return limiter
+
+
+def get_limiter(host):
+    """Get the limiter of a host, creating an unlimited one if needed."""
+
+    limiter = _limiters.get(host)
+
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(host, HostLimiter())
+
+    return limiter
+
+
+def backoff(attempt):
+    """Seconds to wait before retry number `attempt` (full jitter)."""
+
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def retry_after(response):
+    """Seconds to wait as asked by the `Retry-After` header, or None."""
+
+    value = response.headers.get("Retry-After")
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool settings, change them with `configure`.
+POOL_CONNECTIONS = 4  # Number of hosts to keep a pool for.
+POOL_MAXSIZE = 16  # Number of keep-alive connections kept per host.
+TIMEOUT = (3.05, 30)  # (connect, read) timeouts in seconds.
+MAX_RETRIES = 0
+
+_session = None
+_lock = threading.Lock()
+
+
+def _make_session():
+    session = requests.Session()
+
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=MAX_RETRIES,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_session():
+    """Get the shared, pooled session used for every API and sprite call.
+
+    The session is created on first use. Its connections are kept alive and
+    reused between calls, so repeated lookups skip the TCP and TLS setup.
+
+    :return: the process-wide requests.Session
+    """
+
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _make_session()
+
+    return _session
+
+
+def get(url, params=None, headers=None):
+    """Send a GET request through the shared session.
+
+    :param url: the url to request
+    :param params: optional query string parameters
+    :param headers: optional extra request headers
+    :return: requests.Response
+    """
+
+    return get_session().get(url, params=params, headers=headers, timeout=TIMEOUT)
+
+
+def configure(pool_connections=None, pool_maxsize=None, timeout=None, max_retries=None):
+    """Change the connection pool settings.
+
+    Arguments left as None keep their current value. The current session is
+    closed; the next request opens a new one with the new settings.
+
+    :param pool_connections: number of hosts to keep a connection pool for
+    :param pool_maxsize: number of keep-alive connections kept per host
+    :param timeout: seconds, or a (connect, read) tuple, before giving up
+    :param max_retries: number of times to retry failed connections
+    :return: int, int, float or tuple, int
+    """
+
+    global POOL_CONNECTIONS, POOL_MAXSIZE, TIMEOUT, MAX_RETRIES
+
+    if pool_connections is not None:
+        POOL_CONNECTIONS = pool_connections
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = pool_maxsize
+    if timeout is not None:
+        TIMEOUT = timeout
+    if max_retries is not None:
+        MAX_RETRIES = max_retries
+
+    close()
+
+    return POOL_CONNECTIONS, POOL_MAXSIZE, TIMEOUT, MAX_RETRIES
+
+
+def close():
+    """Close the shared session and all of its pooled connections.
+
+    Safe to call more than once; a later request simply opens a new session.
+
+    :return: None
+    """
+
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+    return None
+
+
+def _reset_after_fork():
+    """Drop the inherited session in a forked child.
+
+    The pooled sockets belong to the parent process, so they are abandoned,
+    not closed, and the child builds its own session on first use.
+    """
+
+    global _session, _lock
+
+    _lock = threading.Lock()
+    _session = None
+
+
+atexit.register(close)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import hashlib
+import json
+import os
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import ratelimit, session
+
+try:
+    import urllib3
+except ImportError:  # pragma: no cover
+    urllib3 = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+# The transport in use, set at the end of this file with `set_transport`.
+TRANSPORT = None
+
+
+class Response(object):
+    """Response returned by the transports not built on `requests`.
+
+    Has the part of the `requests.Response` interface used by pokebase.
+    """
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                "{} Error for url: {}".format(self.status_code, self.url), response=self
+            )
+
+    def close(self):
+        return None
+
+
+class Transport(object):
+    """Base class of the HTTP backends used for every API and sprite call.
+
+    Subclasses implement `get`, returning an object with the interface of
+    `Response`, and raise `requests.ConnectionError` when the connection
+    fails, so it is retried. Clients they keep are created lazily in
+    `_client`, which is dropped in forked children.
+    """
+
+    _client = None
+
+    def get(self, url, params=None, headers=None):
+        raise NotImplementedError
+
+    def close(self):
+        """Close the connections held by the transport."""
+
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class RequestsTransport(Transport):
+    """Transport over the shared, pooled `requests.Session` (the default)."""
+
+    def get(self, url, params=None, headers=None):
+        return session.get(url, params=params, headers=headers)
+
+    def close(self):
+        session.close()
+
+
+class Urllib3Transport(Transport):
+    """Transport over a `urllib3.PoolManager`, with the session settings."""
+
+    def __init__(self):
+        if urllib3 is None:
+            raise ImportError("Urllib3Transport requires urllib3")
+
+    def _get_client(self):
+        if self._client is None:
+            timeout = session.TIMEOUT
+            if isinstance(timeout, tuple):
+                timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+
+            self._client = urllib3.PoolManager(
+                num_pools=session.POOL_CONNECTIONS,
+                maxsize=session.POOL_MAXSIZE,
+                timeout=timeout,
+                retries=urllib3.Retry(total=None, connect=0, read=0, status=0, redirect=5),
+                headers=urllib3.make_headers(accept_encoding=True),
+            )
+
+        return self._client
+
+    def get(self, url, params=None, headers=None):
+        if params:
+            url = "?".join([url, urlencode(params)])
+
+        try:
+            response = self._get_client().request("GET", url, headers=headers)
+        except urllib3.exceptions.HTTPError as error:
+            raise requests.ConnectionError(error)
+
+        return Response(url, response.status, response.headers, response.data)
+
+    def close(self):
+        if self._client is not None:
+            self._client.clear()
+            self._client = None
+
+
+class HttpxTransport(Transport):
+    """Transport over an `httpx.Client`; needs `httpx` installed."""
+
+    def __init__(self, http2=False):
+        if httpx is None:
+            raise ImportError("HttpxTransport requires httpx, install it with `pip install httpx`")
+
+        self.http2 = http2
+
+    def _get_client(self):
+        if self._client is None:
+            timeout = session.TIMEOUT
+            if isinstance(timeout, tuple):
+                timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+            self._client = httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(max_keepalive_connections=session.POOL_MAXSIZE),
+                follow_redirects=True,
+                http2=self.http2,
+            )
+
+        return self._client
+
+    def get(self, url, params=None, headers=None):
+        try:
+            response = self._get_client().get(url, params=params, headers=headers)
+        except httpx.TransportError as error:
+            raise requests.ConnectionError(error)
+
+        return Response(str(response.url), response.status_code, response.headers, response.content)
+
+
+def _recording_name(url, params=None):
+    """Name of the files holding the recorded response to a request."""
+
+    if params:
+        url = "?".join([url, urlencode(sorted(params.items()))])
+
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+class RecordTransport(Transport):
+    """Transport saving every response it gets to a directory.
+
+    Requests go through another transport, `RequestsTransport` by default.
+    Each response is saved as two files named after the request: the body,
+    as received, and a JSON file with the url, status and headers. Play them
+    back with `ReplayTransport`.
+    """
+
+    def __init__(self, directory, backend=None):
+        self.directory = os.path.abspath(directory)
+        self.backend = backend or RequestsTransport()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, url, params=None, headers=None):
+        response = self.backend.get(url, params=params, headers=headers)
+
+        # Responses to conditional requests say nothing about the data.
+        if response.status_code != 304:
+            path = os.path.join(self.directory, _recording_name(url, params))
+
+            with open(path + ".body", "wb") as body_file:
+                body_file.write(response.content)
+
+            with open(path + ".json", "w") as info_file:
+                json.dump(
+                    dict(url=url, params=params, status_code=response.status_code, headers=dict(response.headers)),
+                    info_file,
+                )
+
+        return response
+
+    def close(self):
+        self.backend.close()
+
+
+class ReplayTransport(Transport):
+    """Transport serving the responses saved by `RecordTransport`.
+
+    Never touches the network: a request that was not recorded raises
+    FileNotFoundError.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def get(self, url, params=None, headers=None):
+        path = os.path.join(self.directory, _recording_name(url, params))
+
+        with open(path + ".json") as info_file:
+            info = json.load(info_file)
+
+        with open(path + ".body", "rb") as body_file:
+            content = body_file.read()
+
+        return Response(url, info["status_code"], info["headers"], content)
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "urllib3": Urllib3Transport,
+    "httpx": HttpxTransport,
+    "record": RecordTransport,
+    "replay": ReplayTransport,
+}
+
+
+def set_transport(transport=None, *args, **kwargs):
+    """Change the HTTP backend used for every API and sprite call.
+
+    :param transport: a Transport instance, or the name of a built-in one:
+    'requests' (default), 'urllib3', 'httpx', 'record' or 'replay'. Extra
+    arguments are passed to the transport class, ex.
+    `set_transport('replay', 'recorded/')`.
+    :return: the Transport in use
+    """
+
+    global TRANSPORT
+
+    if transport is None:
+        transport = "requests"
+
+    if isinstance(transport, str):
+        if transport not in TRANSPORTS:
+            raise ValueError("Unknown transport '{}'".format(transport))
+        transport = TRANSPORTS[transport](*args, **kwargs)
+
+    if TRANSPORT is not None and TRANSPORT is not transport:
+        TRANSPORT.close()
+
+    TRANSPORT = transport
+
+    return TRANSPORT
+
+
+def get(url, params=None, headers=None):
+    """Send a GET request through the transport in use.
+
+    The request is throttled by the limiter of its host (see
+    `pokebase.ratelimit`). Throttled (429, 503) or dropped requests are
+    retried after the `Retry-After` delay, or an exponential backoff with
+    jitter, holding back the other requests to the host meanwhile.
+
+    :param url: the url to request
+    :param params: optional query string parameters
+    :param headers: optional extra request headers
+    :return: requests.Response, or Response
+    """
+
+    limiter = ratelimit.get_limiter(urlsplit(url).hostname)
+
+    for attempt in range(ratelimit.MAX_RETRIES + 1):
+        last_attempt = attempt == ratelimit.MAX_RETRIES
+
+        limiter.acquire()
+        success = False
+
+        # The slot is given back whatever happens, timeouts included.
+        try:
+            response = TRANSPORT.get(url, params=params, headers=headers)
+            success = response.status_code not in ratelimit.RETRY_STATUSES
+        except requests.ConnectionError:
+            if last_attempt:
+                raise
+            limiter.pause(ratelimit.backoff(attempt))
+            continue
+        finally:
+            limiter.release(success=success)
+
+        if success or last_attempt:
+            return response
+
+        response.close()
+        delay = ratelimit.retry_after(response)
+        if delay is None:
+            delay = ratelimit.backoff(attempt)
+        limiter.pause(delay)
+
+    return response
+
+
+def _close():
+    if TRANSPORT is not None:
+        TRANSPORT.close()
+
+
+def _reset_after_fork():
+    # The clients' sockets belong to the parent; abandon them, do not close.
+    transport = TRANSPORT
+
+    while transport is not None:
+        transport._client = None
+        transport = getattr(transport, "backend", None)
+
+
+set_transport()
+
+atexit.register(_close)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -18,6 +18,7 @@ setuptools.setup(
     url='https://github.com/PokeAPI/pokebase',
     keywords=['database', 'pokemon', 'wrapper'],
     install_requires=['requests'],
+    extras_require={'aio': ['aiohttp'], 'fast': ['orjson'], 'httpx': ['httpx'], 'zstd': ['zstandard']},
     license='BSD License',
     requires_python=">=3.8",
     classifiers=[
@@ -3,11 +3,19 @@
 import sys
 import unittest
 
+from .test_module_aio import *
 from .test_module_api import *
+from .test_module_backends import *
 from .test_module_cache import *
+from .test_module_codec import *
 from .test_module_common import *
+from .test_module_importer import *
 from .test_module_interface import *
 from .test_module_loaders import *
+from .test_module_mirror import *
+from .test_module_ratelimit import *
+from .test_module_session import *
+from .test_module_transport import *
 from .test_with_api_calls import *
 
 unittest.main(argv=sys.argv)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+import unittest
+from json import dumps
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pokebase import aio, api, interface, ratelimit
+from pokebase.cache import load_meta, save, save_meta, set_cache
+
+
+def mock_response(json=None, content=None, status=200, headers=None):
+    response = MagicMock(status=status, headers=headers or {})
+    if json is not None:
+        content = dumps(json).encode()
+    response.read = AsyncMock(return_value=content)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    return context
+
+
+@unittest.skipIf(aio.aiohttp is None, 'aiohttp is not installed')
+class TestFunction_aio_get_data(unittest.IsolatedAsyncioTestCase):
+
+    # await aio.get_data(endpoint, resource_id=None, subresource=None, **kwargs)
+
+    def setUp(self):
+        set_cache('testing')
+
+    async def testArgs_GettingCachedData(self):
+        save({'id': 1, 'name': 'cheri'}, 'berry', 1)
+        self.assertEqual(await aio.get_data('berry', 1), {'id': 1, 'name': 'cheri'})
+
+    @patch('pokebase.aio._get_session')
+    async def testArgs_GettingNoncachedData(self, mock_session):
+        mock_session.return_value.get.return_value = mock_response(json={'id': 2})
+        self.assertEqual(await aio.get_data('berry', 2, force_lookup=True), {'id': 2})
+        self.assertEqual(await aio.get_data('berry', 2), {'id': 2})
+        self.assertIn('fetched', load_meta('berry', 2))
+
+    @patch('pokebase.aio._get_session')
+    async def testArg_resource_id_None(self, mock_session):
+        mock_session.return_value.get.side_effect = [
+            mock_response(json={'count': 2, 'next': 'mocked.url?offset=1', 'results': ['one']}),
+            mock_response(json={'count': 2, 'next': None, 'results': ['two']})]
+        data = await aio.get_data('berry', force_lookup=True)
+        self.assertEqual(data['results'], ['one', 'two'])
+
+    async def testArg_endpoint_Text(self):
+        with self.assertRaises(ValueError):
+            await aio.get_data('not-an-endpoint', 1)
+
+    async def testEnv_CacheOffLoop(self):
+        threads = []
+
+        def mock_load(*args):
+            threads.append(threading.current_thread())
+            return {'id': 1}
+
+        with patch('pokebase.aio.load', mock_load):
+            self.assertEqual(await aio.get_data('berry', 1), {'id': 1})
+
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    @patch('pokebase.aio._get_session')
+    async def testEnv_TooManyRequests(self, mock_session):
+        limiter = ratelimit.set_rate_limit('pokeapi.co', concurrency=1)
+        self.addCleanup(ratelimit.set_rate_limit, 'pokeapi.co')
+        mock_session.return_value.get.side_effect = [
+            mock_response(json={}, status=429, headers={'Retry-After': '0'}),
+            mock_response(json={'id': 3})]
+
+        self.assertEqual(await aio.get_data('berry', 3, force_lookup=True), {'id': 3})
+        self.assertEqual(mock_session.return_value.get.call_count, 2)
+        self.assertEqual(limiter.concurrency._in_flight, 0)
+
+    @patch('pokebase.aio._get_session')
+    async def testEnv_Expired_Revalidated(self, mock_session):
+        api.set_ttl(60)
+        self.addCleanup(api.set_ttl)
+        save({'id': 4}, 'berry', 4)
+        save_meta({'fetched': time.time() - 120, 'etag': '"abc"'}, 'berry', 4)
+        mock_session.return_value.get.return_value = mock_response(status=304)
+
+        self.assertEqual(await aio.get_data('berry', 4), {'id': 4})
+        self.assertEqual(mock_session.return_value.get.call_args[1]['headers'], {'If-None-Match': '"abc"'})
+        meta = load_meta('berry', 4)
+        self.assertEqual(meta['etag'], '"abc"')
+        self.assertGreater(meta['fetched'], time.time() - 60)
+
+    @patch('pokebase.aio._get_session')
+    async def testEnv_ValidatorsSaved(self, mock_session):
+        mock_session.return_value.get.return_value = mock_response(json={'id': 5}, headers={'ETag': '"def"'})
+
+        self.assertEqual(await aio.get_data('berry', 5, force_lookup=True), {'id': 5})
+        self.assertEqual(load_meta('berry', 5)['etag'], '"def"')
+
+    @patch('pokebase.aio._get_session')
+    async def testEnv_Coalesced(self, mock_session):
+        mock_session.return_value.get.return_value = mock_response(json={'id': 6})
+
+        results = await asyncio.gather(*(aio.get_data('berry', 6, force_lookup=True) for _ in range(3)))
+
+        self.assertEqual(results, [{'id': 6}] * 3)
+        self.assertEqual(mock_session.return_value.get.call_count, 1)
+
+
+@unittest.skipIf(aio.aiohttp is None, 'aiohttp is not installed')
+class TestFunction_aio_get_sprite(unittest.IsolatedAsyncioTestCase):
+
+    # await aio.get_sprite(sprite_type, sprite_id, **kwargs)
+
+    def setUp(self):
+        set_cache('testing')
+
+    @patch('pokebase.aio._get_session')
+    async def testArgs(self, mock_session):
+        mock_session.return_value.get.return_value = mock_response(content=b'png')
+        data = await aio.get_sprite('pokemon', 1, force_lookup=True)
+        self.assertEqual(data['img_data'], b'png')
+
+
+@unittest.skipIf(aio.aiohttp is None, 'aiohttp is not installed')
+class TestFunction_aio_resource(unittest.IsolatedAsyncioTestCase):
+
+    # await aio.resource(endpoint, name_or_id, force_lookup=False, custom=None)
+
+    def setUp(self):
+        set_cache('testing')
+
+    @patch('pokebase.aio._get_session')
+    async def testArgs(self, mock_session):
+        mock_session.return_value.get.side_effect = [
+            mock_response(json={'count': 1, 'results': [{'name': 'cheri', 'url': 'mocked.url/api/v2/berry/1/'}]}),
+            mock_response(json={'id': 1, 'name': 'cheri', 'size': 20})]
+        berry = await aio.resource('berry', 'cheri', force_lookup=True)
+        self.assertIsInstance(berry, interface.APIResource)
+        self.assertEqual(berry.size, 20)
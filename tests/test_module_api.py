@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import json
 import shelve
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from hypothesis import assume, given
-from hypothesis.strategies import dictionaries, integers, none, sampled_from, text
-from requests.exceptions import HTTPError
+from hypothesis import assume, given, settings
+from hypothesis.strategies import dictionaries, integers, lists, none, sampled_from, text
+from requests.exceptions import ConnectionError, HTTPError
 
 from pokebase import api, cache
 from pokebase.cache import save, set_cache
@@ -22,10 +25,10 @@ class TestFunction__call_api(unittest.TestCase):
 
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=(integers(min_value=1)))
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testArgs(self, mock_get, endpoint, resource_id):
 
-        mock_get.return_value.json.return_value = {'id': resource_id}
+        mock_get.return_value.content = json.dumps({'id': resource_id}).encode()
 
         self.assertEqual(api._call_api(endpoint, resource_id)['id'],
                          resource_id)
@@ -38,25 +41,31 @@ class TestFunction__call_api(unittest.TestCase):
 
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=none())
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testArg_resource_id_None(self, mock_get, endpoint, resource_id):
 
-        mock_get.return_value.json.return_value = {'count': 100, 'results': ['some', 'reults']}
+        mock_get.return_value.content = json.dumps({'count': 100, 'results': ['some', 'reults']}).encode()
 
         self.assertIsNotNone(api._call_api(endpoint, resource_id).get('count'))
 
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=integers(min_value=1),
            subresource=text())
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testArg_subresource_Text(self, mock_get, endpoint, resource_id, subresource):
-        mock_get.return_value.json.return_value = {'version_details': 'foo'}
+        mock_get.return_value.content = json.dumps({'version_details': 'foo'}).encode()
 
         self.assertIsNotNone(api._call_api(endpoint, resource_id, subresource).get('version_details'))
 
+    @patch('pokebase.api.transport.get')
+    def testArg_raw(self, mock_get):
+        mock_get.return_value.content = b'{"id": 1}'
+
+        self.assertEqual(api._call_api('berry', 1, raw=True), b'{"id": 1}')
+
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=(integers(min_value=1)))
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testEnv_ErrorResponse(self, mock_get, endpoint, resource_id):
         mock_get.return_value.raise_for_status.side_effect = HTTPError()
 
@@ -83,28 +92,59 @@ class TestFunction_get_data(unittest.TestCase):
     @given(data=dictionaries(text(), text()),
            endpoint=sampled_from(ENDPOINTS),
            resource_id=integers(min_value=1))
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testArgs_GettingNoncachedData(self, mock_get, data, endpoint, resource_id):
 
-        mock_get.return_value.json.return_value = data
+        mock_get.return_value.content = json.dumps(data).encode()
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
 
         # assert that the data is not in the cache
+        cache.close()
         with shelve.open(cache.API_CACHE) as cache_file:
             key = cache_uri_build(endpoint, resource_id)
             if key in cache_file.keys():
                 del cache_file[key]
+        cache.invalidate(endpoint, resource_id)
 
         self.assertEqual(data, api.get_data(endpoint, resource_id))
 
+    @settings(deadline=None)
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=integers(min_value=1),
            subresource=text())
-    @patch('pokebase.api.requests.get')
+    @patch('pokebase.api.transport.get')
     def testArg_subresource_Text(self, mock_get, endpoint, resource_id, subresource):
-        mock_get.return_value.json.return_value = {'version_details': 'foo'}
+        mock_get.return_value.content = json.dumps({'version_details': 'foo'}).encode()
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
 
         self.assertIsNotNone(api.get_data(endpoint, resource_id, subresource).get('version_details'))
 
+    @patch('pokebase.api.transport.get')
+    def testEnv_BodySavedAsReceived(self, mock_get):
+        mock_get.return_value.content = b'{"id": 1,  "name": "cheri"}\n'
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+
+        self.assertEqual({'id': 1, 'name': 'cheri'}, api.get_data('berry', 1, force_lookup=True))
+
+        cache.close()
+        with shelve.open(cache.API_CACHE) as cache_file:
+            self.assertEqual(cache_file['berry/1/'], b'{"id": 1,  "name": "cheri"}\n')
+        cache.invalidate('berry', 1)
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_InvalidBodyNotSaved(self, mock_get):
+        save({'id': 2}, 'berry', 2)
+        mock_get.return_value.content = b'<html>'
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+
+        with self.assertRaises(ValueError):
+            api.get_data('berry', 2, force_lookup=True)
+        self.assertEqual({'id': 2}, cache.load('berry', 2))
+
     @given(endpoint=text(),
            resource_id=integers(min_value=1))
     def testArg_endpoint_Text(self, endpoint, resource_id):
@@ -116,3 +156,429 @@ class TestFunction_get_data(unittest.TestCase):
     def testArg_resource_id_Text(self, endpoint, resource_id):
         with self.assertRaises(ValueError):
             api.get_data(endpoint, resource_id)
+
+
+class TestFunction_get_data_Revalidation(unittest.TestCase):
+
+    # get_data(endpoint, resource_id, force_lookup=True)
+
+    def setUp(self):
+        set_cache('testing')
+
+    @settings(deadline=None)
+    @given(data=dictionaries(text(), text()),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    @patch('pokebase.api.transport.get')
+    def testEnv_NotModified(self, mock_get, data, endpoint, resource_id):
+        assume(data != dict())
+        save(data, endpoint, resource_id)
+        cache.save_meta({'etag': '"abc"', 'last_modified': None, 'fetched': 0}, endpoint, resource_id)
+
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual(data, api.get_data(endpoint, resource_id, force_lookup=True))
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"abc"'})
+        self.assertGreater(cache.load_meta(endpoint, resource_id)['fetched'], 0)
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    @patch('pokebase.api.transport.get')
+    def testEnv_Modified(self, mock_get, endpoint, resource_id):
+        save({'old': 'data'}, endpoint, resource_id)
+        cache.save_meta({'etag': '"abc"', 'last_modified': None, 'fetched': 0}, endpoint, resource_id)
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {'ETag': '"def"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+        mock_get.return_value.content = json.dumps({'new': 'data'}).encode()
+
+        self.assertEqual({'new': 'data'}, api.get_data(endpoint, resource_id, force_lookup=True))
+        self.assertEqual({'new': 'data'}, cache.load(endpoint, resource_id))
+        self.assertEqual(cache.load_meta(endpoint, resource_id)['etag'], '"def"')
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    @patch('pokebase.api.transport.get')
+    def testEnv_NotModified_ReadsDisk(self, mock_get, endpoint, resource_id):
+        save({'old': 'data'}, endpoint, resource_id)
+        cache.save_meta({'etag': '"abc"', 'last_modified': None, 'fetched': 0}, endpoint, resource_id)
+        cache.close()
+        with shelve.open(cache.API_CACHE) as cache_file:
+            cache_file[cache_uri_build(endpoint, resource_id)] = b'{"new":"data"}'
+
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual({'new': 'data'}, api.get_data(endpoint, resource_id, force_lookup=True))
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_SpriteNotModified(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+        mock_get.return_value.content = b'png'
+        api.get_sprite('pokemon', 1, force_lookup=True)
+        cache.save_sprite_meta({'etag': '"abc"', 'last_modified': None, 'fetched': 0}, 'pokemon', 1)
+
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual(api.get_sprite('pokemon', 1, force_lookup=True)['path'],
+                         cache.get_sprite_path('pokemon', 1))
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"abc"'})
+
+
+class TestFunction_get_data_TTL(unittest.TestCase):
+
+    # get_data(endpoint, resource_id) with set_ttl(ttl, stale, endpoint)
+
+    def setUp(self):
+        set_cache('testing')
+        save({'old': 'data'}, 'berry', 1)
+
+    def tearDown(self):
+        api.set_ttl(None)
+        api._ttls.clear()
+
+    def wait_for_refreshes(self):
+        for _ in range(500):
+            if not api._refreshing:
+                return
+            time.sleep(0.01)
+        self.fail('refresh did not complete')
+
+    def mock_response(self, mock_get, status_code, data=None):
+        mock_get.return_value.status_code = status_code
+        mock_get.return_value.headers = {'ETag': '"def"'}
+        mock_get.return_value.content = json.dumps(data).encode()
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Fresh(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time()}, 'berry', 1)
+        api.set_ttl(60, endpoint='berry')
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        mock_get.assert_not_called()
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_NoTTL(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': 0}, 'berry', 1)
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        mock_get.assert_not_called()
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Expired(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 120}, 'berry', 1)
+        api.set_ttl(60, stale=30)
+        self.mock_response(mock_get, 304)
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"abc"'})
+        self.assertGreater(cache.load_meta('berry', 1)['fetched'], time.time() - 60)
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_NoFetchTime(self, mock_get):
+        cache.delete('berry', 1)
+        save({'old': 'data'}, 'berry', 1)
+        api.set_ttl(60)
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        mock_get.assert_not_called()
+        self.assertGreater(cache.load_meta('berry', 1)['fetched'], time.time() - 60)
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Expired_Offline(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 120}, 'berry', 1)
+        api.set_ttl(60)
+        mock_get.side_effect = ConnectionError
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        self.assertEqual(list(api.get_many('berry', [1])), [{'old': 'data'}])
+
+        with self.assertRaises(ConnectionError):
+            api.get_data('berry', 1, force_lookup=True)
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Stale(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 90}, 'berry', 1)
+        api.set_ttl(60, stale=60, endpoint='berry')
+        self.mock_response(mock_get, 200, {'new': 'data'})
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        self.wait_for_refreshes()
+
+        self.assertEqual({'new': 'data'}, api.get_data('berry', 1))
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Stale_RefreshFails(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 90}, 'berry', 1)
+        api.set_ttl(60, stale=60)
+        mock_get.side_effect = ConnectionError
+
+        self.assertEqual({'old': 'data'}, api.get_data('berry', 1))
+        self.wait_for_refreshes()
+
+        self.assertEqual({'old': 'data'}, cache.load('berry', 1))
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_get_many(self, mock_get):
+        save({'old': 'data', 'id': 2}, 'berry', 2)
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 120}, 'berry', 1)
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time()}, 'berry', 2)
+        api.set_ttl(60)
+        self.mock_response(mock_get, 200, {'new': 'data'})
+
+        self.assertEqual(list(api.get_many('berry', [1, 2])), [{'new': 'data'}, {'old': 'data', 'id': 2}])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual({'new': 'data'}, cache.load('berry', 1))
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_get_many_NotModified(self, mock_get):
+        cache.save_meta({'etag': '"abc"', 'fetched': time.time() - 120}, 'berry', 1)
+        api.set_ttl(60)
+        self.mock_response(mock_get, 304)
+
+        self.assertEqual(list(api.get_many('berry', [1], ordered=False)), [{'old': 'data'}])
+
+    def testArg_endpoint_Text(self):
+        with self.assertRaises(ValueError):
+            api.set_ttl(60, endpoint='not-an-endpoint')
+
+
+class TestFunction_get_many(unittest.TestCase):
+
+    # get_many(endpoint, resource_ids, max_workers=None, ordered=True, force_lookup=False)
+
+    def setUp(self):
+        set_cache('testing')
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_ids=lists(integers(min_value=1), max_size=10))
+    @patch('pokebase.api._call_api')
+    def testArgs_Ordered(self, mock_call_api, endpoint, resource_ids):
+        mock_call_api.side_effect = lambda endpoint, id_, *args: {'id': id_}
+
+        results = list(api.get_many(endpoint, resource_ids, force_lookup=True))
+
+        self.assertEqual([data['id'] for data in results], resource_ids)
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_ids=lists(integers(min_value=1), max_size=10, unique=True))
+    @patch('pokebase.api._call_api')
+    def testArg_ordered_False(self, mock_call_api, endpoint, resource_ids):
+        mock_call_api.side_effect = lambda endpoint, id_, *args: {'id': id_}
+
+        results = list(api.get_many(endpoint, resource_ids, ordered=False, force_lookup=True))
+
+        self.assertCountEqual([data['id'] for data in results], resource_ids)
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    @patch('pokebase.api._call_api')
+    def testEnv_CachedDataNotFetched(self, mock_call_api, endpoint, resource_id):
+        save({'id': resource_id}, endpoint, resource_id)
+
+        self.assertEqual(list(api.get_many(endpoint, [resource_id])), [{'id': resource_id}])
+        mock_call_api.assert_not_called()
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_ids=lists(text(), min_size=1))
+    def testArg_resource_ids_Text(self, endpoint, resource_ids):
+        with self.assertRaises(ValueError):
+            list(api.get_many(endpoint, resource_ids))
+
+    @patch('pokebase.api._call_api')
+    def testArg_ordered_False_Duplicates(self, mock_call_api):
+        mock_call_api.side_effect = lambda endpoint, id_, *args: {'id': id_}
+        save({'id': 1}, 'berry', 1)
+        cache.delete('berry', 2)
+
+        results = list(api.get_many('berry', [1, 2, 1, 2], ordered=False))
+
+        self.assertCountEqual([data['id'] for data in results], [1, 1, 2, 2])
+        self.assertEqual(mock_call_api.call_count, 1)
+
+    @patch('pokebase.api._call_api')
+    def testEnv_SharedWithGetData(self, mock_call_api):
+        def slow_call(*args):
+            time.sleep(0.2)
+            return b'{"id": 1}'
+
+        mock_call_api.side_effect = slow_call
+        results = []
+        thread = threading.Thread(target=lambda: results.extend(api.get_many('berry', [1], force_lookup=True)))
+        thread.start()
+        time.sleep(0.05)
+
+        self.assertEqual(api.get_data('berry', 1, force_lookup=True), {'id': 1})
+        thread.join()
+        self.assertEqual(results, [{'id': 1}])
+        self.assertEqual(mock_call_api.call_count, 1)
+
+
+class TestFunction__single_flight(unittest.TestCase):
+
+    # _single_flight(key, func, *args, **kwargs)
+
+    def testEnv_ConcurrentCallsCoalesced(self):
+        calls = []
+
+        def slow_call():
+            calls.append(None)
+            time.sleep(0.2)
+            return {'id': 25}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(api._single_flight('pokemon/25/', slow_call)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'id': 25}] * 8)
+
+    def testEnv_ErrorShared(self):
+        started = threading.Event()
+
+        def failing_call():
+            started.set()
+            time.sleep(0.2)
+            raise HTTPError()
+
+        errors = []
+
+        def follower():
+            started.wait()
+            try:
+                api._single_flight('pokemon/25/', failing_call)
+            except HTTPError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=follower)
+        thread.start()
+        with self.assertRaises(HTTPError):
+            api._single_flight('pokemon/25/', failing_call)
+        thread.join()
+
+        self.assertEqual(len(errors), 1)
+
+    def testEnv_KeyReleased(self):
+        api._single_flight('pokemon/25/', dict)
+        self.assertNotIn('pokemon/25/', api._flights)
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    @patch('pokebase.api._call_api')
+    def testEnv_get_data_Coalesced(self, mock_call_api, endpoint, resource_id):
+
+        def slow_call(*args):
+            time.sleep(0.05)
+            return {'id': resource_id}
+
+        mock_call_api.side_effect = slow_call
+
+        threads = [threading.Thread(target=api.get_data, args=(endpoint, resource_id),
+                                    kwargs=dict(force_lookup=True))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mock_call_api.call_count, 1)
+
+
+class TestFunction_iter_pages(unittest.TestCase):
+
+    # iter_pages(endpoint, page_size=None, force_lookup=False)
+
+    def setUp(self):
+        set_cache('testing')
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           page_size=integers(min_value=1, max_value=5),
+           count=integers(min_value=1, max_value=12))
+    @patch('pokebase.api.transport.get')
+    def testArgs(self, mock_get, endpoint, page_size, count):
+        results = [{'name': str(i), 'url': 'mocked.url/api/v2/{}/{}/'.format(endpoint, i)} for i in range(count)]
+
+        def get(url, params=None, headers=None):
+            offset = int(url.split('offset=')[1]) if 'offset=' in url else 0
+            response = MagicMock(status_code=200, headers={})
+            response.content = json.dumps({
+                'count': count,
+                'next': 'mocked.url?offset={}'.format(offset + page_size) if offset + page_size < count else None,
+                'results': results[offset:offset + page_size]}).encode()
+            return response
+
+        mock_get.side_effect = get
+
+        pages = list(api.iter_pages(endpoint, page_size=page_size, force_lookup=True))
+
+        self.assertEqual(len(pages), -(-count // page_size))
+        self.assertEqual(cache.load(endpoint)['results'], results)
+        self.assertEqual(list(api.iter_endpoint(endpoint)), results)
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS))
+    @patch('pokebase.api.transport.get')
+    def testEnv_Cached(self, mock_get, endpoint):
+        save({'count': 1, 'next': None, 'results': [{'name': 'one'}]}, endpoint)
+
+        self.assertEqual(list(api.iter_endpoint(endpoint)), [{'name': 'one'}])
+        mock_get.assert_not_called()
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS))
+    @patch('pokebase.api.transport.get')
+    def testEnv_NotModified(self, mock_get, endpoint):
+        save({'count': 1, 'next': None, 'results': [{'name': 'one'}]}, endpoint)
+        cache.save_meta({'etag': '"abc"', 'last_modified': None, 'fetched': 0}, endpoint)
+
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual(list(api.iter_endpoint(endpoint, force_lookup=True)), [{'name': 'one'}])
+
+
+class TestFunction_fetch_sprite_hashes(unittest.TestCase):
+
+    # fetch_sprite_hashes()
+
+    def setUp(self):
+        set_cache('testing')
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_DuplicateNotFetched(self, mock_get):
+        mock_get.return_value.content = json.dumps({'tree': [
+            {'path': 'sprites', 'type': 'tree', 'sha': '0' * 40},
+            {'path': 'sprites/items/berries/9001.png', 'type': 'blob', 'sha': cache.sprite_hash(b'same')},
+            {'path': 'sprites/items/gen5/9001.png', 'type': 'blob', 'sha': cache.sprite_hash(b'same')},
+        ]}).encode()
+        mock_get.return_value.status_code = 200
+
+        self.assertEqual(api.fetch_sprite_hashes(), 2)
+
+        cache.save_sprite({'img_data': b'same'}, 'items', 9001, berries=True)
+        mock_get.reset_mock()
+
+        self.assertEqual(api.get_sprite('items', 9001, gen5=True)['img_data'], b'same')
+        mock_get.assert_not_called()
+
+    @patch('pokebase.api.transport.get')
+    def testEnv_Truncated(self, mock_get):
+        mock_get.return_value.content = json.dumps({'truncated': True, 'tree': [
+            {'path': 'sprites/items/berries/9001.png', 'type': 'blob', 'sha': cache.sprite_hash(b'same')},
+        ]}).encode()
+        mock_get.return_value.status_code = 200
+
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual(api.fetch_sprite_hashes(), 1)
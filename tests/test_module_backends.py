@@ -0,0 +1,576 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from pokebase import backends, cache
+
+
+class StoreTests(object):
+
+    # The Store protocol, run against every writable backend.
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = self.make_store(os.path.join(self.directory, 'api'))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def testMethods_get_set(self):
+        self.store.set('berry/1/', b'{"id":1}')
+
+        self.assertEqual(self.store.get('berry/1/'), b'{"id":1}')
+        self.assertIn('berry/1/', self.store)
+        self.assertNotIn('berry/2/', self.store)
+        self.assertIsNone(self.store.get('berry/2/'))
+        self.assertEqual(self.store.get('berry/2/', b''), b'')
+
+    def testMethods_get_many_set_many(self):
+        self.assertEqual(self.store.set_many([('berry/1/', b'1'), ('berry/2/', b'2')]), 2)
+
+        self.assertEqual(
+            self.store.get_many(['berry/1/', 'berry/2/', 'berry/3/']),
+            {'berry/1/': b'1', 'berry/2/': b'2'},
+        )
+
+    def testMethod_delete(self):
+        self.store.set('berry/1/', b'1')
+
+        self.assertTrue(self.store.delete('berry/1/'))
+        self.assertFalse(self.store.delete('berry/1/'))
+        self.assertNotIn('berry/1/', self.store)
+
+    def testMethod_iterate(self):
+        self.store.set_many([('berry/1/', b'1'), ('berry/2/', b'2'), ('item/1/', b'3')])
+
+        self.assertEqual(sorted(self.store.iterate()), ['berry/1/', 'berry/2/', 'item/1/'])
+        self.assertEqual(sorted(self.store.iterate('berry/')), ['berry/1/', 'berry/2/'])
+
+    def testMethod_stats(self):
+        self.store.set_many([('berry/1/', b'1'), ('berry/2/', b'22')])
+
+        stats = self.store.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertGreaterEqual(stats['bytes'], 3)
+
+    def testMethod_link(self):
+        self.store.set('pokemon/1.png', b'png')
+        self.store.link('pokemon/shiny/1.png', 'pokemon/1.png')
+
+        self.assertEqual(self.store.get('pokemon/shiny/1.png'), b'png')
+
+        self.store.set('pokemon/1.png', b'gif')
+        self.assertEqual(self.store.get('pokemon/shiny/1.png'), b'png')
+
+    def testMethod_size(self):
+        self.store.set('berry/1', b'22')
+
+        self.assertGreaterEqual(self.store.size('berry/1'), 2)
+        self.assertEqual(self.store.size('berry/2'), 0)
+
+    def testMethod_compact(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'2')])
+        self.store.delete('berry/1')
+        self.store.compact()
+
+        self.assertEqual(self.store.get('berry/2'), b'2')
+        self.assertIsNone(self.store.get('berry/1'))
+
+
+class ObjectStoreTests(StoreTests):
+
+    # Stores that also hold the metadata of the API cache.
+
+    def testMethods_get_set_Objects(self):
+        self.store.set('meta:berry/1/', {'etag': '"abc"', 'fetched': 1.5})
+
+        self.assertEqual(self.store.get('meta:berry/1/'), {'etag': '"abc"', 'fetched': 1.5})
+
+
+class TestClass_MemoryStore(ObjectStoreTests, unittest.TestCase):
+
+    # backends.MemoryStore(path=None)
+
+    make_store = backends.MemoryStore
+
+
+class TestClass_ShelveStore(ObjectStoreTests, unittest.TestCase):
+
+    # backends.ShelveStore(path)
+
+    make_store = backends.ShelveStore
+
+    def testMethod_compact_Shrinks(self):
+        def file_size():
+            return sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory))
+
+        self.store.set_many([('berry/{}'.format(i), bytes(4096)) for i in range(64)])
+        for i in range(1, 64):
+            self.store.delete('berry/{}'.format(i))
+        self.store.sync()
+        size = file_size()
+
+        self.store.compact()
+
+        self.assertLess(file_size(), size)
+        self.assertEqual(self.store.get('berry/0'), bytes(4096))
+
+
+class TestClass_SQLiteStore(ObjectStoreTests, unittest.TestCase):
+
+    # backends.SQLiteStore(path)
+
+    make_store = backends.SQLiteStore
+
+    def testAttr_JournalMode(self):
+        mode = self.store._connection.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def testMethod_get_many_Chunks(self):
+        self.store.set_many(('berry/{}/'.format(i), b'x') for i in range(1200))
+
+        self.assertEqual(len(self.store.get_many('berry/{}/'.format(i) for i in range(1300))), 1200)
+
+    def testMethod_transaction(self):
+        path = os.path.join(self.directory, 'api')
+
+        with self.store.transaction():
+            with self.store.transaction():
+                self.store.set('berry/1/', b'1')
+            self.store.set('berry/2/', b'2')
+
+            # Not visible to other connections until committed.
+            other = sqlite3.connect(path)
+            self.assertEqual(other.execute('SELECT COUNT(*) FROM cache').fetchone()[0], 0)
+
+        self.assertEqual(other.execute('SELECT COUNT(*) FROM cache').fetchone()[0], 2)
+        other.close()
+
+    def testMethod_transaction_RolledBack(self):
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.set('berry/1/', b'1')
+                raise RuntimeError
+
+        self.assertNotIn('berry/1/', self.store)
+
+    def testEnv_Locked(self):
+        backends.BUSY_TIMEOUT, timeout = 0.01, backends.BUSY_TIMEOUT
+        try:
+            other = backends.SQLiteStore(os.path.join(self.directory, 'api'))
+        finally:
+            backends.BUSY_TIMEOUT = timeout
+
+        with self.store.transaction():
+            self.store.set('berry/1/', b'1')
+
+            with self.assertRaises(OSError) as context:
+                other.set('berry/2/', b'2')
+            self.assertEqual(context.exception.errno, 11)
+
+        other.close()
+
+
+class TestClass_FileStore(StoreTests, unittest.TestCase):
+
+    # backends.FileStore(path)
+
+    make_store = backends.FileStore
+
+    def testMethod_link_HardLink(self):
+        self.store.set('pokemon/1.png', b'png')
+        self.store.link('pokemon/shiny/1.png', 'pokemon/1.png')
+
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.directory, 'api', 'pokemon', '1.png'),
+            os.path.join(self.directory, 'api', 'pokemon', 'shiny', '1.png'),
+        ))
+
+    def testEnv_Files(self):
+        self.store.set('pokemon/shiny/1.png', b'png')
+
+        with open(os.path.join(self.directory, 'api', 'pokemon', 'shiny', '1.png'), 'rb') as img_file:
+            self.assertEqual(img_file.read(), b'png')
+
+    # File names can not end with a slash.
+
+    def testMethods_get_set(self):
+        self.store.set('berry/1', b'{"id":1}')
+
+        self.assertEqual(self.store.get('berry/1'), b'{"id":1}')
+        self.assertIn('berry/1', self.store)
+        self.assertIsNone(self.store.get('berry/2'))
+
+    def testMethods_get_many_set_many(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'2')])
+
+        self.assertEqual(self.store.get_many(['berry/1', 'berry/3']), {'berry/1': b'1'})
+
+    def testMethod_delete(self):
+        self.store.set('berry/1', b'1')
+
+        self.assertTrue(self.store.delete('berry/1'))
+        self.assertFalse(self.store.delete('berry/1'))
+
+    def testMethod_iterate(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'2'), ('item/1', b'3')])
+
+        self.assertEqual(sorted(self.store.iterate()), ['berry/1', 'berry/2', 'item/1'])
+        self.assertEqual(sorted(self.store.iterate('berry/')), ['berry/1', 'berry/2'])
+
+    def testMethod_stats(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'22')])
+
+        self.assertEqual(self.store.stats(), {'entries': 2, 'bytes': 3})
+
+
+class TestClass_PackStore(ObjectStoreTests, unittest.TestCase):
+
+    # backends.PackStore(path)
+
+    make_store = backends.PackStore
+
+    def reopen(self):
+        self.store.close()
+        self.store = backends.PackStore(os.path.join(self.directory, 'api'))
+
+    def testMethod_view(self):
+        self.store.set('pokemon/1.png', b'png')
+
+        view = self.store.view('pokemon/1.png')
+
+        self.assertIsInstance(view, memoryview)
+        self.assertTrue(view.readonly)
+        self.assertEqual(view, b'png')
+        self.assertIsNone(self.store.view('pokemon/2.png'))
+
+    def testMethod_view_KeptAfterClose(self):
+        self.store.set('pokemon/1.png', b'png')
+        view = self.store.view('pokemon/1.png')
+
+        self.reopen()
+        self.store.set('pokemon/2.png', b'gif')
+
+        self.assertEqual(view, b'png')
+        self.assertEqual(self.store.view('pokemon/2.png'), b'gif')
+
+    def testMethod_link_Shared(self):
+        self.store.set('pokemon/1.png', b'png')
+        self.store.link('pokemon/shiny/1.png', 'pokemon/1.png')
+        self.store.compact()
+
+        self.assertEqual(self.store.stats(), {'entries': 2, 'bytes': 3})
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, 'api')), 3)
+        self.assertEqual(self.store.get('pokemon/shiny/1.png'), b'png')
+
+    def testEnv_Reopened(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'2'), ('meta:berry/1', {'etag': '"abc"'})])
+        self.store.set('berry/2', b'22')
+        self.store.delete('berry/1')
+
+        self.reopen()
+
+        self.assertEqual(sorted(self.store.iterate()), ['berry/2', 'meta:berry/1'])
+        self.assertEqual(self.store.get('berry/2'), b'22')
+        self.assertEqual(self.store.get('meta:berry/1'), {'etag': '"abc"'})
+
+    def testEnv_Torn(self):
+        self.store.set_many([('berry/1', b'1'), ('berry/2', b'2')])
+        self.store.close()
+        with open(os.path.join(self.directory, 'api'), 'r+b') as data_file:
+            data_file.truncate(1)
+
+        self.reopen()
+        self.store.set('berry/3', b'3')
+        self.reopen()
+
+        self.assertEqual(self.store.get_many(['berry/1', 'berry/2', 'berry/3']), {'berry/1': b'1', 'berry/3': b'3'})
+
+    def testEnv_TwoWriters(self):
+        other = backends.PackStore(os.path.join(self.directory, 'api'))
+        self.addCleanup(other.close)
+
+        self.store.set('a.png', b'AAAA')
+        other.set('b.png', b'BBBB')
+        self.store.set('c.png', b'CC')
+        other.delete('a.png')
+
+        for store in (self.store, other):
+            self.assertEqual(store.get_many(['a.png', 'b.png', 'c.png']), {'b.png': b'BBBB', 'c.png': b'CC'})
+
+        self.reopen()
+        self.assertEqual(self.store.get_many(['a.png', 'b.png', 'c.png']), {'b.png': b'BBBB', 'c.png': b'CC'})
+
+    def testMethod_compact_Shrinks(self):
+        path = os.path.join(self.directory, 'api')
+        for _ in range(10):
+            self.store.set('berry/1', bytes(1000))
+        self.store.sync()
+        size = os.path.getsize(path)
+
+        self.store.compact()
+
+        self.assertEqual(os.path.getsize(path), 1000)
+        self.assertLess(os.path.getsize(path), size)
+        self.assertEqual(self.store.get('berry/1'), bytes(1000))
+
+
+class TestClass_MmapStore(unittest.TestCase):
+
+    # backends.MmapStore(path)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'api.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testMethod_write(self):
+        items = [('berry/1/', b'{"id":1}'), ('meta:berry/1/', {'etag': '"abc"'}), ('item/1/', b'')]
+        self.assertEqual(backends.MmapStore.write(self.path, items), 3)
+
+        store = backends.MmapStore(self.path)
+        self.assertEqual(store.get('berry/1/'), b'{"id":1}')
+        self.assertEqual(store.get('meta:berry/1/'), {'etag': '"abc"'})
+        self.assertEqual(store.get('item/1/'), b'')
+        self.assertIsNone(store.get('berry/2/'))
+        self.assertEqual(store.get_many(['berry/1/', 'berry/2/']), {'berry/1/': b'{"id":1}'})
+        self.assertEqual(sorted(store.iterate('berry/')), ['berry/1/'])
+        self.assertEqual(store.stats()['entries'], 3)
+        store.close()
+
+    def testEnv_FileNotFound(self):
+        store = backends.MmapStore(self.path)
+
+        self.assertIsNone(store.get('berry/1/'))
+        self.assertEqual(store.stats(), {'entries': 0, 'bytes': 0})
+
+    def testEnv_NotASnapshot(self):
+        with open(self.path, 'wb') as snapshot_file:
+            snapshot_file.write(b'\0' * 64)
+
+        with self.assertRaises(ValueError):
+            backends.MmapStore(self.path)
+
+    def testEnv_ReadOnly(self):
+        store = backends.MmapStore(self.path)
+
+        for write in (lambda: store.set('berry/1/', b'1'),
+                      lambda: store.set_many([('berry/1/', b'1')]),
+                      lambda: store.delete('berry/1/')):
+            with self.assertRaises(OSError) as context:
+                write()
+            self.assertEqual(context.exception.errno, errno.EROFS)
+
+
+class TestFunction_set_cache_backend(unittest.TestCase):
+
+    # cache.set_cache(new_path=None, backend=None, sprite_backend=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        cache.set_cache('testing', backend='shelve', sprite_backend='files')
+        shutil.rmtree(self.directory)
+
+    def assertRoundTrip(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save_meta({'etag': '"abc"'}, 'berry', 1)
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+        cache.close()
+        cache.clear_memory()
+
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+        self.assertEqual({'etag': '"abc"'}, cache.load_meta('berry', 1))
+        self.assertEqual(b'png', cache.load_sprite('pokemon', 1)['img_data'])
+
+    def testArg_backend_sqlite(self):
+        _, api_cache, _ = cache.set_cache(self.directory, backend='sqlite', sprite_backend='sqlite')
+
+        self.assertEqual(api_cache, os.path.join(self.directory, 'api.sqlite'))
+        self.assertRoundTrip()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'sprite.sqlite')))
+
+    def testArg_sprite_backend_pack(self):
+        cache.set_cache(self.directory, sprite_backend='pack')
+
+        self.assertRoundTrip()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'sprite.pack')))
+
+        img_data = cache.load_sprite('pokemon', 1, zero_copy=True)['img_data']
+        self.assertIsInstance(img_data, memoryview)
+        self.assertEqual(img_data, b'png')
+
+    def testArg_backend_memory(self):
+        cache.set_cache(self.directory, backend='memory', sprite_backend='memory')
+
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+        cache.clear_memory()
+
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+        self.assertEqual(b'png', cache.load_sprite('pokemon', 1)['img_data'])
+        self.assertEqual(os.listdir(self.directory), ['sprite'])
+
+    def testArg_backend_mmap(self):
+        cache.set_cache(self.directory, backend='sqlite')
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save_meta({'etag': '"abc"'}, 'berry', 1)
+        self.assertEqual(cache.snapshot(), 2)
+
+        cache.set_cache(self.directory, backend='mmap')
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+        self.assertEqual({'etag': '"abc"'}, cache.load_meta('berry', 1))
+
+        # Writes are skipped.
+        self.assertIsNone(cache.save({'id': 2}, 'berry', 2))
+        cache.clear_memory()
+        with self.assertRaises(KeyError):
+            cache.load('berry', 2)
+
+    def testArg_backend_Kept(self):
+        cache.set_cache(self.directory, backend='sqlite')
+        cache.set_cache(self.directory)
+
+        self.assertEqual(cache.BACKEND, 'sqlite')
+
+    def testArg_backend_Unknown(self):
+        for backend in ('not-a-backend', 'files'):
+            with self.assertRaises(ValueError):
+                cache.set_cache(self.directory, backend=backend)
+
+    def testArg_sprite_backend_Unknown(self):
+        with self.assertRaises(ValueError):
+            cache.set_cache(self.directory, sprite_backend='not-a-backend')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def testEnv_Processes(self):
+        cache.set_cache(self.directory, backend='sqlite')
+        cache.save({'id': 0}, 'berry', 0)
+
+        pids = []
+        for worker in range(4):
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover
+                ok = False
+                try:
+                    cache.set_flush_interval(0)
+                    for resource_id in range(worker * 25 + 1, worker * 25 + 26):
+                        cache.save({'id': resource_id}, 'berry', resource_id)
+                    ok = cache.load('berry', 0) == {'id': 0}
+                finally:
+                    os._exit(0 if ok else 1)
+            pids.append(pid)
+
+        for pid in pids:
+            self.assertEqual(os.waitpid(pid, 0)[1], 0)
+
+        cache.clear_memory()
+        self.assertEqual(len(cache.load_many('berry', range(101))), 101)
+
+
+class TestFunction_delete(unittest.TestCase):
+
+    # cache.delete(endpoint, resource_id=None, subresource=None)
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    def testArgs(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save_meta({'etag': '"abc"'}, 'berry', 1)
+
+        self.assertTrue(cache.delete('berry', 1))
+        self.assertFalse(cache.delete('berry', 1))
+
+        with self.assertRaises(KeyError):
+            cache.load('berry', 1)
+        self.assertEqual({}, cache.load_meta('berry', 1))
+
+
+class TestFunction_stats(unittest.TestCase):
+
+    # cache.stats()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='memory')
+
+    def tearDown(self):
+        cache.set_cache('testing', backend='shelve')
+        shutil.rmtree(self.directory)
+
+    def testReturns(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+
+        # The API store also holds the hash of the sprite, both ways.
+        stats = cache.stats()
+        self.assertEqual(stats['api']['entries'], 3)
+        self.assertGreater(stats['api']['bytes'], len(b'{"id":1}'))
+        self.assertEqual(stats['sprite'], {'entries': 1, 'bytes': 3})
+
+
+class TestFunction_save_sprite_hashes(unittest.TestCase):
+
+    # cache.save_sprite_hashes(hashes)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory)
+
+    def tearDown(self):
+        cache.set_cache('testing')
+        shutil.rmtree(self.directory)
+
+    def testArgs(self):
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+
+        self.assertEqual(cache.save_sprite_hashes([
+            ('pokemon/shiny/1.png', cache.sprite_hash(b'png')),
+            ('pokemon/back/1.png', cache.sprite_hash(b'gif')),
+        ]), 2)
+
+        self.assertEqual(cache.load_sprite('pokemon', 1, shiny=True)['img_data'], b'png')
+        with self.assertRaises(FileNotFoundError):
+            cache.load_sprite('pokemon', 1, back=True)
+
+    def testEnv_Duplicates(self):
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1, female=True)
+
+        self.assertTrue(os.path.samefile(
+            cache.get_sprite_path('pokemon', 1),
+            cache.get_sprite_path('pokemon', 1, female=True),
+        ))
+
+    def testEnv_SourceReplaced(self):
+        cache.save_sprite({'img_data': b'OLD-IMAGE'}, 'pokemon', 1)
+        cache.save_sprite({'img_data': b'NEW-IMAGE'}, 'pokemon', 1)
+        cache.save_sprite({'img_data': b'OLD-IMAGE'}, 'pokemon', 2)
+
+        self.assertEqual(cache.load_sprite('pokemon', 1)['img_data'], b'NEW-IMAGE')
+        self.assertEqual(cache.load_sprite('pokemon', 2)['img_data'], b'OLD-IMAGE')
+
+        cache.save_sprite_hashes([('pokemon/3.png', cache.sprite_hash(b'OLD-IMAGE'))])
+        self.assertEqual(cache.load_sprite('pokemon', 3)['img_data'], b'OLD-IMAGE')
+
+    def testEnv_SourceEvicted(self):
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+        cache.evict('sprite', 0)
+
+        cache.save_sprite_hashes([('pokemon/2.png', cache.sprite_hash(b'png'))])
+        with self.assertRaises(FileNotFoundError):
+            cache.load_sprite('pokemon', 2)
+
+    def testFunction_sprite_hash(self):
+        # As `git hash-object`.
+        self.assertEqual(cache.sprite_hash(b'hello\n'), 'ce013625030ba8dba906f756967f9e9ca394464a')
@@ -3,9 +3,14 @@
 import importlib
 import os
 import shelve
+import shutil
+import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
-from hypothesis import assume, given
+from hypothesis import assume, given, settings
 from hypothesis.strategies import characters, dictionaries, integers, sampled_from, text
 
 from pokebase import cache
@@ -71,6 +76,16 @@ class TestFunction_save(unittest.TestCase):
         self.assertIsNone(cache.save(data, endpoint, resource_id))
         cache_db.close()
 
+    def testArg_data_Bytes(self):
+        cache.save(b'{"id": 1}', 'berry', 1)
+
+        cache.close()
+        with shelve.open(cache.API_CACHE) as c:
+            self.assertEqual(c['berry/1/'], b'{"id": 1}')
+        cache.invalidate('berry', 1)
+
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+
 
 class TestFunction_load(unittest.TestCase):
 
@@ -99,6 +114,7 @@ class TestFunction_load(unittest.TestCase):
         with self.assertRaises(ValueError):
             cache.load(endpoint, resource_id)
 
+    @settings(deadline=None)
     @given(data=dictionaries(text(), text()),
            endpoint=sampled_from(ENDPOINTS),
            resource_id=integers(min_value=1),
@@ -126,19 +142,465 @@ class TestFunction_load(unittest.TestCase):
             cache.load(endpoint, resource_id)
         cache_db.close()
 
+    @settings(deadline=None)
     @given(endpoint=sampled_from(ENDPOINTS),
            resource_id=integers(min_value=1))
     def testEnv_KeyNotInCache(self, endpoint, resource_id):
 
+        cache.close()
         with shelve.open(cache.API_CACHE) as c:
             key = cache.cache_uri_build(endpoint, resource_id)
             if key in c:
                 del c[key]
+        cache.invalidate(endpoint, resource_id)
 
         with self.assertRaises(KeyError):
             cache.load(endpoint, resource_id)
 
 
+class TestFunction_load_OldEntries(unittest.TestCase):
+
+    # cache.load(endpoint, resource_id=None) on entries saved undecoded
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    @settings(deadline=None)
+    @given(data=dictionaries(text(), text()),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArgs(self, data, endpoint, resource_id):
+        cache.close()
+        with shelve.open(cache.API_CACHE) as c:
+            c[cache.cache_uri_build(endpoint, resource_id)] = data
+        cache.invalidate(endpoint, resource_id)
+        self.assertEqual(data, cache.load(endpoint, resource_id))
+
+
+class TestFunction_save_many(unittest.TestCase):
+
+    # cache.save_many(entries)
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    @settings(deadline=None)
+    @given(data=dictionaries(text(), text()),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArgs(self, data, endpoint, resource_id):
+        assume(data != dict())
+        self.assertEqual(1, cache.save_many([(data, endpoint, resource_id, None)]))
+        self.assertEqual(data, cache.load(endpoint, resource_id))
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArg_entries_Encoded(self, endpoint, resource_id):
+        cache.save_many([(b'{"id": 1}', endpoint, resource_id, None)])
+        self.assertEqual({'id': 1}, cache.load(endpoint, resource_id))
+
+    @given(data=text(),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArg_entries_Text(self, data, endpoint, resource_id):
+        with self.assertRaises(ValueError):
+            cache.save_many([(data, endpoint, resource_id, None)])
+
+
+class TestFunction_load_many(unittest.TestCase):
+
+    # cache.load_many(endpoint, resource_ids)
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    @given(data=dictionaries(text(), text()),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArgs(self, data, endpoint, resource_id):
+        assume(data != dict())
+        cache.save(data, endpoint, resource_id)
+        self.assertEqual({resource_id: data}, cache.load_many(endpoint, [resource_id]))
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testEnv_KeyNotInCache(self, endpoint, resource_id):
+
+        cache.close()
+        with shelve.open(cache.API_CACHE) as c:
+            key = cache.cache_uri_build(endpoint, resource_id)
+            if key in c:
+                del c[key]
+        cache.invalidate(endpoint, resource_id)
+
+        self.assertEqual({}, cache.load_many(endpoint, [resource_id]))
+
+    @given(endpoint=text(),
+           resource_id=integers(min_value=1))
+    def testArg_endpoint_Text(self, endpoint, resource_id):
+        with self.assertRaises(ValueError):
+            cache.load_many(endpoint, [resource_id])
+
+
+class TestFunction_set_memory_cache(unittest.TestCase):
+
+    # cache.set_memory_cache(max_entries=None, max_bytes=None)
+
+    def setUp(self):
+        cache.set_cache('testing')
+        self.limits = cache.MEMORY_MAX_ENTRIES, cache.MEMORY_MAX_BYTES
+
+    def tearDown(self):
+        cache.set_memory_cache(*self.limits)
+
+    @settings(deadline=None)
+    @given(data=dictionaries(text(), text(), min_size=1),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testEnv_ServedFromMemory(self, data, endpoint, resource_id):
+        cache.save(data, endpoint, resource_id)
+
+        with patch('shelve.open', side_effect=AssertionError):
+            self.assertEqual(data, cache.load(endpoint, resource_id))
+            self.assertEqual({resource_id: data}, cache.load_many(endpoint, [resource_id]))
+
+    @settings(deadline=None)
+    @given(data=dictionaries(text(), text(), min_size=1),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testEnv_ReturnsCopies(self, data, endpoint, resource_id):
+        cache.save(data, endpoint, resource_id)
+        cache.load(endpoint, resource_id).clear()
+
+        self.assertEqual(data, cache.load(endpoint, resource_id))
+
+    @settings(deadline=None)
+    @given(max_entries=integers(min_value=1, max_value=8))
+    def testArg_max_entries(self, max_entries):
+        cache.set_memory_cache(max_entries=max_entries)
+
+        for resource_id in range(1, 11):
+            cache.save({'id': resource_id}, 'berry', resource_id)
+
+        self.assertEqual(list(cache._memory), [
+            cache.cache_uri_build('berry', resource_id) for resource_id in range(11 - max_entries, 11)
+        ])
+
+    def testArg_max_entries_LeastRecentlyUsed(self):
+        cache.set_memory_cache(max_entries=2)
+
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save({'id': 2}, 'berry', 2)
+        cache.load('berry', 1)
+        cache.save({'id': 3}, 'berry', 3)
+
+        self.assertEqual(list(cache._memory), ['berry/1/', 'berry/3/'])
+
+    def testArg_max_entries_Zero(self):
+        cache.set_memory_cache(max_entries=0)
+        cache.save({'id': 1}, 'berry', 1)
+
+        self.assertEqual(len(cache._memory), 0)
+
+    def testArg_max_bytes(self):
+        cache.set_memory_cache(max_entries=100, max_bytes=30)
+
+        for resource_id in range(1, 11):
+            cache.save({'id': resource_id}, 'berry', resource_id)
+
+        self.assertLessEqual(cache._memory_bytes, 30)
+        self.assertEqual(cache._memory_bytes, sum(len(value) for value in cache._memory.values()))
+        self.assertIn('berry/10/', cache._memory)
+
+
+class TestFunction_invalidate(unittest.TestCase):
+
+    # cache.invalidate(endpoint, resource_id=None, subresource=None)
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    @settings(deadline=None)
+    @given(endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testEnv_ReadsDisk(self, endpoint, resource_id):
+        cache.save({'old': 'data'}, endpoint, resource_id)
+
+        cache.close()
+        with shelve.open(cache.API_CACHE) as c:
+            c[cache.cache_uri_build(endpoint, resource_id)] = b'{"new":"data"}'
+
+        self.assertEqual({'old': 'data'}, cache.load(endpoint, resource_id))
+        cache.invalidate(endpoint, resource_id)
+        self.assertEqual({'new': 'data'}, cache.load(endpoint, resource_id))
+
+
+class TestFunction_cache_close(unittest.TestCase):
+
+    # cache.close()
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    def testEnv_HandleKept(self):
+        cache.close()
+        cache.clear_memory()
+
+        with patch('shelve.open', wraps=shelve.open) as mock_open:
+            cache.save({'id': 1}, 'berry', 1)
+            cache.clear_memory()
+            cache.load('berry', 1)
+            cache.load_meta('berry', 1)
+
+        self.assertEqual(mock_open.call_count, 1)
+
+    def testEnv_Reopened(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.close()
+        cache.clear_memory()
+
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+
+    def testEnv_Threads(self):
+        def work(resource_id):
+            cache.save({'id': resource_id}, 'berry', resource_id)
+            cache.invalidate('berry', resource_id)
+            return cache.load('berry', resource_id)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(1, 33)))
+
+        self.assertEqual(results, [{'id': resource_id} for resource_id in range(1, 33)])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def testEnv_Fork(self):
+        cache.save({'id': 1}, 'berry', 1)
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            ok = False
+            try:
+                cache.clear_memory()
+                ok = not cache._stores and cache.load('berry', 1) == {'id': 1}
+            finally:
+                os._exit(0 if ok else 1)
+
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+        self.assertEqual({'id': 1}, cache.load('berry', 1))
+
+
+class TestFunction_set_flush_interval(unittest.TestCase):
+
+    # cache.set_flush_interval(seconds)
+
+    def setUp(self):
+        cache.set_cache('testing')
+        self.interval = cache.FLUSH_INTERVAL
+
+        # Closing an idle store flushes it too; see testEnv_IdleStoreClosed.
+        locks_file = patch('pokebase.backends.ShelveStore.LOCKS_FILE', False)
+        locks_file.start()
+        self.addCleanup(locks_file.stop)
+
+    def tearDown(self):
+        cache.set_flush_interval(self.interval)
+
+    def testArg_seconds_Zero(self):
+        cache.set_flush_interval(0)
+
+        with patch('shelve.Shelf.sync') as mock_sync:
+            cache.save({'id': 1}, 'berry', 1)
+            cache.save({'id': 2}, 'berry', 2)
+
+        self.assertEqual(mock_sync.call_count, 2)
+
+    def testArg_seconds(self):
+        cache.set_flush_interval(3600)
+        cache.flush()
+
+        with patch('shelve.Shelf.sync') as mock_sync:
+            cache.save({'id': 1}, 'berry', 1)
+            cache.save({'id': 2}, 'berry', 2)
+
+        self.assertEqual(mock_sync.call_count, 0)
+
+    def testEnv_LoneWriteFlushed(self):
+        cache.set_flush_interval(0.1)
+        cache.flush()
+
+        with patch('shelve.Shelf.sync') as mock_sync:
+            cache.save({'id': 1}, 'berry', 1)
+            self.assertEqual(mock_sync.call_count, 0)
+
+            for _ in range(100):
+                if mock_sync.called:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(mock_sync.call_count, 1)
+
+    @patch('pokebase.backends.ShelveStore.LOCKS_FILE', True)
+    def testEnv_IdleStoreClosed(self):
+        cache.set_flush_interval(0.1)
+        cache.save({'id': 1}, 'berry', 1)
+        self.assertIn('api', cache._stores)
+
+        for _ in range(100):
+            if 'api' not in cache._stores:
+                break
+            time.sleep(0.01)
+
+        self.assertNotIn('api', cache._stores)
+        cache.clear_memory()
+        self.assertEqual(cache.load('berry', 1), {'id': 1})
+
+    @patch('pokebase.backends.ShelveStore.LOCKS_FILE', True)
+    def testEnv_ClosedBeforeFork(self):
+        cache.set_flush_interval(3600)
+        cache.save({'id': 1}, 'berry', 1)
+
+        cache._before_fork()
+        cache._after_fork_in_parent()
+
+        self.assertNotIn('api', cache._stores)
+        cache.clear_memory()
+        self.assertEqual(cache.load('berry', 1), {'id': 1})
+
+
+class TestFunction_set_compression(unittest.TestCase):
+
+    # cache.set_compression(name=None, level=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='memory')
+
+    def tearDown(self):
+        cache.set_compression('none')
+        cache.set_cache('testing', backend='shelve')
+        shutil.rmtree(self.directory)
+
+    def stored(self, uri):
+        return cache._stores['api'].get(uri)
+
+    def testArg_name_zlib(self):
+        data = {'url': 'https://pokeapi.co/api/v2/berry/1/' * 10}
+        cache.set_compression('zlib')
+
+        cache.save(data, 'berry', 1)
+        cache.clear_memory()
+
+        self.assertEqual(self.stored('berry/1/')[:1], b'\x01')
+        self.assertLess(len(self.stored('berry/1/')), len(cache.codec.dumps(data)))
+        self.assertEqual(cache.load('berry', 1), data)
+        self.assertEqual(cache.load_many('berry', [1]), {1: data})
+
+    @unittest.skipIf(cache.zstd is None, 'needs zstandard')
+    def testArg_name_zstd(self):
+        cache.set_compression('zstd')
+
+        cache.save_many([({'id': 1}, 'berry', 1, None), (b'{"id":2}', 'berry', 2, None)])
+        cache.clear_memory()
+
+        self.assertEqual(self.stored('berry/1/')[:1], b'\x02')
+        self.assertEqual(cache.load_many('berry', [1, 2]), {1: {'id': 1}, 2: {'id': 2}})
+
+    def testArg_name_Mixed(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.set_compression('zlib')
+        cache.save({'id': 2}, 'berry', 2)
+        cache.set_compression('none')
+        cache.clear_memory()
+
+        self.assertEqual(cache.load_many('berry', [1, 2]), {1: {'id': 1}, 2: {'id': 2}})
+
+    def testArg_name_Unknown(self):
+        with self.assertRaises(ValueError):
+            cache.set_compression('lzma')
+
+
+@unittest.skipIf(cache.zstd is None, 'needs zstandard')
+class TestFunction_train_dictionaries(unittest.TestCase):
+
+    # cache.train_dictionaries(endpoints=None, size=112640, samples=1000)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='memory')
+        cache.set_compression('zstd')
+
+    def tearDown(self):
+        cache.set_compression('none')
+        cache.set_cache('testing', backend='shelve')
+        shutil.rmtree(self.directory)
+
+    def resource(self, resource_id):
+        return {
+            'id': resource_id,
+            'name': 'move-{}'.format(resource_id * 7919 % 1000),
+            'moves': [
+                {'move': {'name': 'move-{}'.format(i), 'url': 'https://pokeapi.co/api/v2/move/{}/'.format(i)}}
+                for i in range(resource_id % 13, resource_id % 13 + 10)
+            ],
+        }
+
+    def testReturns(self):
+        cache.save_many((self.resource(i), 'pokemon', i, None) for i in range(1, 301))
+        size = cache.stats()['api']['bytes']
+
+        self.assertEqual(cache.train_dictionaries(size=4096), {'pokemon': 300})
+
+        self.assertLess(cache.stats()['api']['bytes'], size)
+        cache.save(self.resource(301), 'pokemon', 301)
+        cache.clear_memory()
+        self.assertEqual(cache.load('pokemon', 7), self.resource(7))
+        self.assertEqual(cache.load('pokemon', 301), self.resource(301))
+
+    def testEnv_TooFewEntries(self):
+        cache.save({'id': 1}, 'berry', 1)
+
+        self.assertEqual(cache.train_dictionaries(['berry']), {})
+        self.assertEqual(cache.load('berry', 1), {'id': 1})
+
+    def testEnv_NotZstd(self):
+        cache.set_compression('zlib')
+
+        with self.assertRaises(ValueError):
+            cache.train_dictionaries()
+
+
+class TestFunction_save_meta(unittest.TestCase):
+
+    # cache.save_meta(meta, endpoint, resource_id=None, subresource=None)
+
+    def setUp(self):
+        cache.set_cache('testing')
+
+    @settings(deadline=None)
+    @given(meta=dictionaries(text(), text()),
+           endpoint=sampled_from(ENDPOINTS),
+           resource_id=integers(min_value=1))
+    def testArgs(self, meta, endpoint, resource_id):
+        cache.save_meta(meta, endpoint, resource_id)
+        self.assertEqual(meta, cache.load_meta(endpoint, resource_id))
+
+    @settings(deadline=None)
+    @given(meta=dictionaries(text(), text()),
+           sprite_id=integers(min_value=1))
+    def testArgs_Sprite(self, meta, sprite_id):
+        cache.save_sprite_meta(meta, 'pokemon', sprite_id, shiny=True)
+        self.assertEqual(meta, cache.load_sprite_meta('pokemon', sprite_id, shiny=True))
+
+    @settings(deadline=None)
+    @given(endpoint=text(),
+           resource_id=integers(min_value=1))
+    def testArg_endpoint_Text(self, endpoint, resource_id):
+        with self.assertRaises(ValueError):
+            cache.load_meta(endpoint, resource_id)
+
+
 class TestFunction_set_cache(unittest.TestCase):
 
     # cache.set_cache(new_path=None)
@@ -184,3 +646,141 @@ class TestFunction_set_cache(unittest.TestCase):
                          cache.SPRITE_CACHE)
         os.rmdir(cache.SPRITE_CACHE)
         os.rmdir(cache.CACHE_DIR)
+
+
+class TestFunction_set_size_limit(unittest.TestCase):
+
+    # cache.set_size_limit(api_bytes=None, sprite_bytes=None, policy=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='memory', sprite_backend='memory')
+
+    def tearDown(self):
+        cache.set_size_limit(0, 0, 'lru')
+        cache.set_cache('testing', backend='shelve', sprite_backend='files')
+        shutil.rmtree(self.directory)
+
+    def testArg_api_bytes_LRU(self):
+        cache.set_size_limit(api_bytes=1000, policy='lru')
+
+        for resource_id in range(1, 11):
+            cache.save({'data': 'x' * 90}, 'berry', resource_id)
+            cache.load('berry', 1)
+
+        self.assertLess(cache.stats()['api']['entries'], 10)
+        self.assertEqual(cache.load('berry', 1), {'data': 'x' * 90})
+        self.assertEqual(cache.load('berry', 10), {'data': 'x' * 90})
+        with self.assertRaises(KeyError):
+            cache.load('berry', 2)
+
+    def testArg_api_bytes_LFU(self):
+        cache.set_size_limit(api_bytes=1000, policy='lfu')
+
+        for resource_id in range(1, 10):
+            cache.save({'data': 'x' * 90}, 'berry', resource_id)
+            for _ in range(resource_id):
+                cache.load('berry', resource_id)
+        cache.save({'data': 'x' * 90}, 'berry', 10)
+
+        self.assertEqual(cache.load('berry', 9), {'data': 'x' * 90})
+        with self.assertRaises(KeyError):
+            cache.load('berry', 1)
+
+    def testArg_sprite_bytes(self):
+        cache.set_size_limit(sprite_bytes=100)
+
+        for sprite_id in range(1, 6):
+            cache.save_sprite({'img_data': bytes([sprite_id]) * 30}, 'pokemon', sprite_id)
+            cache.save_sprite_meta({'etag': '"abc"'}, 'pokemon', sprite_id)
+
+        self.assertLessEqual(cache.stats()['sprite']['bytes'], 100)
+        with self.assertRaises(FileNotFoundError):
+            cache.load_sprite('pokemon', 1)
+        self.assertEqual(cache.load_sprite_meta('pokemon', 1), {})
+        self.assertEqual(cache.load_sprite('pokemon', 5)['img_data'], bytes([5]) * 30)
+
+    def testEnv_InternalRecordsNotCounted(self):
+        cache.set_size_limit(api_bytes=3000)
+        berries = [{'name': str(i), 'url': 'https://pokeapi.co/api/v2/berry/{}/'.format(i)} for i in range(1, 301)]
+        cache.save({'count': 300, 'next': None, 'results': berries}, 'berry')
+        cache.save_sprite_hashes(('pokemon/{}.png'.format(i), str(i) * 40) for i in range(100))
+
+        for resource_id in range(1, 40):
+            cache.save({'data': 'x' * 200}, 'berry', resource_id)
+            cache.save_meta({'etag': '"abc"'}, 'berry', resource_id)
+
+        self.assertGreater(cache.stats()['api']['entries'], 100)
+        self.assertEqual(cache.load('berry', 39), {'data': 'x' * 200})
+        for resource_id in range(1, 40):
+            try:
+                cache.load('berry', resource_id)
+            except KeyError:
+                self.assertEqual(cache.load_meta('berry', resource_id), {})
+            else:
+                self.assertEqual(cache.load_meta('berry', resource_id), {'etag': '"abc"'})
+
+    def testArg_api_bytes_Zero(self):
+        cache.set_size_limit(api_bytes=100)
+
+        self.assertEqual(cache.set_size_limit(api_bytes=0), (None, None, 'lru'))
+
+        for resource_id in range(1, 11):
+            cache.save({'data': 'x' * 90}, 'berry', resource_id)
+        self.assertEqual(cache.stats()['api']['entries'], 10)
+
+    def testArg_policy_Unknown(self):
+        with self.assertRaises(ValueError):
+            cache.set_size_limit(policy='fifo')
+
+
+class TestFunction_evict(unittest.TestCase):
+
+    # cache.evict(name=None, max_bytes=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='memory')
+
+    def tearDown(self):
+        cache.set_cache('testing', backend='shelve')
+        shutil.rmtree(self.directory)
+
+    def testArgs(self):
+        for resource_id in range(1, 5):
+            cache.save({'id': resource_id}, 'berry', resource_id)
+            cache.save_meta({'etag': '"abc"'}, 'berry', resource_id)
+
+        self.assertEqual(cache.evict('api', 0), 4)
+
+        self.assertEqual(cache.stats()['api'], {'entries': 0, 'bytes': 0})
+        with self.assertRaises(KeyError):
+            cache.load('berry', 1)
+
+    def testArgs_NoLimit(self):
+        cache.save({'id': 1}, 'berry', 1)
+
+        self.assertEqual(cache.evict(), 0)
+        self.assertEqual(cache.load('berry', 1), {'id': 1})
+
+
+class TestFunction_compact(unittest.TestCase):
+
+    # cache.compact(name=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(self.directory, backend='sqlite')
+
+    def tearDown(self):
+        cache.set_cache('testing', backend='shelve')
+        shutil.rmtree(self.directory)
+
+    def testReturns(self):
+        cache.save({'id': 1}, 'berry', 1)
+        cache.save({'id': 2}, 'berry', 2)
+        cache.delete('berry', 2)
+
+        self.assertEqual(cache.compact()['api']['entries'], 1)
+        cache.clear_memory()
+        self.assertEqual(cache.load('berry', 1), {'id': 1})
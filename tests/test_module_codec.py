@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+
+from hypothesis import given
+from hypothesis.strategies import dictionaries, integers, lists, sampled_from, text
+
+from pokebase import codec
+
+
+class TestFunction_set_codec(unittest.TestCase):
+
+    # codec.set_codec(name=None)
+
+    def tearDown(self):
+        codec.set_codec()
+
+    def testArg_name_None(self):
+        self.assertIn(codec.set_codec(), codec.CODECS)
+        if codec.orjson is not None:
+            self.assertEqual(codec.NAME, 'orjson')
+
+    @given(name=sampled_from(sorted(codec.CODECS)))
+    def testArg_name_Installed(self, name):
+        self.assertEqual(codec.set_codec(name), name)
+        self.assertIs(codec.loads, codec.CODECS[name][0])
+
+    @given(name=text())
+    def testArg_name_Text(self, name):
+        if name not in codec.CODECS:
+            with self.assertRaises(ValueError):
+                codec.set_codec(name)
+
+
+class TestFunctions_loads_dumps(unittest.TestCase):
+
+    # codec.loads(data), codec.dumps(obj)
+
+    def tearDown(self):
+        codec.set_codec()
+
+    @given(name=sampled_from(sorted(codec.CODECS)),
+           obj=dictionaries(text(), lists(integers(min_value=-2**53, max_value=2**53) | text())))
+    def testArgs_RoundTrip(self, name, obj):
+        codec.set_codec(name)
+        encoded = codec.dumps(obj)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(codec.loads(encoded), obj)
+        self.assertEqual(json.loads(encoded.decode('utf-8')), obj)
+
+    @given(name=sampled_from(sorted(codec.CODECS)),
+           obj=dictionaries(text(), text()))
+    def testArg_data_Bytes(self, name, obj):
+        codec.set_codec(name)
+        self.assertEqual(codec.loads(json.dumps(obj).encode('utf-8')), obj)
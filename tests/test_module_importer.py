@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from pokebase import __main__ as cli
+from pokebase import cache, importer
+from pokebase.common import BASE_URL
+
+FILES = {
+    'data/api/v2/index.json': {'berry': '/api/v2/berry/'},
+    'data/api/v2/berry/index.json': {
+        'count': 1,
+        'next': None,
+        'previous': None,
+        'results': [{'name': 'cheri', 'url': '/api/v2/berry/1/'}],
+    },
+    'data/api/v2/berry/1/index.json': {
+        'id': 1,
+        'name': 'cheri',
+        'firmness': {'name': 'soft', 'url': '/api/v2/berry-firmness/2/'},
+    },
+    'data/api/v2/pokemon/1/encounters/index.json': [],
+    'data/api/v2/pokemon/1/index.json': {'id': 1, 'name': 'bulbasaur'},
+}
+
+
+class TestFunction_import_dump(unittest.TestCase):
+
+    # importer.import_dump(path, endpoints=None)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        cache.set_cache(os.path.join(self.directory, 'cache'))
+
+        self.dump = os.path.join(self.directory, 'api-data')
+        for name, data in FILES.items():
+            path = os.path.join(self.dump, *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as json_file:
+                json.dump(data, json_file, indent=4)
+
+    def tearDown(self):
+        cache.set_cache('testing')
+        shutil.rmtree(self.directory)
+
+    def assertImported(self, counts):
+        self.assertEqual(counts, {'berry': 2, 'pokemon': 2})
+        self.assertEqual(cache.load('berry', 1)['name'], 'cheri')
+        self.assertEqual(cache.load('berry')['results'][0]['name'], 'cheri')
+        self.assertEqual(cache.load('pokemon', 1, 'encounters'), [])
+        self.assertIn('fetched', cache.load_meta('berry', 1))
+
+    def testArg_path_Directory(self):
+        self.assertImported(importer.import_dump(self.dump))
+
+    def testArg_path_Zip(self):
+        path = shutil.make_archive(self.dump, 'zip', self.directory, 'api-data')
+        self.assertTrue(zipfile.is_zipfile(path))
+
+        self.assertImported(importer.import_dump(path))
+
+    def testArg_path_Tar(self):
+        path = shutil.make_archive(self.dump, 'gztar', self.directory, 'api-data')
+        self.assertTrue(tarfile.is_tarfile(path))
+
+        self.assertImported(importer.import_dump(path))
+
+    def testArg_path_NotADump(self):
+        path = os.path.join(self.directory, 'not-a-dump.txt')
+        with open(path, 'w') as text_file:
+            text_file.write('nothing here')
+
+        with self.assertRaises(ValueError):
+            importer.import_dump(path)
+
+    def testArg_endpoints(self):
+        self.assertEqual(importer.import_dump(self.dump, endpoints=['pokemon']), {'pokemon': 2})
+
+        with self.assertRaises(KeyError):
+            cache.load('berry', 1)
+
+    def testArg_endpoints_Unknown(self):
+        with self.assertRaises(ValueError):
+            importer.import_dump(self.dump, endpoints=['not-an-endpoint'])
+
+    def testMakesUrlsAbsolute(self):
+        importer.import_dump(self.dump)
+
+        self.assertEqual(
+            cache.load('berry', 1)['firmness']['url'], BASE_URL + '/berry-firmness/2/'
+        )
+
+    def testCommand(self):
+        self.assertEqual(cli.main(['--cache', cache.CACHE_DIR, 'import', self.dump]), 0)
+
+        self.assertEqual(cache.load('pokemon', 1)['name'], 'bulbasaur')
+
+
+class TestFunction__parse_path(unittest.TestCase):
+
+    # importer._parse_path(path)
+
+    def testArg_path(self):
+        self.assertEqual(importer._parse_path('data/api/v2/berry/index.json'), ('berry', None, None))
+        self.assertEqual(importer._parse_path('api/v2/berry/3/index.json'), ('berry', 3, None))
+        self.assertEqual(
+            importer._parse_path('x/api/v2/pokemon/3/encounters/index.json'), ('pokemon', 3, 'encounters')
+        )
+
+    def testArg_path_Ignored(self):
+        for path in ('data/api/v2/index.json',
+                     'data/api/v2/not-an-endpoint/index.json',
+                     'data/api/v2/berry/cheri/index.json',
+                     'data/api/v2/berry/1/data.json',
+                     'data/berry/1/index.json'):
+            self.assertIsNone(importer._parse_path(path))
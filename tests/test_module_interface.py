@@ -1,14 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import pickle
 import unittest
 from unittest.mock import patch
 
 from hypothesis import given
 from hypothesis.strategies import dictionaries, integers, lists, sampled_from, text
 
-from pokebase import interface
+from pokebase import cache, interface
 from pokebase.cache import set_cache
-from pokebase.common import ENDPOINTS
+from pokebase.common import ENDPOINTS, api_url_build
 from pokebase.loaders import pokemon
 
 
@@ -34,6 +35,28 @@ class TestFunction__make_obj(unittest.TestCase):
         obj['url'] = 'http://base.url/{}/{}/'.format(endpoint, resource_id)
         self.assertIsInstance(interface._make_obj(obj), interface.APIResource)
 
+    @patch('pokebase.interface.get_data')
+    def testArg_obj_DictionaryWithUrl_NoLookup(self, mock_get_data):
+        mock_get_data.return_value = {'id': 33, 'name': 'tackle', 'power': 40}
+
+        move = interface._make_obj({'name': 'tackle', 'url': 'https://pokeapi.co/api/v2/move/33/'})
+
+        self.assertEqual((move.endpoint, move.id_, move.name), ('move', 33, 'tackle'))
+        mock_get_data.assert_not_called()
+
+        self.assertEqual(move.power, 40)
+        mock_get_data.assert_called_once_with('move', 33, force_lookup=False)
+
+    @patch('pokebase.interface.get_data')
+    def testArg_obj_DictionaryWithUrl_NoName(self, mock_get_data):
+        mock_get_data.return_value = {'id': 4, 'gene_modulo': 1}
+
+        characteristic = interface._make_obj({'url': 'https://pokeapi.co/api/v2/characteristic/4/'})
+
+        mock_get_data.assert_not_called()
+        self.assertEqual(str(characteristic), '4')
+        self.assertEqual(characteristic.gene_modulo, 1)
+
     @given(obj=lists(elements=text()))
     def testArg_obj_List(self, obj):
         self.assertEqual(obj, interface._make_obj(obj))
@@ -50,6 +73,10 @@ class TestFunction__convert_id_to_name(unittest.TestCase):
     def setUp(self):
         set_cache('testing')
 
+    def setup_example(self):
+        # The mocked endpoint lists change from an example to the next.
+        cache.drop_index()
+
     @given(name=text(),
            endpoint=sampled_from(ENDPOINTS),
            id_=integers(min_value=1))
@@ -83,6 +110,11 @@ class TestFunction__convert_id_to_name(unittest.TestCase):
 class TestFunction__convert_name_to_id(unittest.TestCase):
 
     # _convert_name_to_id(endpoint, name)
+
+    def setup_example(self):
+        # The mocked endpoint lists change from an example to the next.
+        cache.drop_index()
+
     @given(id_=integers(min_value=1),
            endpoint=sampled_from(ENDPOINTS),
            name=text())
@@ -108,6 +140,10 @@ class TestFunction_name_id_convert(unittest.TestCase):
 
     # name_id_convert(endpont, name_or_id)
 
+    def setup_example(self):
+        # The mocked endpoint lists change from an example to the next.
+        cache.drop_index()
+
     @given(name=text(),
            endpoint=sampled_from(ENDPOINTS),
            id_=integers(min_value=1))
@@ -139,6 +175,58 @@ class TestFunction_name_id_convert(unittest.TestCase):
             interface.name_id_convert(endpoint, name)
 
 
+class TestFunction__index(unittest.TestCase):
+
+    # _index(endpoint, key, position)
+
+    def setUp(self):
+        set_cache('testing')
+        cache.drop_index()
+
+    def berries(self, count):
+        return {'count': count, 'results': [
+            {'name': 'berry-{}'.format(id_), 'url': 'mocked.url/api/v2/berry/{}/'.format(id_)}
+            for id_ in range(1, count + 1)]}
+
+    @patch('pokebase.interface.get_data')
+    def testEnv_ListReadOnce(self, mock_get_data):
+        mock_get_data.return_value = self.berries(3)
+
+        self.assertEqual(interface.name_id_convert('berry', 'berry-2'), ('berry-2', 2))
+        self.assertEqual(interface.name_id_convert('berry', 3), ('berry-3', 3))
+        self.assertEqual(mock_get_data.call_count, 1)
+
+    @patch('pokebase.interface.get_data')
+    def testEnv_Saved(self, mock_get_data):
+        mock_get_data.return_value = self.berries(3)
+        interface.name_id_convert('berry', 1)
+
+        cache.close()
+        self.assertEqual(interface.name_id_convert('berry', 'berry-3'), ('berry-3', 3))
+        self.assertEqual(mock_get_data.call_count, 1)
+
+    @patch('pokebase.interface.get_data')
+    def testEnv_CountChanged(self, mock_get_data):
+        mock_get_data.return_value = self.berries(3)
+        interface.name_id_convert('berry', 1)
+
+        mock_get_data.return_value = self.berries(4)
+        self.assertEqual(interface.name_id_convert('berry', 'berry-4'), ('berry-4', 4))
+
+        mock_get_data.return_value = self.berries(5)
+        self.assertIsNone(interface._convert_name_to_id('berry', 'not-a-berry'))
+        self.assertEqual(cache.load_index('berry')[0], 5)
+
+    @patch('pokebase.interface.get_data')
+    def testEnv_ListSaved(self, mock_get_data):
+        mock_get_data.return_value = self.berries(3)
+        interface.name_id_convert('berry', 1)
+
+        cache.save(self.berries(3), 'berry')
+
+        self.assertIsNone(cache.load_index('berry'))
+
+
 class TestClass_APIResource(unittest.TestCase):
 
     # APIResource(endpoint, name_or_id, lazy_load=True)
@@ -146,6 +234,10 @@ class TestClass_APIResource(unittest.TestCase):
     def setUp(self):
         set_cache('testing')
 
+    def setup_example(self):
+        # The mocked endpoint lists change from an example to the next.
+        cache.drop_index()
+
     @given(id_=integers(min_value=1),
            endpoint=sampled_from(ENDPOINTS),
            name=text())
@@ -215,6 +307,80 @@ class TestClass_APIResource(unittest.TestCase):
 
         self.assertGreater(loaded_len, lazy_len)
 
+    @patch('pokebase.interface.get_data')
+    def testAttrs_NestedConvertedWhenRead(self, mock_get_data):
+        mock_get_data.return_value = {'id': 1, 'name': 'bulbasaur', 'height': 7,
+                                      'moves': [{'move': {'name': 'tackle', 'url': 'mocked.url/api/v2/move/33/'},
+                                                 'version_group_details': [{'level_learned_at': 1}]}]}
+
+        sample = interface.APIResource.from_reference('pokemon', 1)
+
+        with patch('pokebase.interface._make_obj', wraps=interface._make_obj) as mock_make_obj:
+            self.assertEqual(sample.height, 7)
+            mock_make_obj.assert_not_called()
+        self.assertIn('moves', dir(sample))
+
+        moves = sample.moves
+        self.assertIs(sample.moves, moves)
+        self.assertNotIn('version_group_details', vars(moves[0]))
+        self.assertEqual(moves[0].version_group_details[0].level_learned_at, 1)
+        self.assertIsInstance(moves[0].move, interface.APIResource)
+        self.assertEqual(mock_get_data.call_count, 1)
+
+        with self.assertRaises(AttributeError):
+            sample.missing_attr
+
+    @patch('pokebase.interface.get_data')
+    def testAttrs_RawDataDropped(self, mock_get_data):
+        mock_get_data.return_value = {'id': 1, 'name': 'bulbasaur', 'types': [{'slot': 1}], 'species': {'x': 1}}
+
+        sample = interface.APIResource.from_reference('pokemon', 1)
+        sample.types
+        self.assertEqual(sample._APIResource__values._APIMetadata__data, {'species': {'x': 1}})
+        sample.species
+        self.assertIs(sample._APIResource__values._APIMetadata__data, interface._EMPTY)
+
+    def testAttrs_ReferencesShared(self):
+        sample = interface.APIResource.from_reference('move', 33)
+
+        self.assertIs(interface.APIResource.from_reference('move', 33, 'tackle'), sample)
+        self.assertEqual(sample.name, 'tackle')
+        self.assertIsNot(interface.APIResource.from_reference('move', 34), sample)
+
+    @patch('pokebase.interface.get_data')
+    def testEnv_Pickled(self, mock_get_data):
+        mock_get_data.return_value = {'id': 1, 'name': 'bulbasaur', 'height': 7,
+                                      'moves': [{'move': {'name': 'tackle', 'url': 'mocked.url/api/v2/move/33/'}}],
+                                      'types': [{'slot': 1}]}
+        sample = interface._resource('pokemon', 1, 'bulbasaur')
+        sample.moves
+
+        unpickled = pickle.loads(pickle.dumps(sample))
+
+        self.assertIs(type(unpickled), type(sample))
+        self.assertEqual(unpickled.height, 7)
+        self.assertEqual(unpickled.moves[0].move.name, 'tackle')
+        self.assertEqual(unpickled.types[0].slot, 1)
+        self.assertEqual(mock_get_data.call_count, 1)
+
+    @patch('pokebase.interface.get_data')
+    def testAttrs_ModelClasses(self, mock_get_data):
+        mock_get_data.side_effect = [{'count': 1, 'results': [{'url': 'mocked.url/api/v2/pokemon/1/', 'name': 'bulbasaur'}]},
+                                     {'id': 1, 'name': 'bulbasaur',
+                                      'moves': [{'move': {'name': 'tackle', 'url': 'mocked.url/api/v2/move/33/'},
+                                                 'version_group_details': [{'level_learned_at': 1}]}]}]
+
+        sample = interface.APIResource('pokemon', 1)
+        detail = sample.moves[0].version_group_details[0]
+
+        self.assertEqual(type(sample).__name__, 'Pokemon')
+        self.assertEqual(type(sample.moves[0].move).__name__, 'Move')
+        self.assertIsInstance(sample.moves[0].move, interface.APIResource)
+        self.assertEqual(type(detail).__name__, 'VersionGroupDetail')
+        self.assertEqual(type(detail).__slots__, ('level_learned_at',))
+        self.assertIsInstance(detail, interface.APIMetadata)
+        self.assertEqual(sample.url, api_url_build('pokemon', 1))
+
     @given(endpoint=text(),
            id_=integers(min_value=1))
     @patch('pokebase.interface.get_data')
@@ -240,26 +406,78 @@ class TestClass_APIResource(unittest.TestCase):
         self.assertNotIsInstance(pkmn.location_area_encounters, str)
 
 
+class TestFunction_get_resources(unittest.TestCase):
+
+    # get_resources(endpoint, names_or_ids, max_workers=None, ordered=True, **kwargs)
+
+    def setUp(self):
+        set_cache('testing')
+
+    def setup_example(self):
+        # The mocked endpoint lists change from an example to the next.
+        cache.drop_index()
+
+    @given(endpoint=sampled_from(ENDPOINTS),
+           ids=lists(integers(min_value=1), max_size=5))
+    @patch('pokebase.interface.get_many')
+    @patch('pokebase.interface.get_data')
+    def testArgs(self, mock_get_data, mock_get_many, endpoint, ids):
+
+        mock_get_data.side_effect = lambda endpoint, *args, **kwargs: (
+            {'count': len(ids), 'results': [{'url': 'mocked.url/api/v2/{}/{}/'.format(endpoint, id_)} for id_ in ids]}
+            if not args else {'id': args[0], 'simple_attr': 10})
+        mock_get_many.return_value = iter([{'id': id_} for id_ in ids])
+
+        resources = list(interface.get_resources(endpoint, ids))
+
+        self.assertEqual([resource.id_ for resource in resources], ids)
+        self.assertTrue(all(resource.simple_attr == 10 for resource in resources))
+
+
 class TestClass_APIResourceList(unittest.TestCase):
 
     @given(endpoint=sampled_from(ENDPOINTS))
-    @patch('pokebase.interface.get_data')
-    def testArgs(self, mock_get_data, endpoint):
+    @patch('pokebase.interface.iter_pages')
+    def testArgs(self, mock_iter_pages, endpoint):
 
-        mock_get_data.return_value = {'count': 1, 'results': [{'url': 'mocked.url/api/v2/{}/1/'.format(endpoint)}]}
+        mock_iter_pages.side_effect = lambda *args, **kwargs: iter([{'count': 1, 'results': [{'url': 'mocked.url/api/v2/{}/1/'.format(endpoint)}]}])
 
         self.assertIsInstance(interface.APIResourceList(endpoint),
                               interface.APIResourceList)
 
     @given(endpoint=text())
-    @patch('pokebase.interface.get_data')
-    def testArg_endpoint_Text(self, mock_get_data, endpoint):
+    @patch('pokebase.interface.iter_pages')
+    def testArg_endpoint_Text(self, mock_iter_pages, endpoint):
 
-        mock_get_data.side_effect = ValueError()
+        mock_iter_pages.side_effect = ValueError()
 
         with self.assertRaises(ValueError):
             interface.APIResourceList(endpoint)
 
+    @given(endpoint=sampled_from(ENDPOINTS))
+    @patch('pokebase.interface.iter_pages')
+    def testEnv_Paged(self, mock_iter_pages, endpoint):
+
+        pages = [{'count': 3, 'results': [{'name': 'one', 'url': 'mocked.url/api/v2/{}/1/'.format(endpoint)},
+                                          {'name': 'two', 'url': 'mocked.url/api/v2/{}/2/'.format(endpoint)}]},
+                 {'count': 3, 'results': [{'url': 'mocked.url/api/v2/{}/3/'.format(endpoint)}]}]
+        fetched = []
+
+        def iter_pages(*args, **kwargs):
+            for page in pages:
+                fetched.append(page)
+                yield page
+
+        mock_iter_pages.side_effect = iter_pages
+
+        resource_list = interface.APIResourceList(endpoint)
+
+        self.assertEqual(len(resource_list), 3)
+        self.assertEqual(len(fetched), 1)
+        self.assertEqual(list(resource_list.names), ['one', 'two', '3'])
+        self.assertEqual(len(fetched), 2)
+        self.assertEqual(len(list(resource_list)), 3)
+
 
 class TestClass_APIMetadata(unittest.TestCase):
 
@@ -267,3 +485,39 @@ class TestClass_APIMetadata(unittest.TestCase):
     def testArgs(self, data):
         self.assertIsInstance(interface.APIMetadata(data),
                               interface.APIMetadata)
+
+    def testAttrs_ConvertedWhenRead(self):
+        data = {'simple_attr': 10, 'dict_attr': {'nested': {'deep': 1}}, 'list_attr': [{'name': 'one'}]}
+        sample = interface.APIMetadata(data)
+
+        self.assertEqual(sample.simple_attr, 10)
+        self.assertNotIn('dict_attr', vars(sample))
+        self.assertNotIn('list_attr', vars(sample))
+        self.assertIn('dict_attr', dir(sample))
+
+        self.assertIsInstance(sample.dict_attr, interface.APIMetadata)
+        self.assertIs(sample.dict_attr, sample.dict_attr)
+        self.assertNotIn('nested', vars(sample.dict_attr))
+        self.assertEqual(sample.dict_attr.nested.deep, 1)
+        self.assertEqual(sample.list_attr[0].name, 'one')
+        self.assertEqual(data, {'simple_attr': 10, 'dict_attr': {'nested': {'deep': 1}}, 'list_attr': [{'name': 'one'}]})
+
+        with self.assertRaises(AttributeError):
+            sample.missing_attr
+
+    def testEnv_Pickled(self):
+        sample = interface._convert([{'level_learned_at': 1, 'version_group': {'name': 'red-blue', 'url': 'mocked.url/api/v2/version-group/1/'}}],
+                                    'version_group_details')[0]
+
+        unpickled = pickle.loads(pickle.dumps(sample))
+
+        self.assertIs(type(unpickled), type(sample))
+        self.assertEqual(unpickled.level_learned_at, 1)
+        self.assertIs(type(unpickled.version_group), type(sample.version_group))
+        self.assertEqual((unpickled.version_group.id_, unpickled.version_group.name), (1, 'red-blue'))
+
+    def testAttrs_KeysNotSlots(self):
+        sample = interface._convert({'not an identifier': {'_private': 1}}, 'attr')
+
+        self.assertIs(type(sample), interface.APIMetadata)
+        self.assertIs(type(getattr(sample, 'not an identifier')), interface.APIMetadata)
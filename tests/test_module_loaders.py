@@ -23,6 +23,23 @@ def builder(func, func_name):
     return test
 
 
+def builder_many(func, func_name):
+
+    @given(id_=integers(min_value=1))
+    @patch('pokebase.interface.get_many')
+    @patch('pokebase.interface.get_data')
+    def test(self, mock_get_data, mock_get_many, id_):
+        mock_get_data.side_effect = [{'count': 1, 'results': [{'url': 'mocked.url/api/v2/{}/{}/'.format(func_name, id_)}]},
+                                     {'count': 1, 'results': [{'url': 'mocked.url/api/v2/{}/{}/'.format(func_name, id_)}]},
+                                     {'id': id_, 'simple_attr': 10}]
+        mock_get_many.return_value = iter([{'id': id_}])
+        resources = list(func([id_]))
+        self.assertEqual(len(resources), 1)
+        self.assertIsInstance(resources[0], APIResource)
+
+    return test
+
+
 class TestFunctions_loaders(unittest.TestCase):
 
     @classmethod
@@ -38,4 +55,8 @@ class TestFunctions_loaders(unittest.TestCase):
 
             setattr(cls, 'testLoader_{}'.format(func_name), builder(func, endpoint))
 
+            func_many = getattr(loaders, '{}_many'.format(endpoint.replace('-', '_')))
+
+            setattr(cls, 'testLoader_{}_many'.format(endpoint.replace('-', '_')), builder_many(func_many, endpoint))
+
 TestFunctions_loaders.setUpClass()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from pokebase import __main__ as cli
+from pokebase import cache, mirror
+
+BERRIES = {
+    'count': 3,
+    'next': None,
+    'results': [
+        {'name': 'cheri', 'url': 'https://pokeapi.co/api/v2/berry/1/'},
+        {'name': 'chesto', 'url': 'https://pokeapi.co/api/v2/berry/2/'},
+        {'name': 'pecha', 'url': 'https://pokeapi.co/api/v2/berry/3/'},
+    ],
+}
+
+
+def fake_get_many(endpoint, ids, **kwargs):
+    for id_ in ids:
+        yield {'id': id_}
+
+
+class TestFunction_warm(unittest.TestCase):
+
+    # mirror.warm(endpoints=None, workers=None, sprites=False,
+    #             force_lookup=False, checkpoint=None, progress=_report)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.directory.name, 'warm.checkpoint')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_endpoints_FetchesEveryResource(self, mock_get_data, mock_get_many):
+        counts = mirror.warm(['berry'], checkpoint=self.checkpoint, progress=None)
+
+        self.assertEqual(counts, {'berry': 3})
+        self.assertEqual(mock_get_many.call_args[0], ('berry', [1, 2, 3]))
+        self.assertFalse(mock_get_many.call_args[1]['ordered'])
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_endpoints_FetchesSubresources(self, mock_get_data, mock_get_many):
+        mirror.warm(['pokemon'], checkpoint=self.checkpoint, progress=None)
+
+        subresources = [call[1].get('subresource') for call in mock_get_many.call_args_list]
+        self.assertEqual(subresources, [None, 'encounters'])
+
+    def testArg_endpoints_Unknown(self):
+        with self.assertRaises(ValueError):
+            mirror.warm(['not-an-endpoint'], checkpoint=self.checkpoint, progress=None)
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_checkpoint_Resumes(self, mock_get_data, mock_get_many):
+        mirror._save_checkpoint({'done': ['berry']}, self.checkpoint)
+
+        counts = mirror.warm(['berry', 'item'], checkpoint=self.checkpoint, progress=None)
+
+        self.assertEqual(counts, {'item': 3})
+        self.assertEqual(mock_get_data.call_args[0], ('item',))
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_checkpoint_RemovedWhenDone(self, mock_get_data, mock_get_many):
+        mirror.warm(['berry'], checkpoint=self.checkpoint, progress=None)
+
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_checkpoint_KeptOnFailure(self, mock_get_data, mock_get_many):
+        mock_get_data.side_effect = [BERRIES, RuntimeError]
+
+        with self.assertRaises(RuntimeError):
+            mirror.warm(['berry', 'item'], checkpoint=self.checkpoint, progress=None)
+
+        self.assertEqual(mirror._load_checkpoint(self.checkpoint), {'done': ['berry']})
+
+    @patch('pokebase.mirror.get_many', side_effect=fake_get_many)
+    @patch('pokebase.mirror.get_data', return_value=BERRIES)
+    def testArg_progress_Called(self, mock_get_data, mock_get_many):
+        reports = []
+        mirror.warm(['berry'], checkpoint=self.checkpoint, progress=lambda *args: reports.append(args))
+
+        self.assertEqual(reports, [('berry', 1, 3), ('berry', 2, 3), ('berry', 3, 3)])
+
+    @patch('pokebase.api.transport.get')
+    def testArg_force_lookup_RevalidatesSprites(self, mock_get):
+        mock_get.return_value.status_code = 304
+        cache.set_cache('testing')
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+        cache.save_sprite_meta({'etag': '"abc"'}, 'pokemon', 1)
+
+        mirror._warm_sprites('pokemon', [1], 1, True, lambda *args: None, [{}])
+
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"abc"'})
+        self.assertEqual(cache.load_sprite('pokemon', 1)['img_data'], b'png')
+        self.assertEqual(cache.load_sprite_meta('pokemon', 1)['etag'], '"abc"')
+
+    @patch('pokebase.api.transport.get')
+    def testArg_sprites_SkipsMissing(self, mock_get):
+        mock_get.return_value.status_code = 404
+        mock_get.return_value.raise_for_status.side_effect = requests.HTTPError
+        cache.set_cache('testing')
+        reports = []
+
+        mirror._warm_sprites('items', ['no-sprite'], 1, False, lambda *args: reports.append(args), [{}])
+
+        self.assertEqual(reports, [('sprite/items', 1, 1)])
+        with self.assertRaises(FileNotFoundError):
+            cache.load_sprite('items', 'no-sprite')
+
+    @patch('pokebase.mirror.get_sprite')
+    def testArg_sprites_Variants(self, mock_get_sprite):
+        cache.set_cache('testing')
+        cache.save_sprite({'img_data': b'png'}, 'pokemon', 1)
+
+        mirror._warm_sprites('pokemon', [1], 1, False, lambda *args: None)
+
+        requested = [call[1] for call in mock_get_sprite.call_args_list]
+        self.assertEqual(len(requested), len(mirror.SPRITE_VARIANTS['pokemon']) - 1)
+        self.assertIn({'force_lookup': False, 'back': True, 'shiny': True}, requested)
+        self.assertIn({'force_lookup': False, 'other': True, 'official_artwork': True}, requested)
+
+
+class TestFunction_main(unittest.TestCase):
+
+    # python -m pokebase warm ...
+
+    def testArgs_warm(self):
+        args = cli.make_parser().parse_args(['warm', '--endpoints', 'berry,item', '--workers', '16'])
+
+        self.assertEqual(args.endpoints, ['berry', 'item'])
+        self.assertEqual(args.workers, 16)
+        self.assertIs(args.func, cli.warm)
+
+    def testArgs_warm_All(self):
+        args = cli.make_parser().parse_args(['warm'])
+
+        self.assertIn('pokemon', args.endpoints)
+
+    def testArgs_warm_UnknownEndpoint(self):
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            cli.make_parser().parse_args(['warm', '--endpoints', 'not-an-endpoint'])
+
+    @patch('pokebase.mirror.warm', return_value={'berry': 3})
+    def testCallsWarm(self, mock_warm):
+        with patch('sys.stderr'):
+            self.assertEqual(cli.main(['warm', '--endpoints', 'berry', '--force', '--quiet']), 0)
+
+        self.assertEqual(mock_warm.call_args[1]['endpoints'], ['berry'])
+        self.assertTrue(mock_warm.call_args[1]['force_lookup'])
+        self.assertIsNone(mock_warm.call_args[1]['progress'])
+
+    def testArgs_evict(self):
+        args = cli.make_parser().parse_args(['evict', '--api-bytes', '500M', '--sprite-bytes', '1.5G'])
+
+        self.assertEqual(args.api_bytes, 500 * 1024 ** 2)
+        self.assertEqual(args.sprite_bytes, int(1.5 * 1024 ** 3))
+        self.assertEqual(args.policy, 'lru')
+
+    def testArgs_evict_InvalidSize(self):
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            cli.make_parser().parse_args(['evict', '--api-bytes', 'lots'])
+
+    @patch('pokebase.cache.evict', return_value=3)
+    def testCallsEvict(self, mock_evict):
+        with patch('sys.stderr'):
+            self.assertEqual(cli.main(['evict', '--api-bytes', '1K', '--policy', 'lfu']), 0)
+
+        mock_evict.assert_called_once_with('api', 1024)
+        self.assertEqual(cache.EVICTION, 'lfu')
+        cache.set_size_limit(policy='lru')
+
+    @patch('pokebase.cache.compact', return_value={'api': {'entries': 1, 'bytes': 2}})
+    def testCallsCompact(self, mock_compact):
+        with patch('sys.stdout'):
+            self.assertEqual(cli.main(['compact']), 0)
+
+        mock_compact.assert_called_once_with()
+
+    @patch('pokebase.cache.stats', return_value={'api': {'entries': 1, 'bytes': 2}})
+    @patch('pokebase.cache.set_cache')
+    def testArgs_backend(self, mock_set_cache, mock_stats):
+        with patch('sys.stdout'):
+            self.assertEqual(cli.main(['--backend', 'sqlite', '--sprite-backend', 'pack', 'stats']), 0)
+
+        mock_set_cache.assert_called_once_with(cache.CACHE_DIR, backend='sqlite', sprite_backend='pack')
+
+    def testArgs_backend_Files(self):
+        with self.assertRaises(SystemExit), patch('sys.stderr'):
+            cli.make_parser().parse_args(['--backend', 'files', 'stats'])
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from hypothesis import given
+from hypothesis.strategies import floats, integers
+
+from pokebase import ratelimit
+
+
+class TestClass_TokenBucket(unittest.TestCase):
+
+    # TokenBucket(rate, burst=None)
+
+    def testAttrs_Burst(self):
+        bucket = ratelimit.TokenBucket(1, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def testAttrs_Rate(self):
+        bucket = ratelimit.TokenBucket(20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+class TestClass_AdaptiveConcurrency(unittest.TestCase):
+
+    # AdaptiveConcurrency(initial=8, minimum=1, maximum=64, increase=1.0, decrease=0.5)
+
+    def testAttrs_MultiplicativeDecrease(self):
+        concurrency = ratelimit.AdaptiveConcurrency(initial=8)
+        concurrency.acquire()
+        concurrency.release(success=False)
+        self.assertEqual(concurrency.limit, 4)
+
+    def testAttrs_AdditiveIncrease(self):
+        concurrency = ratelimit.AdaptiveConcurrency(initial=4)
+        for _ in range(4):
+            concurrency.acquire()
+            concurrency.release(success=True)
+        self.assertGreater(concurrency.limit, 4.9)
+        self.assertLess(concurrency.limit, 5.1)
+
+    @given(initial=integers(min_value=1, max_value=8))
+    def testAttrs_Bounds(self, initial):
+        concurrency = ratelimit.AdaptiveConcurrency(initial=initial, minimum=1, maximum=8)
+        for _ in range(20):
+            concurrency.acquire()
+            concurrency.release(success=False)
+        self.assertEqual(concurrency.limit, 1)
+
+    def testEnv_LimitHeld(self):
+        concurrency = ratelimit.AdaptiveConcurrency(initial=1)
+        concurrency.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (concurrency.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        concurrency.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+
+class TestClass_HostLimiter(unittest.TestCase):
+
+    # HostLimiter(rate=None, burst=None, concurrency=None, adaptive=False)
+
+    def testAttrs_Unlimited(self):
+        limiter = ratelimit.HostLimiter()
+        self.assertIsNone(limiter.bucket)
+        self.assertIsNone(limiter.concurrency)
+
+    def testAttrs_Pause(self):
+        limiter = ratelimit.HostLimiter()
+        limiter.pause(0.2)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def testAttrs_FixedConcurrency(self):
+        limiter = ratelimit.HostLimiter(concurrency=4)
+        limiter.acquire()
+        limiter.release(success=False)
+        self.assertEqual(limiter.concurrency.limit, 4)
+
+
+class TestFunction_set_rate_limit(unittest.TestCase):
+
+    # set_rate_limit(host, rate=None, burst=None, concurrency=None, adaptive=False)
+
+    def tearDown(self):
+        ratelimit.set_rate_limit('pokeapi.co')
+
+    def testArgs(self):
+        limiter = ratelimit.set_rate_limit('pokeapi.co', rate=10, concurrency=4, adaptive=True)
+        self.assertIs(limiter, ratelimit.get_limiter('pokeapi.co'))
+        self.assertEqual(limiter.bucket.rate, 10)
+
+
+class TestFunction_backoff(unittest.TestCase):
+
+    # backoff(attempt)
+
+    @given(attempt=integers(min_value=0, max_value=100))
+    def testArgs(self, attempt):
+        delay = ratelimit.backoff(attempt)
+        self.assertGreaterEqual(delay, 0)
+        self.assertLessEqual(delay, ratelimit.BACKOFF_CAP)
+
+
+class TestFunction_retry_after(unittest.TestCase):
+
+    # retry_after(response)
+
+    @given(seconds=floats(min_value=0, max_value=3600))
+    def testArg_Seconds(self, seconds):
+        response = MagicMock(headers={'Retry-After': str(seconds)})
+        self.assertEqual(ratelimit.retry_after(response), seconds)
+
+    def testArg_Date(self):
+        response = MagicMock(headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(ratelimit.retry_after(response), 0)
+
+    def testArg_Missing(self):
+        response = MagicMock(headers={})
+        self.assertIsNone(ratelimit.retry_after(response))
+
+    def testArg_Garbage(self):
+        response = MagicMock(headers={'Retry-After': 'soon'})
+        self.assertIsNone(ratelimit.retry_after(response))
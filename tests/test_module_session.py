@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis.strategies import integers
+
+from pokebase import session
+
+
+class TestFunction_get_session(unittest.TestCase):
+
+    # session.get_session()
+
+    def tearDown(self):
+        session.close()
+
+    def testReturnsSameSession(self):
+        self.assertIs(session.get_session(), session.get_session())
+
+    @given(pool_maxsize=integers(min_value=1, max_value=64))
+    def testAttr_PoolSize(self, pool_maxsize):
+        session.configure(pool_maxsize=pool_maxsize)
+        adapter = session.get_session().get_adapter('https://pokeapi.co/')
+        self.assertEqual(adapter._pool_maxsize, pool_maxsize)
+
+
+class TestFunction_get(unittest.TestCase):
+
+    # session.get(url, params=None, headers=None)
+
+    def tearDown(self):
+        session.close()
+
+    @patch('requests.Session.get')
+    def testArgs_UsesTimeout(self, mock_get):
+        session.get('https://pokeapi.co/api/v2/berry/1/')
+        self.assertEqual(mock_get.call_args[1]['timeout'], session.TIMEOUT)
+
+
+class TestFunction_close(unittest.TestCase):
+
+    # session.close()
+
+    def testNewSessionAfterClose(self):
+        first = session.get_session()
+        session.close()
+        self.assertIsNot(first, session.get_session())
+        session.close()
+
+    def testCloseTwice(self):
+        session.close()
+        self.assertIsNone(session.close())
+
+
+class TestFunction__reset_after_fork(unittest.TestCase):
+
+    # session._reset_after_fork()
+
+    def testNewSessionAfterFork(self):
+        first = session.get_session()
+        session._reset_after_fork()
+        self.assertIsNot(first, session.get_session())
+        first.close()
+        session.close()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+
+from pokebase import api, ratelimit, transport
+from pokebase.cache import set_cache
+from pokebase.common import api_url_build
+
+
+class TestFunction_transport_get(unittest.TestCase):
+
+    # transport.get(url, params=None, headers=None)
+
+    def tearDown(self):
+        transport.set_transport()
+
+    @patch('requests.Session.get')
+    def testEnv_TooManyRequests(self, mock_get):
+        throttled = MagicMock(status_code=429, headers={'Retry-After': '0'})
+        ok = MagicMock(status_code=200, headers={})
+        mock_get.side_effect = [throttled, ok]
+
+        self.assertIs(transport.get('https://pokeapi.co/api/v2/berry/1/'), ok)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('pokebase.ratelimit.backoff', return_value=0)
+    @patch('requests.Session.get')
+    def testEnv_ConnectionDropped(self, mock_get, mock_backoff):
+        ok = MagicMock(status_code=200, headers={})
+        mock_get.side_effect = [ConnectionError(), ok]
+
+        self.assertIs(transport.get('https://pokeapi.co/api/v2/berry/1/'), ok)
+
+    @patch('pokebase.ratelimit.backoff', return_value=0)
+    @patch('requests.Session.get')
+    def testEnv_RetriesExhausted(self, mock_get, mock_backoff):
+        mock_get.return_value = MagicMock(status_code=503, headers={})
+
+        self.assertEqual(transport.get('https://pokeapi.co/api/v2/berry/1/').status_code, 503)
+        self.assertEqual(mock_get.call_count, ratelimit.MAX_RETRIES + 1)
+
+    @patch('requests.Session.get')
+    def testEnv_SlotReleased(self, mock_get):
+        limiter = ratelimit.set_rate_limit('example.org', concurrency=2)
+        self.addCleanup(ratelimit.set_rate_limit, 'example.org')
+        mock_get.side_effect = ReadTimeout()
+
+        for _ in range(3):
+            with self.assertRaises(ReadTimeout):
+                transport.get('https://example.org/')
+
+        self.assertEqual(limiter.concurrency._in_flight, 0)
+
+
+class TestFunction_set_transport(unittest.TestCase):
+
+    # transport.set_transport(transport=None, *args, **kwargs)
+
+    def tearDown(self):
+        transport.set_transport()
+
+    def testArg_transport_None(self):
+        self.assertIsInstance(transport.set_transport(), transport.RequestsTransport)
+
+    def testArg_transport_Name(self):
+        self.assertIsInstance(transport.set_transport('urllib3'), transport.Urllib3Transport)
+        self.assertIs(transport.TRANSPORT, transport.set_transport(transport.TRANSPORT))
+
+    def testArg_transport_Unknown(self):
+        with self.assertRaises(ValueError):
+            transport.set_transport('carrier-pigeon')
+
+
+class TestClass_Response(unittest.TestCase):
+
+    # Response(url, status_code, headers, content)
+
+    def testAttrs_Headers(self):
+        response = transport.Response('mocked.url', 200, {'ETag': '"abc"'}, b'{}')
+        self.assertEqual(response.headers['etag'], '"abc"')
+        self.assertIsNone(response.raise_for_status())
+
+    def testEnv_ErrorStatus(self):
+        response = transport.Response('mocked.url', 404, {}, b'')
+        with self.assertRaises(HTTPError):
+            response.raise_for_status()
+
+
+class TestClass_Urllib3Transport(unittest.TestCase):
+
+    # Urllib3Transport()
+
+    @patch('urllib3.PoolManager.request')
+    def testArgs(self, mock_request):
+        mock_request.return_value = MagicMock(status=200, headers={'ETag': '"abc"'}, data=b'{}')
+
+        response = transport.Urllib3Transport().get('https://pokeapi.co/api/v2/berry/', params={'limit': 10})
+
+        self.assertEqual(mock_request.call_args[0][1], 'https://pokeapi.co/api/v2/berry/?limit=10')
+        self.assertEqual(response.content, b'{}')
+        self.assertEqual(response.headers['etag'], '"abc"')
+
+
+@unittest.skipIf(transport.httpx is None, 'httpx is not installed')
+class TestClass_HttpxTransport(unittest.TestCase):
+
+    # HttpxTransport(http2=False)
+
+    def testArgs(self):
+        mock_transport = transport.httpx.MockTransport(
+            lambda request: transport.httpx.Response(200, headers={'ETag': '"abc"'}, content=request.url.query))
+        httpx_transport = transport.HttpxTransport()
+        httpx_transport._client = transport.httpx.Client(transport=mock_transport)
+
+        response = httpx_transport.get('https://pokeapi.co/api/v2/berry/', params={'limit': 10})
+
+        self.assertEqual(response.content, b'limit=10')
+        self.assertEqual(response.headers['etag'], '"abc"')
+        httpx_transport.close()
+
+
+class TestClass_RecordTransport_ReplayTransport(unittest.TestCase):
+
+    # RecordTransport(directory, transport=None), ReplayTransport(directory)
+
+    def setUp(self):
+        set_cache('testing')
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        transport.set_transport()
+        shutil.rmtree(self.directory)
+
+    def testEnv_RecordThenReplay(self):
+        recorded = transport.Response('mocked.url', 200, {'ETag': '"abc"'}, b'{"id": 1, "name": "cheri"}')
+        inner = MagicMock()
+        inner.get.return_value = recorded
+
+        transport.set_transport('record', self.directory, backend=inner)
+        self.assertEqual(api.get_data('berry', 1, force_lookup=True), {'id': 1, 'name': 'cheri'})
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+        transport.set_transport('replay', self.directory)
+        response = transport.get(api_url_build('berry', 1))
+        self.assertEqual(response.content, recorded.content)
+        self.assertEqual(response.headers['etag'], '"abc"')
+
+    def testEnv_NotRecorded(self):
+        transport.set_transport('replay', self.directory)
+        with self.assertRaises(FileNotFoundError):
+            api.get_data('berry', 1, force_lookup=True)